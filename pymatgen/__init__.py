@@ -8,12 +8,10 @@ for materials analysis. This is the root package.
 """
 
 import os
+import sys
 import warnings
 from fnmatch import fnmatch
-
-import ruamel.yaml as yaml
-
-from monty.json import MontyEncoder, MontyDecoder, MSONable
+from importlib import import_module
 
 __author__ = "Pymatgen Development Team"
 __email__ = "pymatgen@googlegroups.com"
@@ -27,6 +25,7 @@ SETTINGS_FILE = os.path.join(os.path.expanduser("~"), ".pmgrc.yaml")
 def _load_pmg_settings():
     try:
         with open(SETTINGS_FILE, "rt") as f:
+            import ruamel.yaml as yaml
             d = yaml.safe_load(f)
     except IOError:
         # If there are any errors, default to using environment variables
@@ -43,19 +42,58 @@ def _load_pmg_settings():
 
 SETTINGS = _load_pmg_settings()
 
-# pylint: disable=C0413
 # Useful aliases for commonly used objects and modules.
-# Allows from pymatgen import <class> for quick usage.
-# Note that these have to come after the SETTINGS have been loaded. Otherwise, import does not work.
-from .core.periodic_table import Element, Specie, DummySpecie
-from .core.composition import Composition
-from .core.structure import Structure, IStructure, Molecule, IMolecule
-from .core.lattice import Lattice
-from .core.sites import Site, PeriodicSite
-from .core.operations import SymmOp
-from .core.units import Unit, FloatWithUnit, ArrayWithUnit
-from .electronic_structure.core import Spin, Orbital
-from .ext.matproj import MPRester
+# Allows from pymatgen import <class> for quick usage. The aliases are
+# imported on first access, so that importing pymatgen (or any of its
+# subpackages) does not import the core classes, units, or the Materials
+# Project REST interface and its dependencies.
+_ALIASES = {
+    "MontyEncoder": "monty.json",
+    "MontyDecoder": "monty.json",
+    "MSONable": "monty.json",
+    "Element": "pymatgen.core.periodic_table",
+    "Specie": "pymatgen.core.periodic_table",
+    "DummySpecie": "pymatgen.core.periodic_table",
+    "Composition": "pymatgen.core.composition",
+    "Structure": "pymatgen.core.structure",
+    "IStructure": "pymatgen.core.structure",
+    "Molecule": "pymatgen.core.structure",
+    "IMolecule": "pymatgen.core.structure",
+    "Lattice": "pymatgen.core.lattice",
+    "Site": "pymatgen.core.sites",
+    "PeriodicSite": "pymatgen.core.sites",
+    "SymmOp": "pymatgen.core.operations",
+    "Unit": "pymatgen.core.units",
+    "FloatWithUnit": "pymatgen.core.units",
+    "ArrayWithUnit": "pymatgen.core.units",
+    "Spin": "pymatgen.electronic_structure.core",
+    "Orbital": "pymatgen.electronic_structure.core",
+    "MPRester": "pymatgen.ext.matproj",
+}
+
+__all__ = ["SETTINGS_FILE", "SETTINGS", "get_structure_from_mp", "loadfn"] + \
+    list(_ALIASES.keys())
+
+
+def __getattr__(name):
+    """
+    Imports the aliases on first access (PEP 562).
+    """
+    if name in _ALIASES:
+        obj = getattr(import_module(_ALIASES[name]), name)
+        globals()[name] = obj
+        return obj
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + list(_ALIASES.keys()))
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is not supported, so import the aliases now.
+    for _name in _ALIASES:
+        __getattr__(_name)
 
 
 def get_structure_from_mp(formula):
@@ -70,6 +108,7 @@ def get_structure_from_mp(formula):
         (Structure) The lowest energy structure in Materials Project with that
             formula.
     """
+    from pymatgen.ext.matproj import MPRester
     m = MPRester()
     entries = m.get_entries(formula, inc_structure="final")
     if len(entries) == 0:
@@ -98,6 +137,7 @@ def loadfn(fname):
     """
     if (fnmatch(fname, "*POSCAR*") or fnmatch(fname, "*CONTCAR*") or ".cif" in fname.lower()) or \
             fnmatch(fname, "*.vasp"):
+        from pymatgen.core.structure import Structure
         return Structure.from_file(fname)
     if fnmatch(fname, "*vasprun*"):
         from pymatgen.io.vasp import Vasprun
@@ -26,6 +26,8 @@ import itertools
 import logging
 import time
 from collections import OrderedDict
+from copy import deepcopy
+from multiprocessing import Pool
 from random import shuffle
 
 import numpy as np
@@ -288,6 +290,36 @@ def symmetry_measure(points_distorted, points_perfect):
     return {'symmetry_measure': num / denom * 100.0, 'scaling_factor': scaling_factor, 'rotation_matrix': rot}
 
 
+def symmetry_measures(points_distorted, points_perfect):
+    """
+    Computes the continuous symmetry measures of a stack of (distorted) sets of points, e.g. the same polyhedron with
+    its points in different orders, with respect to the (perfect) set of points "points_perfect". This is the same as
+    calling symmetry_measure for each set of points, with all the rotations and scaling factors computed at once.
+    :param points_distorted: Array of shape (nsets, npoints, 3) of the (distorted) sets of points.
+    :param points_perfect: List of "perfect" points describing a given model polyhedron.
+    :return: The continuous symmetry measures, scaling factors and rotation matrices, as arrays over the sets of points
+    """
+    points_distorted = np.asarray(points_distorted, dtype=np.float64)
+    points_perfect = np.asarray(points_perfect, dtype=np.float64)
+    nsets = len(points_distorted)
+    # When there is only one point, the symmetry measure is 0.0 by definition
+    if points_distorted.shape[1] == 1:
+        return {'symmetry_measure': np.zeros(nsets), 'scaling_factor': [None] * nsets,
+                'rotation_matrix': [None] * nsets}
+    # Rotations aligning each set of distorted points to the perfect points (see find_rotation)
+    H = np.matmul(points_distorted.transpose(0, 2, 1), points_perfect)
+    U, S, Vt = np.linalg.svd(H)
+    rot = np.matmul(Vt.transpose(0, 2, 1), U.transpose(0, 2, 1))
+    # Scaling factors between the rotated distorted points and the perfect points (see find_scaling_factor)
+    rotated_coords = np.matmul(points_distorted, rot.transpose(0, 2, 1))
+    scaling_factor = (np.einsum('pij,ij->p', rotated_coords, points_perfect) /
+                      np.einsum('pij,pij->p', rotated_coords, rotated_coords))
+    diff = points_perfect - scaling_factor[:, None, None] * rotated_coords
+    num = np.einsum('pij,pij->p', diff, diff)
+    denom = np.tensordot(points_perfect, points_perfect)
+    return {'symmetry_measure': num / denom * 100.0, 'scaling_factor': scaling_factor, 'rotation_matrix': rot}
+
+
 def find_rotation(points_distorted, points_perfect):
     """
     This finds the rotation matrix that aligns the (distorted) set of points "points_distorted" with respect to the
@@ -355,6 +387,7 @@ class LocalGeometryFinder:
         self.permutations_safe_override = permutations_safe_override
         self.plane_ordering_override = plane_ordering_override
         self.plane_safe_permutations = plane_safe_permutations
+        self._csm_cache = None
         self.setup_parameters(centering_type='centroid',
                               include_central_site_in_centroid=True,
                               bva_distance_scale_factor=None,
@@ -502,10 +535,14 @@ class LocalGeometryFinder:
                                        voronoi_normalized_angle_tolerance=PRESETS['DEFAULT']
                                        ['voronoi_normalized_angle_tolerance'],
                                        recompute=None,
-                                       optimization=PRESETS['DEFAULT']['optimization']):
+                                       optimization=PRESETS['DEFAULT']['optimization'],
+                                       ncpus=None):
         """
         Computes and returns the StructureEnvironments object containing all the information about the coordination
         environments in the structure
+        The continuous symmetry measures of a neighbors set are reused for the identical neighbors sets of other sites,
+        i.e. those with the same coordinates relative to their central site. Only sites equivalent by a lattice
+        translation share them, not sites related by another symmetry operation.
         :param excluded_atoms: Atoms for which the coordination geometries does not have to be identified
         :param only_atoms: If not set to None, atoms for which the coordination geometries have to be identified
         :param only_cations: If set to True, will only compute environments for cations
@@ -532,6 +569,7 @@ class LocalGeometryFinder:
         :param recompute: whether to recompute the sites already computed (when initial_structure_environments
             is not None)
         :param optimization: optimization algorithm
+        :param ncpus: number of processes computing the environments of the sites in parallel
         :return: The StructureEnvironments object containing all the information about the coordination
             environments in the structure
         """
@@ -649,122 +687,188 @@ class LocalGeometryFinder:
                 all_cns = list(set(all_cns).intersection(cns_to_recompute))
             do_recompute = True
 
-        # Variables used for checking timelimit
-        max_time_one_site = 0.0
-        breakit = False
-
         if optimization > 0:
             self.detailed_voronoi.local_planes = [None] * len(self.structure)
             self.detailed_voronoi.separations = [None] * len(self.structure)
 
-        # Loop on all the sites
+        site_parameters = {'all_cns': all_cns, 'min_cn': min_cn, 'max_cn': max_cn,
+                           'additional_conditions': additional_conditions, 'valences': valences,
+                           'get_from_hints': get_from_hints, 'recompute': do_recompute,
+                           'optimization': optimization}
+        isites = []
         for isite in range(len(self.structure)):
             if isite not in sites_indices:
                 logging.debug(' ... in site #{:d}/{:d} ({}) : '
                               'skipped'.format(isite, len(self.structure),
                                                self.structure[isite].species_string))
-                continue
-            if breakit:
-                logging.debug(' ... in site #{:d}/{:d} ({}) : '
-                              'skipped (timelimit)'.format(isite, len(self.structure),
-                                                           self.structure[isite].species_string))
-                continue
-            logging.debug(' ... in site #{:d}/{:d} ({})'.format(isite, len(self.structure),
-                                                                self.structure[isite].species_string))
-            t1 = time.process_time()
-            if optimization > 0:
-                self.detailed_voronoi.local_planes[isite] = OrderedDict()
-                self.detailed_voronoi.separations[isite] = {}
-            se.init_neighbors_sets(isite=isite, additional_conditions=additional_conditions, valences=valences)
+            else:
+                isites.append(isite)
 
-            to_add_from_hints = []
-            nb_sets_info = {}
+        # Variables used for checking timelimit
+        max_time_one_site = 0.0
+        breakit = False
 
-            for cn, nb_sets in se.neighbors_sets[isite].items():
-                if cn not in all_cns:
+        # Identical neighbors sets share their continuous symmetry measures, which are memoized for the time of
+        # this computation. The neighbors sets are compared by their coordinates relative to the central site, so
+        # only sites equivalent by a lattice translation (e.g. in a supercell) hit the cache.
+        self._csm_cache = {}
+        try:
+            if ncpus and ncpus > 1 and len(isites) > 1:
+                self._parallel_compute_site_environments(se=se, isites=isites, ncpus=ncpus, timelimit=timelimit,
+                                                         time_init=time_init, site_parameters=site_parameters)
+                isites = []
+
+            # Loop on all the sites
+            for isite in isites:
+                if breakit:
+                    logging.debug(' ... in site #{:d}/{:d} ({}) : '
+                                  'skipped (timelimit)'.format(isite, len(self.structure),
+                                                               self.structure[isite].species_string))
                     continue
-                for inb_set, nb_set in enumerate(nb_sets):
-                    logging.debug('    ... getting environments for nb_set ({:d}, {:d})'.format(cn, inb_set))
-                    tnbset1 = time.process_time()
-                    ce = self.update_nb_set_environments(se=se, isite=isite, cn=cn, inb_set=inb_set, nb_set=nb_set,
-                                                         recompute=do_recompute, optimization=optimization)
-                    tnbset2 = time.process_time()
-                    if cn not in nb_sets_info:
-                        nb_sets_info[cn] = {}
-                    nb_sets_info[cn][inb_set] = {'time': tnbset2 - tnbset1}
-                    if get_from_hints:
-                        for cg_symbol, cg_dict in ce:
-                            cg = self.allcg[cg_symbol]
-                            # Get possibly missing neighbors sets
-                            if cg.neighbors_sets_hints is None:
-                                continue
-                            logging.debug('       ... getting hints from cg with mp_symbol "{}" ...'.format(cg_symbol))
-                            hints_info = {'csm': cg_dict['symmetry_measure'],
-                                          'nb_set': nb_set,
-                                          'permutation': cg_dict['permutation']}
-                            for nb_sets_hints in cg.neighbors_sets_hints:
-                                suggested_nb_set_voronoi_indices = nb_sets_hints.hints(hints_info)
-                                for inew, new_nb_set_voronoi_indices in enumerate(suggested_nb_set_voronoi_indices):
-                                    logging.debug('           hint # {:d}'.format(inew))
-                                    new_nb_set = se.NeighborsSet(structure=se.structure, isite=isite,
-                                                                 detailed_voronoi=se.voronoi,
-                                                                 site_voronoi_indices=new_nb_set_voronoi_indices,
-                                                                 sources={'origin': 'nb_set_hints',
-                                                                          'hints_type': nb_sets_hints.hints_type,
-                                                                          'suggestion_index': inew,
-                                                                          'cn_map_source': [cn, inb_set],
-                                                                          'cg_source_symbol': cg_symbol})
-                                    cn_new_nb_set = len(new_nb_set)
-                                    if max_cn is not None and cn_new_nb_set > max_cn:
-                                        continue
-                                    if min_cn is not None and cn_new_nb_set < min_cn:
-                                        continue
-                                    if new_nb_set in [ta['new_nb_set'] for ta in to_add_from_hints]:
-                                        has_nb_set = True
-                                    elif cn_new_nb_set not in se.neighbors_sets[isite]:
-                                        has_nb_set = False
-                                    else:
-                                        has_nb_set = new_nb_set in se.neighbors_sets[isite][cn_new_nb_set]
-                                    if not has_nb_set:
-                                        to_add_from_hints.append({'isite': isite,
-                                                                  'new_nb_set': new_nb_set,
-                                                                  'cn_new_nb_set': cn_new_nb_set})
-                                        logging.debug('              => to be computed')
-                                    else:
-                                        logging.debug('              => already present')
-            logging.debug('    ... getting environments for nb_sets added from hints')
-            for missing_nb_set_to_add in to_add_from_hints:
-                se.add_neighbors_set(isite=isite, nb_set=missing_nb_set_to_add['new_nb_set'])
-            for missing_nb_set_to_add in to_add_from_hints:
-                isite_new_nb_set = missing_nb_set_to_add['isite']
-                cn_new_nb_set = missing_nb_set_to_add['cn_new_nb_set']
-                new_nb_set = missing_nb_set_to_add['new_nb_set']
-                inew_nb_set = se.neighbors_sets[isite_new_nb_set][cn_new_nb_set].index(new_nb_set)
-                logging.debug('    ... getting environments for nb_set ({:d}, {:d}) - '
-                              'from hints'.format(cn_new_nb_set, inew_nb_set))
+                logging.debug(' ... in site #{:d}/{:d} ({})'.format(isite, len(self.structure),
+                                                                    self.structure[isite].species_string))
+                t1 = time.process_time()
+                self._compute_site_environments(se=se, isite=isite, **site_parameters)
+                t2 = time.process_time()
+                if timelimit is not None:
+                    time_elapsed = t2 - time_init
+                    time_left = timelimit - time_elapsed
+                    if time_left < 2.0 * max_time_one_site:
+                        breakit = True
+                max_time_one_site = max(max_time_one_site, t2 - t1)
+                logging.debug('    ... computed in {:.2f} seconds'.format(t2 - t1))
+        finally:
+            self._csm_cache = None
+        time_end = time.process_time()
+        logging.debug('    ... compute_structure_environments ended in {:.2f} seconds'.format(time_end - time_init))
+        return se
+
+    def _compute_site_environments(self, se, isite, all_cns, min_cn, max_cn, additional_conditions, valences,
+                                   get_from_hints, recompute, optimization):
+        """
+        Computes the neighbors sets of a site and their coordination environments, see
+        compute_structure_environments for the parameters.
+        :param se: StructureEnvironments object to be updated
+        :param isite: Index of the site
+        """
+        t1 = time.process_time()
+        if optimization > 0:
+            self.detailed_voronoi.local_planes[isite] = OrderedDict()
+            self.detailed_voronoi.separations[isite] = {}
+        se.init_neighbors_sets(isite=isite, additional_conditions=additional_conditions, valences=valences)
+
+        to_add_from_hints = []
+        nb_sets_info = {}
+
+        for cn, nb_sets in se.neighbors_sets[isite].items():
+            if cn not in all_cns:
+                continue
+            for inb_set, nb_set in enumerate(nb_sets):
+                logging.debug('    ... getting environments for nb_set ({:d}, {:d})'.format(cn, inb_set))
                 tnbset1 = time.process_time()
-                self.update_nb_set_environments(se=se,
-                                                isite=isite_new_nb_set,
-                                                cn=cn_new_nb_set,
-                                                inb_set=inew_nb_set,
-                                                nb_set=new_nb_set,
-                                                optimization=optimization)
+                ce = self.update_nb_set_environments(se=se, isite=isite, cn=cn, inb_set=inb_set, nb_set=nb_set,
+                                                     recompute=recompute, optimization=optimization)
                 tnbset2 = time.process_time()
                 if cn not in nb_sets_info:
                     nb_sets_info[cn] = {}
-                nb_sets_info[cn][inew_nb_set] = {'time': tnbset2 - tnbset1}
-            t2 = time.process_time()
-            se.update_site_info(isite=isite, info_dict={'time': t2 - t1, 'nb_sets_info': nb_sets_info})
-            if timelimit is not None:
-                time_elapsed = t2 - time_init
-                time_left = timelimit - time_elapsed
-                if time_left < 2.0 * max_time_one_site:
-                    breakit = True
-            max_time_one_site = max(max_time_one_site, t2 - t1)
-            logging.debug('    ... computed in {:.2f} seconds'.format(t2 - t1))
-        time_end = time.process_time()
-        logging.debug('    ... compute_structure_environments ended in {:.2f} seconds'.format(time_end - time_init))
-        return se
+                nb_sets_info[cn][inb_set] = {'time': tnbset2 - tnbset1}
+                if get_from_hints:
+                    for cg_symbol, cg_dict in ce:
+                        cg = self.allcg[cg_symbol]
+                        # Get possibly missing neighbors sets
+                        if cg.neighbors_sets_hints is None:
+                            continue
+                        logging.debug('       ... getting hints from cg with mp_symbol "{}" ...'.format(cg_symbol))
+                        hints_info = {'csm': cg_dict['symmetry_measure'],
+                                      'nb_set': nb_set,
+                                      'permutation': cg_dict['permutation']}
+                        for nb_sets_hints in cg.neighbors_sets_hints:
+                            suggested_nb_set_voronoi_indices = nb_sets_hints.hints(hints_info)
+                            for inew, new_nb_set_voronoi_indices in enumerate(suggested_nb_set_voronoi_indices):
+                                logging.debug('           hint # {:d}'.format(inew))
+                                new_nb_set = se.NeighborsSet(structure=se.structure, isite=isite,
+                                                             detailed_voronoi=se.voronoi,
+                                                             site_voronoi_indices=new_nb_set_voronoi_indices,
+                                                             sources={'origin': 'nb_set_hints',
+                                                                      'hints_type': nb_sets_hints.hints_type,
+                                                                      'suggestion_index': inew,
+                                                                      'cn_map_source': [cn, inb_set],
+                                                                      'cg_source_symbol': cg_symbol})
+                                cn_new_nb_set = len(new_nb_set)
+                                if max_cn is not None and cn_new_nb_set > max_cn:
+                                    continue
+                                if min_cn is not None and cn_new_nb_set < min_cn:
+                                    continue
+                                if new_nb_set in [ta['new_nb_set'] for ta in to_add_from_hints]:
+                                    has_nb_set = True
+                                elif cn_new_nb_set not in se.neighbors_sets[isite]:
+                                    has_nb_set = False
+                                else:
+                                    has_nb_set = new_nb_set in se.neighbors_sets[isite][cn_new_nb_set]
+                                if not has_nb_set:
+                                    to_add_from_hints.append({'isite': isite,
+                                                              'new_nb_set': new_nb_set,
+                                                              'cn_new_nb_set': cn_new_nb_set})
+                                    logging.debug('              => to be computed')
+                                else:
+                                    logging.debug('              => already present')
+        logging.debug('    ... getting environments for nb_sets added from hints')
+        for missing_nb_set_to_add in to_add_from_hints:
+            se.add_neighbors_set(isite=isite, nb_set=missing_nb_set_to_add['new_nb_set'])
+        for missing_nb_set_to_add in to_add_from_hints:
+            isite_new_nb_set = missing_nb_set_to_add['isite']
+            cn_new_nb_set = missing_nb_set_to_add['cn_new_nb_set']
+            new_nb_set = missing_nb_set_to_add['new_nb_set']
+            inew_nb_set = se.neighbors_sets[isite_new_nb_set][cn_new_nb_set].index(new_nb_set)
+            logging.debug('    ... getting environments for nb_set ({:d}, {:d}) - '
+                          'from hints'.format(cn_new_nb_set, inew_nb_set))
+            tnbset1 = time.process_time()
+            self.update_nb_set_environments(se=se,
+                                            isite=isite_new_nb_set,
+                                            cn=cn_new_nb_set,
+                                            inb_set=inew_nb_set,
+                                            nb_set=new_nb_set,
+                                            optimization=optimization)
+            tnbset2 = time.process_time()
+            if cn not in nb_sets_info:
+                nb_sets_info[cn] = {}
+            nb_sets_info[cn][inew_nb_set] = {'time': tnbset2 - tnbset1}
+        t2 = time.process_time()
+        se.update_site_info(isite=isite, info_dict={'time': t2 - t1, 'nb_sets_info': nb_sets_info})
+
+    def _parallel_compute_site_environments(self, se, isites, ncpus, timelimit, time_init, site_parameters):
+        """
+        Computes the environments of the given sites in worker processes, each of them computing all the
+        environments of a site. The sites whose environments are not received within the time limit are skipped.
+        :param se: StructureEnvironments object to be updated
+        :param isites: Indices of the sites
+        :param ncpus: Number of processes
+        :param timelimit: Time limit (in secs), or None
+        :param time_init: Process time at the start of compute_structure_environments
+        :param site_parameters: Parameters of _compute_site_environments
+        """
+        # The worker processes run in parallel with the main one, whose process time is thus completed with
+        # the elapsed time
+        time_parallel = time.perf_counter()
+        time_elapsed_init = time.process_time() - time_init
+        max_time_one_site = 0.0
+        with Pool(min(ncpus, len(isites)), initializer=_init_environments_worker,
+                  initargs=(self, se, site_parameters)) as pool:
+            for isite, nb_sets, ces, site_info in pool.imap(_compute_site_environments, isites):
+                se.neighbors_sets[isite] = {
+                    cn: [se.NeighborsSet.from_dict(dd=nb_set_dict, structure=se.structure, detailed_voronoi=se.voronoi)
+                         for nb_set_dict in cn_nb_sets]
+                    for cn, cn_nb_sets in nb_sets.items()}
+                se.ce_list[isite] = ces
+                se.update_site_info(isite=isite, info_dict=site_info)
+                logging.debug(' ... site #{:d}/{:d} ({}) computed in {:.2f} seconds'.format(
+                    isite, len(self.structure), self.structure[isite].species_string, site_info['time']))
+                max_time_one_site = max(max_time_one_site, site_info['time'])
+                if timelimit is not None:
+                    time_elapsed = time_elapsed_init + time.perf_counter() - time_parallel
+                    if timelimit - time_elapsed < 2.0 * max_time_one_site:
+                        logging.debug(' ... remaining sites skipped (timelimit)')
+                        break
 
     def update_nb_set_environments(self, se, isite, cn, inb_set, nb_set, recompute=False, optimization=None):
         """
@@ -786,14 +890,31 @@ class LocalGeometryFinder:
         else:
             neighb_coords = nb_set.neighb_coords
         self.setup_local_geometry(isite, coords=neighb_coords, optimization=optimization)
-        if optimization > 0:
-            logging.debug('Getting StructureEnvironments with optimized algorithm')
-            nb_set.local_planes = OrderedDict()
-            nb_set.separations = {}
-            cncgsm = self.get_coordination_symmetry_measures_optim(nb_set=nb_set, optimization=optimization)
+        csm_key = None
+        if self._csm_cache is not None:
+            # The neighbors are compared relative to the central site, sorted as their order in the neighbors sets
+            # of equivalent sites may differ (adding 0.0 gets rid of negative zeros)
+            local_coords = np.around(self.local_geometry.points_wocs_csc(), 8) + 0.0
+            order = np.lexsort(local_coords.T[::-1])
+            csm_key = (optimization, local_coords[order].tobytes())
+        if csm_key is not None and csm_key in self._csm_cache:
+            logging.debug('Getting StructureEnvironments from an identical neighbors set')
+            cncgsm, bare_centre, cached_order = self._csm_cache[csm_key]
+            local_indices = np.empty(len(order), dtype=int)
+            local_indices[cached_order] = order
+            cncgsm = self._transfer_symmetry_measures(cncgsm, translation=self.local_geometry.bare_centre - bare_centre,
+                                                      local_indices=local_indices.tolist())
         else:
-            logging.debug('Getting StructureEnvironments with standard algorithm')
-            cncgsm = self.get_coordination_symmetry_measures()
+            if optimization > 0:
+                logging.debug('Getting StructureEnvironments with optimized algorithm')
+                nb_set.local_planes = OrderedDict()
+                nb_set.separations = {}
+                cncgsm = self.get_coordination_symmetry_measures_optim(nb_set=nb_set, optimization=optimization)
+            else:
+                logging.debug('Getting StructureEnvironments with standard algorithm')
+                cncgsm = self.get_coordination_symmetry_measures()
+            if csm_key is not None:
+                self._csm_cache[csm_key] = (cncgsm, self.local_geometry.bare_centre, order)
         for cg in cncgsm:
             other_csms = {
                 'csm_wocs_ctwocc': cncgsm[cg]['csm_wocs_ctwocc'],
@@ -837,6 +958,31 @@ class LocalGeometryFinder:
         se.update_coordination_environments(isite=isite, cn=cn, nb_set=nb_set, ce=ce)
         return ce
 
+    @staticmethod
+    def _transfer_symmetry_measures(cncgsm, translation, local_indices):
+        """
+        Transfers the continuous symmetry measures of a local geometry to an identical local geometry, i.e. to the
+        same neighbors translated and possibly in another order.
+        :param cncgsm: Continuous symmetry measures, as returned by get_coordination_symmetry_measures
+        :param translation: Translation vector from the original local geometry to the new one
+        :param local_indices: Index in the new local geometry of each neighbor of the original one
+        :return: The continuous symmetry measures of the new local geometry
+        """
+        cncgsm = deepcopy(cncgsm)
+        for cgsm in cncgsm.values():
+            for key, value in cgsm.items():
+                if key.startswith('translation_vector') and value is not None:
+                    cgsm[key] = value + translation
+            if isinstance(cgsm['indices'], np.ndarray):
+                cgsm['indices'] = np.take(local_indices, cgsm['indices'])
+            else:
+                cgsm['indices'] = [local_indices[ii] for ii in cgsm['indices']]
+            cgsm['local2perfect_map'] = {local_indices[ii]: iperfect
+                                         for ii, iperfect in cgsm['local2perfect_map'].items()}
+            cgsm['perfect2local_map'] = {iperfect: local_indices[ii]
+                                         for iperfect, ii in cgsm['perfect2local_map'].items()}
+        return cncgsm
+
     def setup_local_geometry(self, isite, coords, optimization=None):
         """
         Sets up the AbstractGeometry for the local geometry of site with index isite.
@@ -1304,7 +1450,6 @@ class LocalGeometryFinder:
         # permutations_symmetry_measures = np.zeros(len(algo.permutations),
         #                                           np.float)
         if optimization == 2:
-            permutations_symmetry_measures = [None] * len(algo.permutations)
             permutations = list()
             algos = list()
             local2perfect_maps = list()
@@ -1319,19 +1464,11 @@ class LocalGeometryFinder:
                     local2perfect_map[ii] = iperfect
                 local2perfect_maps.append(local2perfect_map)
                 perfect2local_maps.append(perfect2local_map)
-
-                points_distorted = self.local_geometry.points_wcs_ctwcc(
-                    permutation=perm)
-
-                sm_info = symmetry_measure(points_distorted=points_distorted,
-                                           points_perfect=points_perfect)
-                sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-                permutations_symmetry_measures[iperm] = sm_info
                 algos.append(str(algo))
+            permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                                  points_perfect=points_perfect)
             return permutations_symmetry_measures, permutations, algos, local2perfect_maps, perfect2local_maps
         else:
-            permutations_symmetry_measures = [None] * len(algo.permutations)
             permutations = list()
             algos = list()
             local2perfect_maps = list()
@@ -1346,16 +1483,9 @@ class LocalGeometryFinder:
                     local2perfect_map[ii] = iperfect
                 local2perfect_maps.append(local2perfect_map)
                 perfect2local_maps.append(perfect2local_map)
-
-                points_distorted = self.local_geometry.points_wcs_ctwcc(
-                    permutation=perm)
-
-                sm_info = symmetry_measure(points_distorted=points_distorted,
-                                           points_perfect=points_perfect)
-                sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-                permutations_symmetry_measures[iperm] = sm_info
                 algos.append(str(algo))
+            permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                                  points_perfect=points_perfect)
             return permutations_symmetry_measures, permutations, algos, local2perfect_maps, perfect2local_maps
 
     def coordination_geometry_symmetry_measures_separation_plane(self,
@@ -1676,14 +1806,8 @@ class LocalGeometryFinder:
                 if testing:
                     separation_permutations.append(sep_perm)
 
-                points_distorted = self.local_geometry.points_wcs_ctwcc(
-                    permutation=pp)
-
-                sm_info = symmetry_measure(points_distorted=points_distorted,
-                                           points_perfect=points_perfect)
-                sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-                permutations_symmetry_measures.append(sm_info)
+            permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                                  points_perfect=points_perfect)
             if plane_found:
                 break
         if len(permutations_symmetry_measures) > 0:
@@ -1711,7 +1835,6 @@ class LocalGeometryFinder:
                                         separation_indices=None):
         argref_separation = sepplane.argsorted_ref_separation_perm
         permutations = []
-        permutations_symmetry_measures = []
         stop_search = False
         # TODO: do not do that several times ... also keep in memory
         if sepplane.ordered_plane:
@@ -1758,15 +1881,8 @@ class LocalGeometryFinder:
 
             permutations.append(pp)
 
-            points_distorted = self.local_geometry.points_wcs_ctwcc(
-                permutation=pp)
-
-            sm_info = symmetry_measure(points_distorted=points_distorted,
-                                       points_perfect=points_perfect)
-
-            sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-            permutations_symmetry_measures.append(sm_info)
+        permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                              points_perfect=points_perfect)
 
         if len(permutations_symmetry_measures) > 0:
             return permutations_symmetry_measures, permutations, [sepplane.algorithm_type] * len(
@@ -1781,7 +1897,6 @@ class LocalGeometryFinder:
                                         separation_indices=None):
         argref_separation = sepplane.argsorted_ref_separation_perm
         permutations = []
-        permutations_symmetry_measures = []
         stop_search = False
         # TODO: do not do that several times ... also keep in memory
         if sepplane.ordered_plane:
@@ -1830,15 +1945,8 @@ class LocalGeometryFinder:
 
             permutations.append(pp)
 
-            points_distorted = self.local_geometry.points_wcs_ctwcc(
-                permutation=pp)
-
-            sm_info = symmetry_measure(points_distorted=points_distorted,
-                                       points_perfect=points_perfect)
-
-            sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-            permutations_symmetry_measures.append(sm_info)
+        permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                              points_perfect=points_perfect)
 
         if len(permutations_symmetry_measures) > 0:
             return permutations_symmetry_measures, permutations, [sepplane.algorithm_type] * len(
@@ -1846,6 +1954,27 @@ class LocalGeometryFinder:
         else:
             return [], [], [], stop_search
 
+    def _permutations_symmetry_measures(self, permutations, points_perfect):
+        """
+        Computes at once the symmetry measures of the local geometry for a list of permutations of its neighbors.
+        :param permutations: Permutations of the neighbors of the local geometry
+        :param points_perfect: Perfect points of the coordination geometry
+        :return: List of the symmetry measures info (symmetry measure, scaling factor, rotation matrix and
+            translation vector) of each permutation
+        """
+        if len(permutations) == 0:
+            return []
+        points_wcs = self.local_geometry.points_wcs_ctwcc()
+        points_distorted = np.concatenate(
+            (np.broadcast_to(points_wcs[0], (len(permutations), 1, 3)),
+             self.local_geometry.points_wocs_ctwcc().take(np.array(permutations, dtype=int), axis=0)), axis=1)
+        sms = symmetry_measures(points_distorted=points_distorted, points_perfect=points_perfect)
+        return [{'symmetry_measure': sms['symmetry_measure'][iperm],
+                 'scaling_factor': sms['scaling_factor'][iperm],
+                 'rotation_matrix': sms['rotation_matrix'][iperm],
+                 'translation_vector': self.local_geometry.centroid_with_centre}
+                for iperm in range(len(permutations))]
+
     def coordination_geometry_symmetry_measures_fallback_random(self,
                                                                 coordination_geometry,
                                                                 NRANDOM=10,
@@ -1885,3 +2014,23 @@ class LocalGeometryFinder:
             permutations_symmetry_measures[iperm] = sm_info
             algos.append('APPROXIMATE_FALLBACK')
         return permutations_symmetry_measures, permutations, algos, local2perfect_maps, perfect2local_maps
+
+
+def _init_environments_worker(local_geometry_finder, structure_environments, site_parameters):
+    """
+    Initializes the LocalGeometryFinder and the StructureEnvironments of a worker process.
+    """
+    global _environments_worker
+    _environments_worker = (local_geometry_finder, structure_environments, site_parameters)
+
+
+def _compute_site_environments(isite):
+    """
+    Computes the environments of a site in a worker process. Returns the index of the site, its neighbors sets
+    (as dicts, to avoid sending their DetailedVoronoiContainer), its coordination environments and its info.
+    """
+    lgf, se, site_parameters = _environments_worker
+    lgf._compute_site_environments(se=se, isite=isite, **site_parameters)
+    nb_sets = {cn: [nb_set.as_dict() for nb_set in cn_nb_sets]
+               for cn, cn_nb_sets in se.neighbors_sets[isite].items()}
+    return isite, nb_sets, se.ce_list[isite], se.info['sites_info'][isite]
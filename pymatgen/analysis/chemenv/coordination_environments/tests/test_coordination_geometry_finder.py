@@ -6,12 +6,16 @@ __author__ = 'waroquiers'
 import unittest
 import os
 import numpy as np
+from unittest.mock import patch
 from pymatgen.util.testing import PymatgenTest
+from pymatgen.core.lattice import Lattice
+from pymatgen.core.structure import Structure
 
 from pymatgen.analysis.chemenv.coordination_environments.coordination_geometry_finder import LocalGeometryFinder
 from pymatgen.analysis.chemenv.coordination_environments.coordination_geometries import AllCoordinationGeometries
 from pymatgen.analysis.chemenv.coordination_environments.coordination_geometry_finder import AbstractGeometry
 from pymatgen.analysis.chemenv.coordination_environments.coordination_geometry_finder import symmetry_measure
+from pymatgen.analysis.chemenv.coordination_environments.coordination_geometry_finder import symmetry_measures
 
 json_files_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "..",
                               'test_files', "chemenv", "json_test_files")
@@ -101,6 +105,21 @@ class CoordinationGeometryFinderTest(PymatgenTest):
         for perm_csm_dict in permutations_symmetry_measures:
             self.assertAlmostEqual(perm_csm_dict['symmetry_measure'], 0.140355832317)
 
+    def test_symmetry_measures(self):
+        points_perfect = np.array(self.lgf.allcg['O:6'].points)
+        points_perfect = points_perfect - np.mean(points_perfect, axis=0)
+        rng = np.random.RandomState(0)
+        points = points_perfect + 0.1 * rng.rand(6, 3)
+        perms = [rng.permutation(6) for _ in range(20)]
+        sms = symmetry_measures(points.take(perms, axis=0), points_perfect)
+        for iperm, perm in enumerate(perms):
+            sm = symmetry_measure(points.take(perm, axis=0), points_perfect)
+            self.assertAlmostEqual(sms['symmetry_measure'][iperm], sm['symmetry_measure'])
+            self.assertAlmostEqual(sms['scaling_factor'][iperm], sm['scaling_factor'])
+            self.assertArrayAlmostEqual(sms['rotation_matrix'][iperm], sm['rotation_matrix'])
+        self.assertArrayAlmostEqual(symmetry_measures([[[0.0, 0.0, 0.0]]] * 2, [[1.1, 2.2, 3.3]])['symmetry_measure'],
+                                    [0.0, 0.0])
+
     #
     # def _strategy_test(self, strategy):
     #     files = []
@@ -210,6 +229,37 @@ class CoordinationGeometryFinderTest(PymatgenTest):
         self.assertAlmostEqual(se_hints.ce_list[0][13][0], se_nohints.ce_list[0][13][0])
         self.assertTrue(set(se_nohints.ce_list[0].keys()).issubset(set(se_hints.ce_list[0].keys())))
 
+    def test_identical_and_parallel_environments(self):
+        structure = Structure(Lattice.cubic(4.0), ['Cs', 'Cl'], [[0.0, 0.0, 0.0], [0.5, 0.5, 0.5]])
+        structure.make_supercell([2, 1, 1])
+        self.lgf.setup_structure(structure)
+        with patch.object(self.lgf, 'get_coordination_symmetry_measures_optim',
+                          wraps=self.lgf.get_coordination_symmetry_measures_optim) as csms:
+            se = self.lgf.compute_structure_environments(maximum_distance_factor=1.2, min_cn=8, max_cn=8,
+                                                         only_symbols=['C:8', 'SA:8'])
+        # All the sites have the same (translated) environment
+        self.assertEqual(csms.call_count, 1)
+        self.assertIsNone(self.lgf._csm_cache)
+        for isite in range(len(structure)):
+            self.assertAlmostEqual(se.get_csm(isite, 'C:8')['symmetry_measure'], 0.0, delta=1e-8)
+            self.assertGreater(se.get_csm(isite, 'SA:8')['symmetry_measure'], 1.0)
+            self.assertEqual(sorted(se.get_csm(isite, 'C:8')['permutation']), list(range(8)))
+
+        se_parallel = self.lgf.compute_structure_environments(maximum_distance_factor=1.2, min_cn=8, max_cn=8,
+                                                              only_symbols=['C:8', 'SA:8'],
+                                                              ncpus=2)
+        for isite in range(len(structure)):
+            self.assertEqual(se_parallel.neighbors_sets[isite], se.neighbors_sets[isite])
+            for mp_symbol in ['C:8', 'SA:8']:
+                self.assertAlmostEqual(se_parallel.get_csm(isite, mp_symbol)['symmetry_measure'],
+                                       se.get_csm(isite, mp_symbol)['symmetry_measure'])
+
+        # The memoized measures are dropped when the computation fails
+        with patch.object(self.lgf, '_compute_site_environments', side_effect=RuntimeError):
+            self.assertRaises(RuntimeError, self.lgf.compute_structure_environments,
+                              maximum_distance_factor=1.2, min_cn=8, max_cn=8)
+        self.assertIsNone(self.lgf._csm_cache)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -19,6 +19,7 @@ citing the following papers::
 """
 
 
+import itertools
 import warnings
 import multiprocessing
 
@@ -30,7 +31,7 @@ from monty.json import MSONable
 from pymatgen.analysis.structure_matcher import StructureMatcher, OrderDisorderElementComparator
 from pymatgen.core.periodic_table import get_el_sp
 from pymatgen.core.structure import Structure
-from pymatgen.io.vasp.outputs import Vasprun
+from pymatgen.io.vasp.outputs import Vasprun, Xdatcar
 from pymatgen.util.coord import pbc_diff
 
 
@@ -579,38 +580,63 @@ class DiffusionAnalyzer(MSONable):
             \\*\\*kwargs: kwargs supported by the :class:`DiffusionAnalyzer`_.
                 Examples include smoothed, min_obs, avg_nsteps.
         """
-        p, l = [], []
-        for i, s in enumerate(structures):
-            if i == 0:
-                structure = s
-            p.append(np.array(s.frac_coords)[:, None])
-            l.append(s.lattice.matrix)
+        structures = iter(structures)
+        structure = next(structures)
+        frames = ((s.frac_coords, s.lattice.matrix)
+                  for s in itertools.chain([structure], structures))
         if initial_structure is not None:
-            p.insert(0, np.array(initial_structure.frac_coords)[:, None])
-            l.insert(0, initial_structure.lattice.matrix)
+            initial_frame = (initial_structure.frac_coords,
+                             initial_structure.lattice.matrix)
         else:
-            p.insert(0, p[0])
-            l.insert(0, l[0])
-
-        p = np.concatenate(p, axis=1)
-        dp = p[:, 1:] - p[:, :-1]
-        dp = dp - np.round(dp)
-        f_disp = np.cumsum(dp, axis=1)
-        c_disp = []
-        for i in f_disp:
-            c_disp.append([np.dot(d, m) for d, m in zip(i, l[1:])])
-        disp = np.array(c_disp)
+            initial_frame = None
+        disp, l = cls._get_displacements(frames, initial_frame)
+        if initial_disp is not None:
+            disp += initial_disp[:, None, :]
+
+        return cls(structure, disp, specie, temperature, time_step,
+                   step_skip=step_skip, lattices=l, **kwargs)
+
+    @staticmethod
+    def _get_displacements(frames, initial_frame=None):
+        """
+        Accumulates the cartesian displacements of the sites frame by frame, so
+        that frames can be streamed rather than held in memory.
+
+        Args:
+            frames: Iterable of (frac_coords, lattice matrix) of each frame.
+            initial_frame: (frac_coords, lattice matrix) from which the
+                displacements are computed. Defaults to the first frame.
+
+        Returns:
+            (displacements, lattices) with displacements of shape
+            (nsites, nframes, 3). If the lattice is constant (NVT-AIMD), only
+            a single lattice is returned.
+        """
+        disp, l = [], []
+        f_disp = 0
+        p_prev = None
+        if initial_frame is not None:
+            p_prev = np.array(initial_frame[0])
+            l.append(initial_frame[1])
+        for p, m in frames:
+            p = np.array(p)
+            if p_prev is None:
+                p_prev = p
+                l.append(m)
+            dp = p - p_prev
+            dp = dp - np.round(dp)
+            f_disp = f_disp + dp
+            disp.append(np.dot(f_disp, m))
+            l.append(m)
+            p_prev = p
+        disp = np.stack(disp, axis=1)
 
         # If is NVT-AIMD, clear lattice data.
         if np.array_equal(l[0], l[-1]):
             l = np.array([l[0]])
         else:
             l = np.array(l)
-        if initial_disp is not None:
-            disp += initial_disp[:, None, :]
-
-        return cls(structure, disp, specie, temperature, time_step,
-                   step_skip=step_skip, lattices=l, **kwargs)
+        return disp, l
 
     @classmethod
     def from_vaspruns(cls, vaspruns, specie, initial_disp=None,
@@ -730,6 +756,67 @@ class DiffusionAnalyzer(MSONable):
             vr(filepaths), specie=specie, initial_disp=initial_disp,
             initial_structure=initial_structure, **kwargs)
 
+    @classmethod
+    def from_xdatcars(cls, filepaths, specie, temperature, time_step,
+                      step_skip=10, initial_disp=None, initial_structure=None,
+                      **kwargs):
+        r"""
+        Convenient constructor that streams the frames of XDATCAR files to
+        perform diffusion analysis. Only the sampled frames are parsed and no
+        Structure is created per frame, so long runs can be analyzed without
+        holding the trajectory in memory.
+
+        Args:
+            filepaths ([str]): List of paths to XDATCAR files of runs (must be
+                ordered in sequence of MD simulation).
+            specie (Element/Specie): Specie to calculate diffusivity for as a
+                String. E.g., "Li".
+            temperature (float): Temperature of the diffusion run in Kelvin.
+            time_step (int): Time step between measurements.
+            step_skip (int): Sampling frequency of the displacements (
+                time_step is multiplied by this number to get the real time
+                between measurements)
+            initial_disp (np.ndarray): Sometimes, you need to iteratively
+                compute estimates of the diffusivity. This supplies an
+                initial displacement that will be added on to the initial
+                displacements. Note that this makes sense only when
+                smoothed=False.
+            initial_structure (Structure): Like initial_disp, this is used
+                for iterative computations of estimates of the diffusivity. You
+                typically need to supply both variables. This stipulates the
+                initial structure from which the current set of displacements
+                are computed.
+            \\*\\*kwargs: kwargs supported by the :class:`DiffusionAnalyzer`_.
+                Examples include smoothed, min_obs, avg_nsteps.
+        """
+
+        def get_frames(filepaths):
+            offset = 0
+            for filepath in filepaths:
+                nsteps = yield from Xdatcar.iter_frames(
+                    filepath, ionicstep_start=offset + 1,
+                    ionicstep_skip=step_skip)
+                # Recompute offset.
+                offset = (-(nsteps - offset)) % step_skip
+
+        frames = get_frames(filepaths)
+        first = next(frames)
+        structure = Structure(first.lattice, first.species, first.frac_coords)
+        if initial_structure is not None:
+            initial_frame = (initial_structure.frac_coords,
+                             initial_structure.lattice.matrix)
+        else:
+            initial_frame = None
+        disp, l = cls._get_displacements(
+            ((f.frac_coords, f.lattice)
+             for f in itertools.chain([first], frames)),
+            initial_frame)
+        if initial_disp is not None:
+            disp += initial_disp[:, None, :]
+
+        return cls(structure, disp, specie, temperature, time_step,
+                   step_skip=step_skip, lattices=l, **kwargs)
+
     def as_dict(self):
         """
         Returns: MSONable dict
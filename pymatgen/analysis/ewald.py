@@ -9,12 +9,15 @@ This module provides classes for calculating the ewald sum of a structure.
 from math import pi, sqrt, log
 from datetime import datetime
 from copy import deepcopy, copy
+from multiprocessing import Pool, Value
 from warnings import warn
 import bisect
+import logging
 from typing import Dict
 
 import numpy as np
 from scipy.special import erfc, comb
+from scipy.sparse import csr_matrix
 import scipy.constants as constants
 
 from monty.json import MSONable
@@ -30,6 +33,8 @@ __email__ = "shyuep@gmail.com"
 __status__ = "Production"
 __date__ = "Aug 1 2012"
 
+logger = logging.getLogger(__name__)
+
 
 class EwaldSummation(MSONable):
     """
@@ -118,7 +123,9 @@ class EwaldSummation(MSONable):
         self._initialized = False
         self._recip = None
         self._real, self._point = None, None
+        self._real_sparse = None
         self._forces = None
+        self._total_sums = None
 
         # Compute the correction for a charged cell
         self._charged_cell_energy = - EwaldSummation.CONV_FACT / 2 * np.pi / \
@@ -129,11 +136,13 @@ class EwaldSummation(MSONable):
         Gives total ewald energy for certain sites being removed, i.e. zeroed
         out.
         """
-        total_energy_matrix = self.total_energy_matrix.copy()
-        for i in removed_indices:
-            total_energy_matrix[i, :] = 0
-            total_energy_matrix[:, i] = 0
-        return sum(sum(total_energy_matrix))
+        matrix, row_sums, col_sums = self._get_total_energy_sums()
+        removed_indices = np.unique(np.array(removed_indices, dtype=int))
+        # Subtract the rows and columns of the removed sites, adding back
+        # their overlap which was subtracted twice.
+        return np.sum(row_sums) - np.sum(row_sums[removed_indices]) - \
+            np.sum(col_sums[removed_indices]) + \
+            np.sum(matrix[np.ix_(removed_indices, removed_indices)])
 
     def compute_sub_structure(self, sub_structure, tol=1e-3):
         """
@@ -148,7 +157,7 @@ class EwaldSummation(MSONable):
         Returns:
             Ewald sum of substructure.
         """
-        total_energy_matrix = self.total_energy_matrix.copy()
+        total_energy_matrix = self._get_total_energy_sums()[0]
 
         def find_match(site):
             for test_site in sub_structure:
@@ -161,17 +170,14 @@ class EwaldSummation(MSONable):
             return None
 
         matches = []
+        scaling_factors = np.zeros(len(self._s))
         for i, site in enumerate(self._s):
             matching_site = find_match(site)
             if matching_site:
                 new_charge = compute_average_oxidation_state(matching_site)
                 old_charge = self._oxi_states[i]
-                scaling_factor = new_charge / old_charge
+                scaling_factors[i] = new_charge / old_charge
                 matches.append(matching_site)
-            else:
-                scaling_factor = 0
-            total_energy_matrix[i, :] *= scaling_factor
-            total_energy_matrix[:, i] *= scaling_factor
 
         if len(matches) != len(sub_structure):
             output = ["Missing sites."]
@@ -180,7 +186,19 @@ class EwaldSummation(MSONable):
                     output.append("unmatched = {}".format(site))
             raise ValueError("\n".join(output))
 
-        return sum(sum(total_energy_matrix))
+        return np.dot(scaling_factors, np.dot(total_energy_matrix,
+                                              scaling_factors))
+
+    def _get_total_energy_sums(self):
+        """
+        The total energy matrix, and its row and column sums. Cached so that
+        energies of substructures do not need a copy of the matrix each.
+        """
+        if self._total_sums is None:
+            matrix = self.total_energy_matrix
+            self._total_sums = (matrix, np.sum(matrix, axis=1),
+                                np.sum(matrix, axis=0))
+        return self._total_sums
 
     @property
     def reciprocal_space_energy(self):
@@ -371,55 +389,89 @@ class EwaldSummation(MSONable):
         erecip *= prefactor * EwaldSummation.CONV_FACT * qiqj * 2 ** 0.5
         return erecip, forces
 
-    def _calc_real_and_point(self):
+    def _calc_real_pairs(self):
         """
-        Determines the self energy -(eta/pi)**(1/2) * sum_{i=1}^{N} q_i**2
+        Computes the real space energies of all pairs of sites within the
+        real space cutoff from a single neighbor list.
+
+        Returns:
+            (center_indices, points_indices, energies, forces), where the
+            energies are those of each pair (in units of q*q/r) and forces are
+            the real space forces on each site (in eV/A), or None if forces
+            are not computed.
         """
-        fcoords = self._s.frac_coords
-        forcepf = 2.0 * self._sqrt_eta / sqrt(pi)
-        coords = self._coords
         numsites = self._s.num_sites
-        ereal = np.empty((numsites, numsites), dtype=np.float)
-
-        forces = np.zeros((numsites, 3), dtype=np.float)
-
         qs = np.array(self._oxi_states)
+        centers, points, images, rij = self._s.get_neighbor_list(self._rmax)
 
-        epoint = - qs ** 2 * sqrt(self._eta / pi)
-
-        for i in range(numsites):
-            nfcoords, rij, js, _ = self._s.lattice.get_points_in_sphere(fcoords,
-                                                                        coords[i], self._rmax, zip_results=False)
+        # remove the rii terms
+        inds = rij > 1e-8
+        centers, points, images, rij = \
+            centers[inds], points[inds], images[inds], rij[inds]
 
-            # remove the rii term
-            inds = rij > 1e-8
-            js = js[inds]
-            rij = rij[inds]
-            nfcoords = nfcoords[inds]
+        qi = qs[centers]
+        qj = qs[points]
+        erfcval = erfc(self._sqrt_eta * rij)
+        energies = erfcval * qi * qj / rij
 
-            qi = qs[i]
-            qj = qs[js]
+        forces = None
+        if self._compute_forces:
+            forcepf = 2.0 * self._sqrt_eta / sqrt(pi)
+            nccoords = self._coords[points] + \
+                np.dot(images, self._s.lattice.matrix)
+            fijpf = qj / rij ** 3 * (erfcval + forcepf * rij *
+                                     np.exp(-self._eta * rij ** 2))
+            fij = (fijpf * qi * EwaldSummation.CONV_FACT)[:, None] * \
+                (self._coords[centers] - nccoords)
+            forces = np.zeros((numsites, 3))
+            for k in range(3):
+                forces[:, k] = np.bincount(centers, weights=fij[:, k],
+                                           minlength=numsites)
+        return centers, points, energies, forces
 
-            erfcval = erfc(self._sqrt_eta * rij)
-            new_ereals = erfcval * qi * qj / rij
+    def _calc_real_and_point(self):
+        """
+        Determines the self energy -(eta/pi)**(1/2) * sum_{i=1}^{N} q_i**2
+        """
+        numsites = self._s.num_sites
+        qs = np.array(self._oxi_states)
 
-            # insert new_ereals
-            for k in range(numsites):
-                ereal[k, i] = np.sum(new_ereals[js == k])
+        epoint = - qs ** 2 * sqrt(self._eta / pi)
 
-            if self._compute_forces:
-                nccoords = self._s.lattice.get_cartesian_coords(nfcoords)
+        centers, points, energies, forces = self._calc_real_pairs()
+        if forces is None:
+            forces = np.zeros((numsites, 3))
 
-                fijpf = qj / rij ** 3 * (erfcval + forcepf * rij *
-                                         np.exp(-self._eta * rij ** 2))
-                forces[i] += np.sum(np.expand_dims(fijpf, 1) *
-                                    (np.array([coords[i]]) - nccoords) *
-                                    qi * EwaldSummation.CONV_FACT, axis=0)
+        # Sum the pair energies into ereal[j, i]
+        ereal = np.bincount(points * numsites + centers, weights=energies,
+                            minlength=numsites ** 2)
+        ereal = ereal.reshape((numsites, numsites))
 
         ereal *= 0.5 * EwaldSummation.CONV_FACT
         epoint *= EwaldSummation.CONV_FACT
         return ereal, epoint, forces
 
+    @property
+    def real_space_energy_sparse_matrix(self):
+        """
+        The real space energy matrix as a scipy.sparse.csr_matrix, which
+        only holds the pairs of sites within the real space cutoff. It is
+        computed from the neighbor list directly, without building the dense
+        matrices, and is much smaller than real_space_energy_matrix for large
+        cells.
+        """
+        if self._real_sparse is None:
+            if self._real is not None:
+                self._real_sparse = csr_matrix(self._real)
+            else:
+                numsites = self._s.num_sites
+                centers, points, energies, _ = self._calc_real_pairs()
+                # Duplicate entries of periodic images are summed
+                self._real_sparse = csr_matrix(
+                    (energies * 0.5 * EwaldSummation.CONV_FACT, (points, centers)),
+                    shape=(numsites, numsites))
+        return self._real_sparse
+
     @property
     def eta(self):
         """
@@ -492,6 +544,133 @@ class EwaldSummation(MSONable):
         return summation
 
 
+class EwaldEnergyUpdater:
+    """
+    Tracks the Ewald energy of a structure as the charges of its sites are
+    changed, e.g. to swap or remove sites when sampling orderings on the
+    sites of a parent lattice by Monte Carlo. The total energy matrix of the
+    parent structure is divided by the charges of the sites to give the
+    interactions between unit charges, from which the energy change of a
+    move affecting k sites costs O(k^2), and applying the move O(kN).
+
+    The energies include the charged cell energy, as in
+    EwaldSummation.total_energy.
+    """
+
+    def __init__(self, ewald_summation, charges=None):
+        """
+        Args:
+            ewald_summation (EwaldSummation): Ewald sum of the parent
+                structure. All its sites must be charged.
+            charges ([float]): Initial charges of the sites. Defaults to the
+                oxidation states of the parent structure.
+        """
+        oxi_states = np.array(ewald_summation._oxi_states, dtype=float)
+        if np.any(np.abs(oxi_states) < 1e-8):
+            raise ValueError("All sites of the parent structure must be "
+                             "charged.")
+        interactions = ewald_summation.total_energy_matrix / \
+            np.outer(oxi_states, oxi_states)
+        self._interactions = (interactions + interactions.T) / 2
+        self._charged_cell_factor = - EwaldSummation.CONV_FACT / 2 * np.pi / \
+            ewald_summation._vol / ewald_summation.eta
+        self._charges = oxi_states if charges is None else \
+            np.array(charges, dtype=float)
+        if self._charges.shape != oxi_states.shape:
+            raise ValueError("One charge per site is needed.")
+        # Potential of the charges at each site
+        self._potentials = np.dot(self._interactions, self._charges)
+        self._total_charge = np.sum(self._charges)
+        self._energy = np.dot(self._charges, self._potentials) + \
+            self._charged_cell_factor * self._total_charge ** 2
+
+    @property
+    def charges(self):
+        """
+        The current charges of the sites.
+        """
+        return self._charges.copy()
+
+    @property
+    def energy(self):
+        """
+        The current total energy.
+        """
+        return self._energy
+
+    def get_energy_change(self, indices, charges):
+        """
+        Computes the change in energy if the charges of some sites were
+        changed.
+
+        Args:
+            indices ([int]): Indices of the sites to change. Must be unique.
+            charges ([float]): New charges of the sites.
+
+        Returns:
+            Change in the total energy.
+        """
+        indices = np.array(indices, dtype=int)
+        if len(np.unique(indices)) != len(indices):
+            raise ValueError("Indices must be unique.")
+        dq = np.array(charges, dtype=float) - self._charges[indices]
+        de = 2 * np.dot(dq, self._potentials[indices]) + \
+            np.dot(dq, np.dot(self._interactions[np.ix_(indices, indices)], dq))
+        total_charge = self._total_charge + np.sum(dq)
+        return de + self._charged_cell_factor * \
+            (total_charge ** 2 - self._total_charge ** 2)
+
+    def get_swap_energy(self, i, j):
+        """
+        Computes the change in energy if the charges of two sites were
+        swapped.
+
+        Args:
+            i (int): Index of the first site.
+            j (int): Index of the second site.
+
+        Returns:
+            Change in the total energy.
+        """
+        if i == j:
+            return 0
+        return self.get_energy_change([i, j], self._charges[[j, i]])
+
+    def get_removal_energy(self, indices):
+        """
+        Computes the change in energy if some sites were removed, i.e. their
+        charges zeroed out.
+
+        Args:
+            indices ([int]): Indices of the sites to remove.
+
+        Returns:
+            Change in the total energy.
+        """
+        indices = np.unique(np.array(indices, dtype=int))
+        return self.get_energy_change(indices, np.zeros(len(indices)))
+
+    def update(self, indices, charges):
+        """
+        Changes the charges of some sites.
+
+        Args:
+            indices ([int]): Indices of the sites to change. Must be unique.
+            charges ([float]): New charges of the sites.
+
+        Returns:
+            Change in the total energy.
+        """
+        de = self.get_energy_change(indices, charges)
+        indices = np.array(indices, dtype=int)
+        dq = np.array(charges, dtype=float) - self._charges[indices]
+        self._potentials += np.dot(dq, self._interactions[indices])
+        self._charges[indices] += dq
+        self._total_charge += np.sum(dq)
+        self._energy += de
+        return de
+
+
 class EwaldMinimizer:
     """
     This class determines the manipulations that will minimize an ewald matrix,
@@ -521,7 +700,8 @@ class EwaldMinimizer:
     """
     ALGO_TIME_LIMIT = 3
 
-    def __init__(self, matrix, m_list, num_to_return=1, algo=ALGO_FAST):
+    def __init__(self, matrix, m_list, num_to_return=1, algo=ALGO_FAST,
+                 ncpus=None, time_limit=None):
         """
         Args:
             matrix: A matrix of the ewald sum interaction energies. This is stored
@@ -537,6 +717,15 @@ class EwaldMinimizer:
                 structures so it may be necessary to overestimate and then
                 remove the duplicates later. (duplicate checking in this
                 process is extremely expensive)
+            algo: Algorithm to use, one of the EwaldMinimizer.ALGO_*
+                constants.
+            ncpus (int): Number of processes to search with. The top of the
+                search tree is split into subtrees which are searched in
+                parallel, sharing the current bound on the energy of the
+                orderings to return. Default of None means serial search.
+            time_limit (float): Time limit of the search in seconds. If it is
+                reached, the best orderings found so far are returned.
+                Default of None means no time limit.
         """
         # Setup and checking of inputs
         self._matrix = copy(matrix)
@@ -548,7 +737,8 @@ class EwaldMinimizer:
                 self._matrix[j, i] = value
 
         # sort the m_list based on number of permutations
-        self._m_list = sorted(m_list, key=lambda x: comb(len(x[2]), x[1]),
+        # the search modifies the index lists, so work on a copy of m_list
+        self._m_list = sorted(deepcopy(m_list), key=lambda x: comb(len(x[2]), x[1]),
                               reverse=True)
 
         for mlist in self._m_list:
@@ -565,13 +755,21 @@ class EwaldMinimizer:
         # Tag that the recurse function looks at at each level. If a method
         # sets this to true it breaks the recursion and stops the search.
         self._finished = False
+        self._ncpus = ncpus
+        self._time_limit = time_limit
+        # Bound on the energies shared between processes in parallel searches
+        self._shared_minimum = None
+        self._nodes_expanded = 0
+        self._nodes_pruned = 0
 
         self._start_time = datetime.utcnow()
 
         self.minimize_matrix()
 
-        self._best_m_list = self._output_lists[0][1]
-        self._minimized_sum = self._output_lists[0][0]
+        # the time limit may be reached before any ordering is found
+        self._best_m_list, self._minimized_sum = None, None
+        if self._output_lists:
+            self._minimized_sum, self._best_m_list = self._output_lists[0]
 
     def minimize_matrix(self):
         """
@@ -579,9 +777,45 @@ class EwaldMinimizer:
         ewald sum calls recursive function to iterate through permutations
         """
         if self._algo == EwaldMinimizer.ALGO_FAST or self._algo == EwaldMinimizer.ALGO_BEST_FIRST:
+            if self._ncpus and self._ncpus > 1:
+                return self._parallel_recurse()
             return self._recurse(self._matrix, self._m_list, set(range(len(self._matrix))))
         return None
 
+    def _parallel_recurse(self):
+        """
+        Splits the top of the search tree into subtrees, and searches these
+        in parallel. Each process keeps its own output lists, which are
+        merged as the subtrees are finished.
+        """
+        nodes = [(self._matrix, self._m_list, set(range(len(self._matrix))), [])]
+        while nodes and len(nodes) < 4 * self._ncpus and not self._finished:
+            nodes = [child for node in nodes for child in self._branch(*node, copy_m_list=True)]
+        if not nodes or self._finished:
+            return
+
+        self._shared_minimum = Value("d", self._current_minimum)
+        with Pool(self._ncpus, initializer=_init_minimizer_worker,
+                  initargs=(self, self._shared_minimum)) as pool:
+            for output_lists, expanded, pruned in pool.imap_unordered(_minimize_subtree, nodes):
+                self._nodes_expanded += expanded
+                self._nodes_pruned += pruned
+                for matrix_sum, m_list in output_lists:
+                    if matrix_sum < self._current_minimum:
+                        self.add_m_list(matrix_sum, m_list)
+                if self._algo == EwaldMinimizer.ALGO_BEST_FIRST and \
+                        len(self._output_lists) == self._num_to_return:
+                    break
+        self._shared_minimum = None
+
+    def _get_minimum(self):
+        """
+        Returns the bound above which orderings need not be considered.
+        """
+        if self._shared_minimum is None:
+            return self._current_minimum
+        return min(self._current_minimum, self._shared_minimum.value)
+
     def add_m_list(self, matrix_sum, m_list):
         """
         This adds an m_list to the output_lists and updates the current
@@ -598,6 +832,10 @@ class EwaldMinimizer:
             self._output_lists.pop()
         if len(self._output_lists) == self._num_to_return:
             self._current_minimum = self._output_lists[-1][0]
+            if self._shared_minimum is not None:
+                with self._shared_minimum.get_lock():
+                    if self._current_minimum < self._shared_minimum.value:
+                        self._shared_minimum.value = self._current_minimum
 
     def best_case(self, matrix, m_list, indices_left):
         """
@@ -686,6 +924,37 @@ class EwaldMinimizer:
         if self._finished:
             return
 
+        for child in self._branch(matrix, m_list, indices, output_m_list):
+            self._recurse(*child)
+
+    def _branch(self, matrix, m_list, indices, output_m_list, copy_m_list=False):
+        """
+        Performs one step of the search at a node of the tree, returning its
+        children: the node with the next manipulation performed and the node
+        where it is not. Leaves are added to the output lists, and nodes that
+        cannot improve on the current minimum are pruned.
+
+        Args:
+            matrix: The current matrix (with some permutations already
+                performed).
+            m_list: The list of permutations still to be performed
+            indices: Set of indices which haven't had a permutation
+                performed on them.
+            output_m_list: The permutations performed so far.
+            copy_m_list (bool): Whether the second child gets a copy of
+                m_list rather than m_list itself, which is modified. Needed
+                unless the children are searched depth first in order.
+
+        Returns:
+            List of the (matrix, m_list, indices, output_m_list) children.
+        """
+        if self._time_limit is not None and \
+                (datetime.utcnow() - self._start_time).total_seconds() > self._time_limit:
+            logger.warning("EwaldMinimizer time limit reached, returning the "
+                           "best orderings found so far.")
+            self._finished = True
+            return []
+
         # if we're done with the current manipulation, pop it off.
         while m_list[-1][1] == 0:
             m_list = copy(m_list)
@@ -693,20 +962,30 @@ class EwaldMinimizer:
             # if there are no more manipulations left to do check the value
             if not m_list:
                 matrix_sum = np.sum(matrix)
-                if matrix_sum < self._current_minimum:
+                if matrix_sum < self._get_minimum():
                     self.add_m_list(matrix_sum, output_m_list)
-                return
+                return []
 
         # if we wont have enough indices left, return
         if m_list[-1][1] > len(indices.intersection(m_list[-1][2])):
-            return
+            self._nodes_pruned += 1
+            return []
 
         if len(m_list) == 1 or m_list[-1][1] > 1:
-            if self.best_case(matrix, m_list, indices) > self._current_minimum:
-                return
+            if self.best_case(matrix, m_list, indices) > self._get_minimum():
+                self._nodes_pruned += 1
+                return []
+
+        self._nodes_expanded += 1
+        if self._nodes_expanded % 100000 == 0:
+            logger.debug("{} nodes expanded, {} pruned, current minimum {}"
+                         .format(self._nodes_expanded, self._nodes_pruned,
+                                 self._get_minimum()))
 
         index = self.get_next_index(matrix, m_list[-1], indices)
 
+        if copy_m_list:
+            m_list = deepcopy(m_list)
         m_list[-1][2].remove(index)
 
         # Make the matrix and new m_list where we do the manipulation to the
@@ -723,9 +1002,22 @@ class EwaldMinimizer:
         m_list2[-1][1] -= 1
 
         # recurse through both the modified and unmodified matrices
+        return [(matrix2, m_list2, indices2, output_m_list2),
+                (matrix, m_list, indices, output_m_list)]
+
+    @property
+    def nodes_expanded(self):
+        """
+        Returns: Number of nodes of the search tree that were expanded.
+        """
+        return self._nodes_expanded
 
-        self._recurse(matrix2, m_list2, indices2, output_m_list2)
-        self._recurse(matrix, m_list, indices, output_m_list)
+    @property
+    def nodes_pruned(self):
+        """
+        Returns: Number of nodes of the search tree that were pruned.
+        """
+        return self._nodes_pruned
 
     @property
     def best_m_list(self):
@@ -749,6 +1041,33 @@ class EwaldMinimizer:
         return self._output_lists
 
 
+_minimizer = None
+
+
+def _init_minimizer_worker(minimizer, shared_minimum):
+    """
+    Initializes the EwaldMinimizer of a worker process.
+    """
+    global _minimizer
+    _minimizer = minimizer
+    _minimizer._shared_minimum = shared_minimum
+
+
+def _minimize_subtree(node):
+    """
+    Searches a subtree in a worker process. Returns the output lists and the
+    numbers of nodes expanded and pruned.
+    """
+    _minimizer._output_lists = []
+    _minimizer._current_minimum = float('inf')
+    _minimizer._finished = False
+    _minimizer._nodes_expanded = 0
+    _minimizer._nodes_pruned = 0
+    _minimizer._recurse(*node)
+    return (_minimizer._output_lists, _minimizer._nodes_expanded,
+            _minimizer._nodes_pruned)
+
+
 def compute_average_oxidation_state(site):
     """
     Calculates the average oxidation state of a site
@@ -7,6 +7,7 @@ Module for graph representations of crystals.
 """
 
 import copy
+import hashlib
 import os.path
 import logging
 import subprocess
@@ -20,7 +21,6 @@ import networkx.algorithms.isomorphism as iso
 import numpy as np
 from networkx.drawing.nx_agraph import write_dot
 from networkx.readwrite import json_graph
-from scipy.spatial import KDTree
 from scipy.stats import describe
 
 from monty.json import MSONable
@@ -104,6 +104,43 @@ def _isomorphic(frag1, frag2):
     return nx.is_isomorphic(frag1.to_undirected(), frag2.to_undirected(), node_match=nm)
 
 
+def _graph_hash(graph, node_labels=None, edge_attr=None):
+    """
+    Internal function computing a Weisfeiler-Lehman hash of a graph object, considered
+    as undirected, with nodes labelled by their "specie" attribute (or by node_labels)
+    and edges by their edge_attr attribute, if given. Node labels are refined with
+    the labels of their neighbors until the partition of the nodes is stable.
+    Isomorphic graphs have the same hash, so that graphs only have to be checked
+    for isomorphism against graphs with the same hash.
+    """
+    if node_labels is None:
+        node_labels = dict(graph.nodes(data="specie"))
+    labels = {n: str(node_labels[n]) for n in graph.nodes()}
+    neighbors = {n: [] for n in labels}
+    for u, v, d in graph.edges(data=True):
+        edge_label = d.get(edge_attr) if edge_attr else None
+        if isinstance(edge_label, float):
+            # avoids distinguishing -0.0 from 0.0
+            edge_label += 0.0
+        neighbors[u].append((v, str(edge_label)))
+        neighbors[v].append((u, str(edge_label)))
+
+    history = [sorted(labels.values())]
+    n_classes = len(set(labels.values()))
+    for _ in range(len(labels)):
+        new_labels = {}
+        for n, label in labels.items():
+            neighbor_labels = sorted((edge_label, labels[m]) for m, edge_label in neighbors[n])
+            new_labels[n] = hashlib.md5("{}|{}".format(label, neighbor_labels).encode()).hexdigest()
+        labels = new_labels
+        history.append(sorted(labels.values()))
+        new_n_classes = len(set(labels.values()))
+        if new_n_classes == n_classes:
+            break
+        n_classes = new_n_classes
+    return hashlib.md5(str(history).encode()).hexdigest()
+
+
 class StructureGraph(MSONable):
     """
     This is a class for annotating a Structure with
@@ -1061,12 +1098,12 @@ class StructureGraph(MSONable):
         # possible when generating the graph using critic2 from
         # charge density.
 
-        # Multiplication works by looking for the expected position
-        # of an image node, and seeing if that node exists in the
-        # supercell. If it does, the edge is updated. This is more
-        # computationally expensive than just keeping track of the
-        # which new lattice images present, but should hopefully be
-        # easier to extend to a general 3x3 scaling matrix.
+        # Multiplication works by index arithmetic: the supercell
+        # contains one image of the original structure per lattice
+        # point, and the lattice point reached by an edge (and the
+        # supercell image it lies in) follows directly from the
+        # lattice point of its first node and its to_jimage, so no
+        # site has to be looked up by its position.
 
         # code adapted from Structure.__mul__
         scale_matrix = np.array(scaling_matrix, np.int16)
@@ -1080,165 +1117,88 @@ class StructureGraph(MSONable):
         f_lat = lattice_points_in_supercell(scale_matrix)
         c_lat = new_lattice.get_cartesian_coords(f_lat)
 
-        new_sites = []
-        new_graphs = []
-
-        for v in c_lat:
-
-            # create a map of nodes from original graph to its image
-            mapping = {n: n + len(new_sites) for n in range(len(self.structure))}
-
-            for idx, site in enumerate(self.structure):
-                s = PeriodicSite(site.species, site.coords + v,
-                                 new_lattice, properties=site.properties,
-                                 coords_are_cartesian=True, to_unit_cell=False)
+        # the sites of the supercell are ordered by lattice point, so
+        # that the image of node n at lattice point i is node
+        # i * n_sites + n
+        n_sites = len(self.structure)
+        n_lat = len(f_lat)
+        cart_coords = c_lat[:, None, :] + self.structure.cart_coords[None, :, :]
+        site_properties = {k: v * n_lat for k, v in self.structure.site_properties.items()}
+        new_structure = Structure(new_lattice, self.structure.species_and_occu * n_lat,
+                                  cart_coords.reshape((-1, 3)), coords_are_cartesian=True,
+                                  site_properties=site_properties)
 
-                new_sites.append(s)
-
-            new_graphs.append(nx.relabel_nodes(self.graph, mapping, copy=True))
-
-        new_structure = Structure.from_sites(new_sites)
-
-        # merge all graphs into one big graph
         new_g = nx.MultiDiGraph()
-        for new_graph in new_graphs:
-            new_g = nx.union(new_g, new_graph)
-
-        edges_to_remove = []  # tuple of (u, v, k)
-        edges_to_add = []  # tuple of (u, v, attr_dict)
-
-        # list of new edges inside supercell
-        # for duplicate checking
-        edges_inside_supercell = [{u, v} for u, v, d in new_g.edges(data=True)
-                                  if d['to_jimage'] == (0, 0, 0)]
-        new_periodic_images = []
-
-        orig_lattice = self.structure.lattice
-
-        # use k-d tree to match given position to an
-        # existing Site in Structure
-        kd_tree = KDTree(new_structure.cart_coords)
-
-        # tolerance in Å for sites to be considered equal
-        # this could probably be a lot smaller
-        tol = 0.05
-
-        for u, v, k, d in new_g.edges(keys=True, data=True):
-
-            to_jimage = d['to_jimage']  # for node v
-
-            # reduce unnecessary checking
-            if to_jimage != (0, 0, 0):
-
-                # get index in original site
-                n_u = u % len(self.structure)
-                n_v = v % len(self.structure)
-
-                # get fractional co-ordinates of where atoms defined
-                # by edge are expected to be, relative to original
-                # lattice (keeping original lattice has
-                # significant benefits)
-                v_image_frac = np.add(self.structure[n_v].frac_coords, to_jimage)
-                u_frac = self.structure[n_u].frac_coords
-
-                # using the position of node u as a reference,
-                # get relative Cartesian co-ordinates of where
-                # atoms defined by edge are expected to be
-                v_image_cart = orig_lattice.get_cartesian_coords(v_image_frac)
-                u_cart = orig_lattice.get_cartesian_coords(u_frac)
-                v_rel = np.subtract(v_image_cart, u_cart)
-
-                # now retrieve position of node v in
-                # new supercell, and get asgolute Cartesian
-                # co-ordinates of where atoms defined by edge
-                # are expected to be
-                v_expec = new_structure[u].coords + v_rel
-
-                # now search in new structure for these atoms
-                # query returns (distance, index)
-                v_present = kd_tree.query(v_expec)
-                v_present = v_present[1] if v_present[0] <= tol else None
-
-                # check if image sites now present in supercell
-                # and if so, delete old edge that went through
-                # periodic boundary
-                if v_present is not None:
-
-                    new_u = u
-                    new_v = v_present
-                    new_d = d.copy()
-
-                    # node now inside supercell
-                    new_d['to_jimage'] = (0, 0, 0)
-
-                    edges_to_remove.append((u, v, k))
-
-                    # make sure we don't try to add duplicate edges
-                    # will remove two edges for everyone one we add
-                    if {new_u, new_v} not in edges_inside_supercell:
-
-                        # normalize direction
-                        if new_v < new_u:
-                            new_u, new_v = new_v, new_u
-
-                        edges_inside_supercell.append({new_u, new_v})
-                        edges_to_add.append((new_u, new_v, new_d))
-
+        new_g.graph.update(self.graph.graph)
+        for i in range(n_lat):
+            new_g.add_nodes_from((i * n_sites + n, copy.copy(d)) for n, d in self.graph.nodes(data=True))
+
+        # lattice points as integer coordinates in the original
+        # lattice, and index of the lattice point at each of them
+        scale = np.diag(scale_matrix).astype(int)
+        int_lat = np.around(f_lat * scale).astype(int)
+        lat_indices = np.zeros(scale, dtype=int)
+        lat_indices[tuple(int_lat.T)] = np.arange(n_lat)
+
+        edges = list(self.graph.edges(data=True))
+        if edges:
+            orig_u = np.array([u for u, v, d in edges], dtype=int)
+            orig_v = np.array([v for u, v, d in edges], dtype=int)
+            orig_images = np.array([d['to_jimage'] for u, v, d in edges], dtype=int).reshape((-1, 3))
+        else:
+            orig_u = orig_v = np.zeros(0, dtype=int)
+            orig_images = np.zeros((0, 3), dtype=int)
+
+        # for each lattice point (first axis) and edge (second axis),
+        # lattice point of node v in the original lattice, split into
+        # its image in the supercell and the lattice point inside it
+        v_lat = int_lat[:, None, :] + orig_images[None, :, :]
+        new_images = np.floor_divide(v_lat, scale)
+        v_lat -= new_images * scale
+        new_u = np.arange(n_lat)[:, None] * n_sites + orig_u[None, :]
+        new_v = lat_indices[tuple(v_lat.transpose(2, 0, 1))] * n_sites + orig_v[None, :]
+
+        # normalize direction of edges going through a periodic boundary
+        periodic = np.any(orig_images != 0, axis=1)[None, :]
+        swap = periodic & (new_v < new_u)
+        new_u, new_v = np.where(swap, new_v, new_u), np.where(swap, new_u, new_v)
+        new_images = np.where(swap[:, :, None], -new_images, new_images)
+
+        # edges inside the original cell are kept as they are
+        edges_inside_supercell = set()
+        for i in range(n_lat):
+            for ie in np.flatnonzero(~periodic[0]):
+                u, v, d = int(new_u[i, ie]), int(new_v[i, ie]), edges[ie][2]
+                edges_inside_supercell.add(frozenset((u, v)))
+                new_g.add_edge(u, v, **d)
+
+        # edges going through a periodic boundary of the original cell
+        # either lie inside the supercell now, or go through one of its
+        # periodic boundaries; make sure we don't add duplicate edges
+        new_periodic_images = set()
+        n_added = 0
+        for i in range(n_lat):
+            for ie in np.flatnonzero(periodic[0]):
+                u, v, d = int(new_u[i, ie]), int(new_v[i, ie]), edges[ie][2]
+                to_jimage = tuple(int(j) for j in new_images[i, ie])
+                if to_jimage == (0, 0, 0):
+                    if frozenset((u, v)) in edges_inside_supercell:
+                        continue
+                    edges_inside_supercell.add(frozenset((u, v)))
+                elif (u, v, to_jimage) in new_periodic_images:
+                    continue
                 else:
+                    new_periodic_images.add((u, v, to_jimage))
+                new_d = d.copy()
+                new_d['to_jimage'] = to_jimage
+                new_g.add_edge(u, v, **new_d)
+                n_added += 1
 
-                    # want to find new_v such that we have
-                    # full periodic boundary conditions
-                    # so that nodes on one side of supercell
-                    # are connected to nodes on opposite side
-
-                    v_expec_frac = new_structure.lattice.get_fractional_coords(v_expec)
-
-                    # find new to_jimage
-                    # use np.around to fix issues with finite precision leading to incorrect image
-                    v_expec_image = np.around(v_expec_frac, decimals=3)
-                    v_expec_image = v_expec_image - v_expec_image % 1
-
-                    v_expec_frac = np.subtract(v_expec_frac, v_expec_image)
-                    v_expec = new_structure.lattice.get_cartesian_coords(v_expec_frac)
-                    v_present = kd_tree.query(v_expec)
-                    v_present = v_present[1] if v_present[0] <= tol else None
-
-                    if v_present is not None:
-
-                        new_u = u
-                        new_v = v_present
-                        new_d = d.copy()
-                        new_to_jimage = tuple(map(int, v_expec_image))
-
-                        # normalize direction
-                        if new_v < new_u:
-                            new_u, new_v = new_v, new_u
-                            new_to_jimage = tuple(np.multiply(-1, d['to_jimage']).astype(int))
-
-                        new_d['to_jimage'] = new_to_jimage
-
-                        edges_to_remove.append((u, v, k))
-
-                        if (new_u, new_v, new_to_jimage) not in new_periodic_images:
-                            edges_to_add.append((new_u, new_v, new_d))
-                            new_periodic_images.append((new_u, new_v, new_to_jimage))
-
-        logger.debug("Removing {} edges, adding {} new edges.".format(len(edges_to_remove),
-                                                                      len(edges_to_add)))
-
-        # add/delete marked edges
-        for edges_to_remove in edges_to_remove:
-            new_g.remove_edge(*edges_to_remove)
-        for (u, v, d) in edges_to_add:
-            new_g.add_edge(u, v, **d)
+        logger.debug("Replaced {} edges through periodic boundaries by {} new edges.".format(
+            n_lat * int(np.sum(periodic)), n_added))
 
         # return new instance of StructureGraph with supercell
-        d = {"@module": self.__class__.__module__,
-             "@class": self.__class__.__name__,
-             "structure": new_structure.as_dict(),
-             "graphs": json_graph.adjacency_data(new_g)}
-
-        sg = StructureGraph.from_dict(d)
+        sg = StructureGraph(new_structure, json_graph.adjacency_data(new_g))
 
         return sg
 
@@ -1486,17 +1446,21 @@ class StructureGraph(MSONable):
                 return e1['weight'] == e2['weight']
             return True
 
-        # prune duplicate subgraphs
+        # prune duplicate subgraphs, only testing subgraphs
+        # with the same hash for isomorphism
         unique_subgraphs = []
+        unique_subgraphs_by_hash = defaultdict(list)
         for subgraph in molecule_subgraphs:
 
+            subgraph_hash = _graph_hash(subgraph, edge_attr='weight' if use_weights else None)
             already_present = [nx.is_isomorphic(subgraph, g,
                                                 node_match=node_match,
                                                 edge_match=edge_match)
-                               for g in unique_subgraphs]
+                               for g in unique_subgraphs_by_hash[subgraph_hash]]
 
             if not any(already_present):
                 unique_subgraphs.append(subgraph)
+                unique_subgraphs_by_hash[subgraph_hash].append(subgraph)
 
         # get Molecule objects for each subgraph
         molecules = []
@@ -2098,18 +2062,22 @@ class MoleculeGraph(MSONable):
                     else:
                         frag_dict[mykey].append(copy.deepcopy(subgraph))
 
-        # narrow to all unique fragments using graph isomorphism
+        # narrow to all unique fragments using graph isomorphism, only
+        # testing fragments with the same hash
         unique_frag_dict = {}
         for key in frag_dict:
             unique_frags = []
+            unique_frags_by_hash = defaultdict(list)
             for frag in frag_dict[key]:
+                frag_hash = _graph_hash(frag)
                 found = False
-                for f in unique_frags:
+                for f in unique_frags_by_hash[frag_hash]:
                     if _isomorphic(frag, f):
                         found = True
                         break
                 if not found:
                     unique_frags.append(frag)
+                    unique_frags_by_hash[frag_hash].append(frag)
             unique_frag_dict[key] = copy.deepcopy(unique_frags)
 
         # convert back to molecule graphs
@@ -211,19 +211,63 @@ class ValenceIonicRadiusEvaluator:
         return valences
 
 
+def _get_brunner_cutoffs(centers, dists, n_sites, gap_func):
+    """
+    Vectorized core of the Brunner neighbor algorithms. For every site, finds
+    the distance just below the largest gap (as measured by gap_func) in its
+    sorted neighbor distances, as well as its shortest neighbor distance.
+
+    Args:
+        centers (np.ndarray): center index of each pair.
+        dists (np.ndarray): distance of each pair.
+        n_sites (int): number of sites in the structure.
+        gap_func (callable): function of the arrays of shorter and longer
+            distances of consecutive neighbors returning the gaps.
+
+    Returns:
+        (d_max, d_min) arrays over sites. d_max is -inf for sites with less
+        than two neighbors.
+    """
+    d_max = np.full(n_sites, -np.inf)
+    d_min = np.full(n_sites, np.inf)
+    if len(dists) < 2:
+        return d_max, d_min
+    order = np.lexsort((dists, centers))
+    c, d = centers[order], dists[order]
+    np.minimum.at(d_min, c, d)
+    same = c[1:] == c[:-1]
+    gaps = np.full(len(same), -np.inf)
+    gaps[same] = gap_func(d[:-1][same], d[1:][same])
+    # first occurrence of the largest gap of each site
+    best = np.lexsort((np.arange(len(gaps)), -gaps, c[:-1]))
+    first = np.ones(len(best), dtype=bool)
+    first[1:] = c[best[1:]] != c[best[:-1]]
+    best = best[first]
+    best = best[same[best]]
+    d_max[c[best]] = d[best]
+    return d_max, d_min
+
+
 class NearNeighbors:
     """
     Base class to determine near neighbors that typically include nearest
     neighbors and others that are within some tolerable distance.
     """
 
+    # Names of the instance attributes caching intermediate results, which are
+    # ignored when comparing near-neighbor methods
+    _cache_attributes = ()  # type: tuple
+
+    def _get_params(self):
+        return {k: v for k, v in self.__dict__.items() if k not in self._cache_attributes}
+
     def __eq__(self, other):
         if type(other) is type(self):
-            return self.__dict__ == other.__dict__
+            return self._get_params() == other._get_params()
         return False
 
     def __hash__(self):
-        return len(self.__dict__.items())
+        return len(self._get_params())
 
     @property
     def structures_allowed(self):
@@ -380,6 +424,58 @@ class NearNeighbors:
 
         return [self.get_nn_info(structure, n) for n in range(len(structure))]
 
+    @staticmethod
+    def _get_all_nn_info_from_neighbor_list(structure, r, select):
+        """Private method for get_all_nn_info, building the near-neighbor
+        information of all sites from a single neighbor list rather than
+        querying the neighbors of each site separately.
+
+        Args:
+            structure (Structure): input structure.
+            r (float): radius of the neighbor list.
+            select (callable): function taking the arrays of center indices,
+                neighbor indices and distances of all pairs within r, grouped
+                by center index, and returning a boolean mask of the pairs
+                that are near neighbors and an array of their weights.
+
+        Returns:
+            List of NN site information for each site in the structure. Each
+                entry has the same format as `get_nn_info`
+        """
+        centers, points, images, dists = structure.get_neighbor_list(r)
+        order = np.argsort(centers, kind="stable")
+        centers, points, dists = centers[order], points[order], dists[order]
+        images = np.around(images[order]).astype(int)
+
+        mask, weights = select(centers, points, dists)
+
+        lattice = structure.lattice
+        frac_coords = structure.frac_coords
+        sites = structure.sites
+        all_nn_info = [[] for _ in range(len(structure))]
+        for c, p, image, d, w in zip(
+            centers[mask].tolist(),
+            points[mask].tolist(),
+            images[mask],
+            dists[mask].tolist(),
+            weights[mask].tolist(),
+        ):
+            site = sites[p]
+            image = tuple(image.tolist())
+            nn = PeriodicNeighbor(
+                species=site.species,
+                coords=frac_coords[p] + image,
+                lattice=lattice,
+                properties=site.properties,
+                nn_distance=d,
+                index=p,
+                image=image,
+            )
+            all_nn_info[c].append(
+                {"site": nn, "image": image, "weight": w, "site_index": p}
+            )
+        return all_nn_info
+
     def get_nn_shell_info(self, structure, site_idx, shell):
         """Get a certain nearest neighbor shell for a certain site.
 
@@ -628,8 +724,16 @@ class VoronoiNN(NearNeighbors):
     """
     Uses a Voronoi algorithm to determine near neighbors for each site in a
     structure.
+
+    The tessellation of the last structure is cached, such that querying the
+    sites of a structure one by one only tessellates it once. The cache is
+    invalidated when another structure is queried or when the lattice, the
+    coordinates or the species of the structure have been modified in place,
+    and can be explicitly discarded with clear_cache().
     """
 
+    _cache_attributes = ("_voronoi_cache",)
+
     def __init__(
         self,
         tol=0,
@@ -664,6 +768,7 @@ class VoronoiNN(NearNeighbors):
         self.weight = weight
         self.extra_nn_info = extra_nn_info
         self.compute_adj_neighbors = compute_adj_neighbors
+        self._voronoi_cache = None
 
     @property
     def structures_allowed(self):
@@ -681,6 +786,13 @@ class VoronoiNN(NearNeighbors):
         """
         return False
 
+    def clear_cache(self):
+        """
+        Discards the cached tessellation, e.g. to free memory or after changing
+        the site properties of a structure in place.
+        """
+        self._voronoi_cache = None
+
     def get_voronoi_polyhedra(self, structure, n):
         """
         Gives a weighted polyhedra around a site.
@@ -704,6 +816,38 @@ class VoronoiNN(NearNeighbors):
                 - volume - Volume of Voronoi cell for this face
                 - n_verts - Number of vertices on the facet
         """
+        return self._get_voronoi_polyhedra(structure, n)[0]
+
+    def _get_voronoi_polyhedra(self, structure, n):
+        """Private method for get_voronoi_polyhedra, also returning the index
+        and lattice image of the neighbors in the original structure.
+
+        Tessellating the whole structure costs about as much as tessellating
+        a quarter of its sites one by one, so the polyhedra are computed for
+        each site separately until enough sites of the same structure have
+        been queried, after which the whole structure is tessellated once.
+
+        Args:
+            structure (Structure): structure for which to evaluate the
+                coordination environment.
+            n (integer): site index.
+
+        Returns:
+            (dict, dict): the polyhedron as returned by get_voronoi_polyhedra
+                and a dict mapping its keys to (site index, image) tuples.
+        """
+        if len(structure) > 1:
+            cache = self._get_voronoi_cache(structure)
+            cache["n_queries"] += 1
+            if cache["polyhedra"] is None and 4 * cache["n_queries"] > len(structure):
+                try:
+                    cache["polyhedra"] = self._compute_all_voronoi_polyhedra(structure)
+                except (RuntimeError, ValueError):
+                    # The cutoff is too small for the tessellation of some
+                    # site, which the tessellations of single sites adjust
+                    cache["polyhedra"] = False
+            if cache["polyhedra"]:
+                return self._copy_voronoi_polyhedra(cache["polyhedra"][n])
 
         # Assemble the list of neighbors used in the tessellation
         #   Gets all atoms within a certain radius
@@ -724,11 +868,13 @@ class VoronoiNN(NearNeighbors):
 
         while True:
             try:
-                neighbors = structure.get_sites_in_sphere(center.coords, cutoff)
-                neighbors = [i[0] for i in sorted(neighbors, key=lambda s: s[1])]
+                neighbors = structure.get_sites_in_sphere(
+                    center.coords, cutoff, include_index=True, include_image=True
+                )
+                neighbors = sorted(neighbors, key=lambda s: s[1])
 
                 # Run the Voronoi tessellation
-                qvoronoi_input = [s.coords for s in neighbors]
+                qvoronoi_input = [s[0].coords for s in neighbors]
 
                 voro = Voronoi(
                     qvoronoi_input
@@ -736,7 +882,12 @@ class VoronoiNN(NearNeighbors):
 
                 # Extract data about the site in question
                 cell_info = self._extract_cell_info(
-                    structure, 0, neighbors, targets, voro, self.compute_adj_neighbors
+                    structure,
+                    0,
+                    [s[0] for s in neighbors],
+                    targets,
+                    voro,
+                    self.compute_adj_neighbors,
                 )
                 break
 
@@ -749,7 +900,16 @@ class VoronoiNN(NearNeighbors):
                         "Error in Voronoi neighbor finding; " "max cutoff exceeded"
                     )
                 cutoff = min(cutoff * 2, max_cutoff + 0.001)
-        return cell_info
+
+        # The images of get_sites_in_sphere are relative to the sites
+        # translated to the unit cell
+        offsets = np.floor(structure.frac_coords)
+        origins = {}
+        for i in cell_info:
+            index, image = neighbors[i][2], neighbors[i][3]
+            image = np.around(np.subtract(image, offsets[index])).astype(int)
+            origins[i] = (index, tuple(image.tolist()))
+        return cell_info, origins
 
     def get_all_voronoi_polyhedra(self, structure):
         """Get the Voronoi polyhedra for all site in a simulation cell
@@ -767,14 +927,28 @@ class VoronoiNN(NearNeighbors):
                 - volume - Volume of Voronoi cell for this face
                 - n_verts - Number of vertices on the facet
         """
+        return [cell for cell, _ in self._get_all_voronoi_polyhedra(structure)]
+
+    def _get_all_voronoi_polyhedra(self, structure):
+        """Private method for get_all_voronoi_polyhedra, also returning the
+        index and lattice image of the neighbors in the original structure,
+        see _get_voronoi_polyhedra.
+        """
 
         # Special case: For atoms with 1 site, the atom in the root image is not
         # included in the get_all_neighbors output. Rather than creating logic to add
-        # that atom to the neighbor list, which requires detecting whether it will be
-        # translated to reside within the unit cell before neighbor detection, it is
-        # less complex to just call the one-by-one operation
+        # that atom to the neighbor list, it is less complex to just call the
+        # one-by-one operation
         if len(structure) == 1:
-            return [self.get_voronoi_polyhedra(structure, 0)]
+            return [self._get_voronoi_polyhedra(structure, 0)]
+
+        cache = self._get_voronoi_cache(structure)
+        if not cache["polyhedra"]:
+            cache["polyhedra"] = self._compute_all_voronoi_polyhedra(structure)
+        return [self._copy_voronoi_polyhedra(p) for p in cache["polyhedra"]]
+
+    def _compute_all_voronoi_polyhedra(self, structure):
+        """Tessellates a whole structure, see _get_all_voronoi_polyhedra."""
 
         # Assemble the list of neighbors used in the tessellation
         if self.targets is None:
@@ -783,11 +957,14 @@ class VoronoiNN(NearNeighbors):
             targets = self.targets
 
         # Initialize the list of sites with the atoms in the origin unit cell
-        # The `get_all_neighbors` function returns neighbors for each site's image in
-        # the original unit cell. We start off with these central atoms to ensure they
-        # are included in the tessellation
+        # The images of the neighbors returned by `get_all_neighbors` are relative
+        # to the sites of the structure. We start off with these central atoms to
+        # ensure they are included in the tessellation
 
-        sites = [x.to_unit_cell() for x in structure]
+        sites = [
+            PeriodicSite(x.species, x.frac_coords, x.lattice, properties=x.properties)
+            for x in structure
+        ]
         indices = [(i, 0, 0, 0) for i, _ in enumerate(structure)]
 
         # Get all neighbors within a certain cutoff
@@ -809,19 +986,58 @@ class VoronoiNN(NearNeighbors):
         #   the images associated with atom 0 are first, followed by atom 1, etc.
         (root_images,) = np.nonzero(np.abs(indices[:, 1:]).max(axis=1) == 0)
 
-        del indices  # Save memory (tessellations can be costly)
-
         # Run the tessellation
         qvoronoi_input = [s.coords for s in sites]
         voro = Voronoi(qvoronoi_input)
 
         # Get the information for each neighbor
-        return [
-            self._extract_cell_info(
+        all_polyhedra = []
+        for i in root_images.tolist():
+            cell_info = self._extract_cell_info(
                 structure, i, sites, targets, voro, self.compute_adj_neighbors
             )
-            for i in root_images.tolist()
-        ]
+            origins = {
+                j: (indices[j, 0].item(), tuple(indices[j, 1:].tolist()))
+                for j in cell_info
+            }
+            all_polyhedra.append((cell_info, origins))
+        return all_polyhedra
+
+    def _get_voronoi_cache(self, structure):
+        """Returns the cache of the polyhedra of a structure, resetting it if
+        the structure or the parameters of the tessellation changed.
+        """
+        params = (
+            self.cutoff,
+            None if self.targets is None else list(self.targets),
+            self.allow_pathological,
+            self.compute_adj_neighbors,
+        )
+        cache = self._voronoi_cache
+        if (
+            cache is None
+            or cache["structure"] is not structure
+            or cache["params"] != params
+            or not np.array_equal(cache["lattice"], structure.lattice.matrix)
+            or not np.array_equal(cache["frac_coords"], structure.frac_coords)
+            or cache["species"] != structure.species_and_occu
+        ):
+            cache = self._voronoi_cache = {
+                "structure": structure,
+                "params": params,
+                "lattice": structure.lattice.matrix.copy(),
+                "frac_coords": structure.frac_coords.copy(),
+                "species": structure.species_and_occu,
+                "n_queries": 0,
+                "polyhedra": None,
+            }
+        return cache
+
+    @staticmethod
+    def _copy_voronoi_polyhedra(polyhedra):
+        """Copies cached polyhedra, whose statistics are modified by _extract_nn_info"""
+        cell_info, origins = polyhedra
+        return {k: dict(v) for k, v in cell_info.items()}, origins
 
     def _extract_cell_info(
         self, structure, site_idx, sites, targets, voro, compute_adj_neighbors=False
@@ -979,10 +1195,10 @@ class VoronoiNN(NearNeighbors):
         """
 
         # Run the tessellation
-        nns = self.get_voronoi_polyhedra(structure, n)
+        nns, origins = self._get_voronoi_polyhedra(structure, n)
 
         # Extract the NN info
-        return self._extract_nn_info(structure, nns)
+        return self._extract_nn_info(structure, nns, origins)
 
     def get_all_nn_info(self, structure):
         """
@@ -992,15 +1208,20 @@ class VoronoiNN(NearNeighbors):
         Returns:
             All nn info for all sites.
         """
-        all_voro_cells = self.get_all_voronoi_polyhedra(structure)
-        return [self._extract_nn_info(structure, cell) for cell in all_voro_cells]
+        all_voro_cells = self._get_all_voronoi_polyhedra(structure)
+        return [
+            self._extract_nn_info(structure, cell, origins)
+            for cell, origins in all_voro_cells
+        ]
 
-    def _extract_nn_info(self, structure, nns):
+    def _extract_nn_info(self, structure, nns, origins=None):
         """Given Voronoi NNs, extract the NN info in the form needed by NearestNeighbors
 
         Args:
             structure (Structure): Structure being evaluated
             nns ([dicts]): Nearest neighbor information for a structure
+            origins (dict): (site index, image) tuple of each neighbor in nns.
+                If None, these are searched in the structure.
         Returns:
             (list of tuples (Site, array, float)): See nn_info
         """
@@ -1014,16 +1235,21 @@ class VoronoiNN(NearNeighbors):
         # Extract the NN info
         siw = []
         max_weight = max(nn[self.weight] for nn in nns.values())
-        for nstats in nns.values():
+        for key, nstats in nns.items():
             site = nstats["site"]
             if nstats[self.weight] > self.tol * max_weight and _is_in_targets(
                 site, targets
             ):
+                if origins is None:
+                    site_index = self._get_original_site(structure, site)
+                    image = self._get_image(structure, site)
+                else:
+                    site_index, image = origins[key]
                 nn_info = {
                     "site": site,
-                    "image": self._get_image(structure, site),
+                    "image": image,
                     "weight": nstats[self.weight] / max_weight,
-                    "site_index": self._get_original_site(structure, site),
+                    "site_index": site_index,
                 }
 
                 if self.extra_nn_info:
@@ -1184,6 +1410,41 @@ class JmolNN(NearNeighbors):
                 )
         return siw
 
+    def get_all_nn_info(self, structure):
+        """
+        Get the near-neighbor information of all sites from a single
+        neighbor list, which is much faster than calling get_nn_info for
+        each site of a large structure.
+
+        Args:
+            structure (Structure): input structure.
+
+        Returns:
+            All nn info for all sites.
+        """
+        if not isinstance(structure, IStructure):
+            return super().get_all_nn_info(structure)
+
+        elements = structure.composition.elements
+        el_inds = {el: i for i, el in enumerate(elements)}
+        types = np.array([el_inds[site.specie] for site in structure])
+        bonds = np.array(
+            [
+                [self.get_max_bond_distance(el1.symbol, el2.symbol) for el2 in elements]
+                for el1 in elements
+            ]
+        )
+        min_rads = np.min(bonds, axis=1)
+
+        def select(centers, points, dists):
+            max_dists = bonds[types[centers], types[points]]
+            mask = (dists <= max_dists) & (dists > self.min_bond_distance)
+            return mask, min_rads[types[centers]] / dists
+
+        return self._get_all_nn_info_from_neighbor_list(
+            structure, np.max(bonds) + self.tol, select
+        )
+
 
 class MinimumDistanceNN(NearNeighbors):
     """
@@ -1280,6 +1541,33 @@ class MinimumDistanceNN(NearNeighbors):
                     )
         return siw
 
+    def get_all_nn_info(self, structure):
+        """
+        Get the near-neighbor information of all sites from a single
+        neighbor list, which is much faster than calling get_nn_info for
+        each site of a large structure.
+
+        Args:
+            structure (Structure): input structure.
+
+        Returns:
+            All nn info for all sites.
+        """
+        if not isinstance(structure, IStructure):
+            return super().get_all_nn_info(structure)
+
+        def select(centers, points, dists):
+            if self.get_all_sites:
+                return np.ones(len(dists), dtype=bool), dists
+            min_dists = np.full(len(structure), np.inf)
+            np.minimum.at(min_dists, centers, dists)
+            min_dists = min_dists[centers]
+            return dists < (1.0 + self.tol) * min_dists, min_dists / dists
+
+        return self._get_all_nn_info_from_neighbor_list(
+            structure, self.cutoff, select
+        )
+
 
 class OpenBabelNN(NearNeighbors):
     """
@@ -3568,6 +3856,29 @@ class BrunnerNN_reciprocal(NearNeighbors):
                 )
         return siw
 
+    def get_all_nn_info(self, structure):
+        """
+        Get the near-neighbor information of all sites from a single
+        neighbor list, which is much faster than calling get_nn_info for
+        each site of a large structure.
+
+        Args:
+            structure (Structure): input structure.
+
+        Returns:
+            All nn info for all sites.
+        """
+
+        def select(centers, points, dists):
+            d_max, d_min = _get_brunner_cutoffs(
+                centers, dists, len(structure), lambda d1, d2: 1.0 / d1 - 1.0 / d2
+            )
+            return dists < d_max[centers] + self.tol, d_min[centers] / dists
+
+        return self._get_all_nn_info_from_neighbor_list(
+            structure, self.cutoff, select
+        )
+
 
 class BrunnerNN_relative(NearNeighbors):
     """
@@ -3642,6 +3953,29 @@ class BrunnerNN_relative(NearNeighbors):
                 )
         return siw
 
+    def get_all_nn_info(self, structure):
+        """
+        Get the near-neighbor information of all sites from a single
+        neighbor list, which is much faster than calling get_nn_info for
+        each site of a large structure.
+
+        Args:
+            structure (Structure): input structure.
+
+        Returns:
+            All nn info for all sites.
+        """
+
+        def select(centers, points, dists):
+            d_max, d_min = _get_brunner_cutoffs(
+                centers, dists, len(structure), lambda d1, d2: d2 / d1
+            )
+            return dists < d_max[centers] + self.tol, d_min[centers] / dists
+
+        return self._get_all_nn_info_from_neighbor_list(
+            structure, self.cutoff, select
+        )
+
 
 class BrunnerNN_real(NearNeighbors):
     """
@@ -3716,6 +4050,29 @@ class BrunnerNN_real(NearNeighbors):
                 )
         return siw
 
+    def get_all_nn_info(self, structure):
+        """
+        Get the near-neighbor information of all sites from a single
+        neighbor list, which is much faster than calling get_nn_info for
+        each site of a large structure.
+
+        Args:
+            structure (Structure): input structure.
+
+        Returns:
+            All nn info for all sites.
+        """
+
+        def select(centers, points, dists):
+            d_max, d_min = _get_brunner_cutoffs(
+                centers, dists, len(structure), lambda d1, d2: d2 - d1
+            )
+            return dists < d_max[centers] + self.tol, d_min[centers] / dists
+
+        return self._get_all_nn_info_from_neighbor_list(
+            structure, self.cutoff, select
+        )
+
 
 class EconNN(NearNeighbors):
     """
@@ -3906,6 +4263,8 @@ class CrystalNN(NearNeighbors):
 
     NNData = namedtuple("nn_data", ["all_nninfo", "cn_weights", "cn_nninfo"])
 
+    _cache_attributes = ("_voronoi_nn",)
+
     def __init__(
         self,
         weighted_cn=False,
@@ -3951,6 +4310,13 @@ class CrystalNN(NearNeighbors):
         self.search_cutoff = search_cutoff
         self.porous_adjustment = porous_adjustment
         self.fingerprint_length = fingerprint_length
+        self._voronoi_nn = None
+
+    def clear_cache(self):
+        """
+        Discards the cached tessellations, see VoronoiNN.clear_cache.
+        """
+        self._voronoi_nn = None
 
     @property
     def structures_allowed(self):
@@ -3987,7 +4353,48 @@ class CrystalNN(NearNeighbors):
         """
 
         nndata = self.get_nn_data(structure, n)
+        return self._get_nn_info_from_nn_data(nndata)
+
+    def get_all_nn_info(self, structure):
+        """
+        Get a listing of all neighbors for all sites in a structure, from
+        a single Voronoi tessellation of the structure.
 
+        Args:
+            structure (Structure): Input structure
+        Return:
+            List of NN site information for each site in the structure. Each
+                entry has the same format as `get_nn_info`
+        """
+        all_voronoi_nn = {}
+        all_nn_info = []
+        for n in range(len(structure)):
+            target = self._get_targets(structure, n)
+            key = None if target is None else tuple(target)
+            if key not in all_voronoi_nn:
+                try:
+                    vnn = self._get_voronoi_nn(structure, target)
+                    all_voronoi_nn[key] = vnn.get_all_nn_info(structure)
+                except (RuntimeError, ValueError):
+                    # The search cutoff is too small for the tessellation of
+                    # some site, which is adjusted when querying single sites
+                    return super().get_all_nn_info(structure)
+            nndata = self._get_nn_data(
+                structure, n, all_voronoi_nn[key][n], self.fingerprint_length
+            )
+            all_nn_info.append(self._get_nn_info_from_nn_data(nndata))
+        return all_nn_info
+
+    def _get_nn_info_from_nn_data(self, nndata):
+        """
+        Private method for get_nn_info, weighting the near neighbors of a site.
+
+        Args:
+            nndata: (NNData) near neighbor data of the site
+
+        Returns:
+            siw (list of dicts): see get_nn_info
+        """
         if not self.weighted_cn:
             max_key = max(nndata.cn_weights, key=lambda k: nndata.cn_weights[k])
             nn = nndata.cn_nninfo[max_key]
@@ -4024,24 +4431,74 @@ class CrystalNN(NearNeighbors):
 
         length = length or self.fingerprint_length
 
-        # determine possible bond targets
-        target = None
-        if self.cation_anion:
-            target = []
-            m_oxi = structure[n].specie.oxi_state
-            for site in structure:
-                if site.specie.oxi_state * m_oxi <= 0:  # opposite charge
-                    target.append(site.specie)
-            if not target:
-                raise ValueError(
-                    "No valid targets for site within cation_anion constraint!"
-                )
-
         # get base VoronoiNN targets
-        cutoff = self.search_cutoff
-        vnn = VoronoiNN(weight="solid_angle", targets=target, cutoff=cutoff)
+        vnn = self._get_voronoi_nn(structure, self._get_targets(structure, n))
         nn = vnn.get_nn_info(structure, n)
+        return self._get_nn_data(structure, n, nn, length)
+
+    def _get_targets(self, structure, n):
+        """
+        Private method for get_nn_data, determining the possible bond
+        targets of a site.
+
+        Args:
+            structure: (Structure) enclosing structure object
+            n: (int) index of target site
+
+        Returns:
+            ([Specie]) possible bond targets, or None if all species are possible
+        """
+        if not self.cation_anion:
+            return None
+        target = []
+        m_oxi = structure[n].specie.oxi_state
+        for site in structure:
+            # opposite charge
+            if site.specie.oxi_state * m_oxi <= 0 and site.specie not in target:
+                target.append(site.specie)
+        if not target:
+            raise ValueError(
+                "No valid targets for site within cation_anion constraint!"
+            )
+        return target
+
+    def _get_voronoi_nn(self, structure, target):
+        """
+        Private method for get_nn_data, giving the VoronoiNN of a set of bond
+        targets. These are kept for the last structure, to reuse their
+        cached tessellations.
+
+        Args:
+            structure: (Structure) enclosing structure object
+            target: ([Specie]) possible bond targets
+
+        Returns:
+            (VoronoiNN)
+        """
+        if self._voronoi_nn is None or self._voronoi_nn[0] is not structure:
+            self._voronoi_nn = (structure, {})
+        all_vnn = self._voronoi_nn[1]
+        key = (None if target is None else tuple(target), self.search_cutoff)
+        if key not in all_vnn:
+            all_vnn[key] = VoronoiNN(
+                weight="solid_angle", targets=target, cutoff=self.search_cutoff
+            )
+        return all_vnn[key]
+
+    def _get_nn_data(self, structure, n, nn, length):
+        """
+        Private method for get_nn_data, computing the near neighbor data of a
+        site from its VoronoiNN near neighbors.
 
+        Args:
+            structure: (Structure) enclosing structure object
+            n: (int) index of target site
+            nn: (list of dicts) VoronoiNN near neighbor information of the site
+            length: (int) if set, will return a fixed range of CN numbers
+
+        Returns:
+            (NNData) see get_nn_data
+        """
         # solid angle weights can be misleading in open / porous structures
         # adjust weights to correct for this behavior
         if self.porous_adjustment:
@@ -4421,6 +4878,38 @@ class CutOffDictNN(NearNeighbors):
 
         return nn_info
 
+    def get_all_nn_info(self, structure):
+        """
+        Get the near-neighbor information of all sites from a single
+        neighbor list, which is much faster than calling get_nn_info for
+        each site of a large structure.
+
+        Args:
+            structure (Structure): input structure.
+
+        Returns:
+            All nn info for all sites.
+        """
+        if not isinstance(structure, IStructure):
+            return super().get_all_nn_info(structure)
+
+        species = sorted({site.species_string for site in structure})
+        sp_inds = {sp: i for i, sp in enumerate(species)}
+        types = np.array([sp_inds[site.species_string] for site in structure])
+        cut_offs = np.array(
+            [
+                [self._lookup_dict.get(sp1, {}).get(sp2, 0.0) for sp2 in species]
+                for sp1 in species
+            ]
+        )
+
+        def select(centers, points, dists):
+            return dists < cut_offs[types[centers], types[points]], dists
+
+        return self._get_all_nn_info_from_neighbor_list(
+            structure, self._max_dist, select
+        )
+
 
 class Critic2NN(NearNeighbors):
     """
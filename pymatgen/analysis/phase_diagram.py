@@ -12,6 +12,7 @@ import itertools
 import math
 import logging
 from functools import lru_cache
+from multiprocessing import Pool
 
 import numpy as np
 from scipy.spatial import ConvexHull
@@ -383,6 +384,7 @@ class PhaseDiagram(MSONable):
         self.qhull_entries = qhull_entries
         self._stable_entries = set(self.qhull_entries[i] for i in
                                    set(itertools.chain(*self.facets)))
+        self._facet_inv = None
 
     def pd_coords(self, comp):
         """
@@ -541,6 +543,140 @@ class PhaseDiagram(MSONable):
             e += k.energy_per_atom * v
         return e * comp.num_atoms
 
+    def _get_amounts(self, comps):
+        """
+        Amounts of each element of the phase diagram in a list of
+        compositions.
+
+        Args:
+            comps: A list of compositions or an array of shape
+                (len(comps), dim) of the amounts of self.elements in each.
+
+        Returns:
+            Array of amounts of shape (len(comps), dim).
+        """
+        if isinstance(comps, np.ndarray):
+            if comps.ndim != 2 or comps.shape[1] != self.dim:
+                raise ValueError("Amounts must be an array of shape (n, {})".format(self.dim))
+            return comps.astype(float)
+        amounts = []
+        for comp in comps:
+            if set(comp.elements).difference(self.elements):
+                raise ValueError('{} has elements not in the phase diagram {}'
+                                 ''.format(comp, self.elements))
+            amounts.append([comp[el] for el in self.elements])
+        return np.array(amounts, dtype=float).reshape(-1, self.dim)
+
+    def _get_facet_inv(self):
+        """
+        Inverses of the matrices of the pd coordinates (augmented by 1) of
+        the vertices of each facet, which give the barycentric coordinates
+        of compositions in the facets. Computed once and cached.
+        """
+        if self._facet_inv is None:
+            m = self.qhull_data[np.array(self.facets)]
+            m[:, :, -1] = 1
+            self._facet_inv = np.linalg.inv(m)
+        return self._facet_inv
+
+    def _get_facets_and_bary_coords(self, fracs):
+        """
+        Vectorized version of _get_facet_and_simplex. Gets the first facet
+        that each composition falls into, and the barycentric coordinates of
+        the composition in that facet.
+
+        Args:
+            fracs (np.ndarray): Atomic fractions of self.elements of shape
+                (n, dim).
+
+        Returns:
+            (facet indices in self.facets, barycentric coordinates), of
+            shapes (n,) and (n, dim).
+        """
+        facet_inv = self._get_facet_inv()
+        x = np.concatenate([fracs[:, 1:], np.ones((len(fracs), 1))], axis=1)
+        inds = np.full(len(x), -1)
+        bary = np.zeros(x.shape)
+        # Bound the size of the (facets, compositions, dim) arrays
+        chunk = max(1, 10 ** 7 // (len(facet_inv) * self.dim))
+        for i in range(0, len(x), chunk):
+            b = np.einsum("nd,fde->fne", x[i:i + chunk], facet_inv)
+            inside = np.all(b >= -PhaseDiagram.numerical_tol / 10, axis=-1)
+            first = inside.argmax(axis=0)
+            n = np.arange(len(first))
+            inds[i:i + chunk] = np.where(inside[first, n], first, -1)
+            bary[i:i + chunk] = b[first, n]
+        if (inds < 0).any():
+            raise RuntimeError("No facet found for comp = {}".format(
+                fracs[inds < 0][0]))
+        return inds, bary
+
+    def get_decompositions(self, comps):
+        """
+        Provides the decompositions of many compositions at once.
+
+        Args:
+            comps: A list of compositions or an array of shape
+                (len(comps), dim) of the amounts of self.elements in each.
+
+        Returns:
+            List of decompositions as dicts of {Entry: amount}
+        """
+        amounts = self._get_amounts(comps)
+        inds, bary = self._get_facets_and_bary_coords(
+            amounts / amounts.sum(axis=1)[:, None])
+        return [{self.qhull_entries[f]: amt for f, amt in zip(self.facets[i], b)
+                 if abs(amt) > PhaseDiagram.numerical_tol}
+                for i, b in zip(inds, bary)]
+
+    def get_hull_energies(self, comps, per_atom=False):
+        """
+        Provides the hull energies of many compositions at once. Much faster
+        than calling get_hull_energy for each composition.
+
+        Args:
+            comps: A list of compositions or an array of shape
+                (len(comps), dim) of the amounts of self.elements in each.
+            per_atom (bool): Whether to normalize the energies by the number
+                of atoms.
+
+        Returns:
+            Array of energies of the lowest energy equilibria at the
+            compositions.
+        """
+        amounts = self._get_amounts(comps)
+        natoms = amounts.sum(axis=1)
+        # The lower convex hull is the maximum of the hyperplanes through its
+        # facets, E = np.dot(planes, [pd_coords, 1]).
+        planes = np.einsum("fde,fe->fd", self._get_facet_inv(),
+                           self.qhull_data[np.array(self.facets), -1])
+        x = np.concatenate([amounts[:, 1:], natoms[:, None]], axis=1) / natoms[:, None]
+        energies = np.zeros(len(x))
+        chunk = max(1, 10 ** 7 // len(planes))
+        for i in range(0, len(x), chunk):
+            energies[i:i + chunk] = np.max(np.dot(x[i:i + chunk], planes.T), axis=1)
+        return energies if per_atom else energies * natoms
+
+    def get_e_above_hulls(self, entries, allow_negative=False):
+        """
+        Provides the energies above convex hull of many entries at once.
+
+        Args:
+            entries: A list of PDEntry like objects
+            allow_negative: Whether to allow negative e_above_hulls.
+
+        Returns:
+            Array of energies above convex hull of the entries. Stable entries
+            have energy above hull of 0.
+        """
+        entries = list(entries)
+        ehulls = np.array([e.energy_per_atom for e in entries]) - \
+            self.get_hull_energies([e.composition for e in entries], per_atom=True)
+        ehulls[[e in self.stable_entries for e in entries]] = 0
+        if not allow_negative and (ehulls < -PhaseDiagram.numerical_tol).any():
+            raise ValueError("No valid decomp found!")
+        return ehulls
+
     def get_decomp_and_e_above_hull(self, entry, allow_negative=False):
         """
         Provides the decomposition and energy above convex hull for an entry.
@@ -937,6 +1073,502 @@ class PhaseDiagram(MSONable):
         return res
 
 
+class IncrementalPhaseDiagram(PhaseDiagram):
+    """
+    A PhaseDiagram that supports adding and removing entries without
+    rebuilding the convex hull from scratch. Adding an entry below the hull
+    only replaces the facets lying above it, and removing a stable entry only
+    re-triangulates the facets it was a vertex of, in both cases using a
+    convex hull of the few points involved. Queries such as
+    get_decomp_and_e_above_hull give the same answers as a PhaseDiagram
+    constructed from the current entries.
+
+    Changing an elemental reference changes the formation energies of all
+    entries, so such changes (and unary phase diagrams) fall back to a full
+    rebuild.
+    """
+
+    def __init__(self, entries, elements=None):
+        """
+        Standard constructor for incremental phase diagram.
+
+        Args:
+            entries ([PDEntry]): A list of PDEntry-like objects having an
+                energy, energy_per_atom and composition.
+            elements ([Element]): Optional list of elements in the phase
+                diagram. If set to None, the elements are determined from
+                the the entries themselves and are sorted alphabetically.
+                If specified, element ordering (e.g. for pd coordinates)
+                is preserved.
+        """
+        super().__init__(entries, elements)
+        self.facets, self._facet_planes = self._get_planes(self.facets)
+        self._facet_inv = None
+
+    def add_entry(self, entry):
+        """
+        Adds an entry to the phase diagram.
+
+        Args:
+            entry: A PDEntry-like object.
+        """
+        comp = entry.composition
+        if set(comp.elements).difference(self.elements):
+            raise ValueError('{} has elements not in the phase diagram {}'
+                             ''.format(comp, self.elements))
+        if self.dim == 1 or (comp.is_element and entry.energy_per_atom <
+                             self.el_refs[comp.elements[0]].energy_per_atom):
+            self.__init__(self.all_entries + [entry], self.elements)
+            return
+
+        self.all_entries.append(entry)
+        if self.get_form_energy_per_atom(entry) >= -self.formation_energy_tol:
+            return
+        # Only the lowest energy entry of each composition is used in the hull
+        diff = self.qhull_data[:-1, :-1] - self.pd_coords(comp)
+        current = np.where(np.all(np.abs(diff) < self.numerical_tol, axis=1))[0]
+        if len(current):
+            if self.qhull_entries[current[0]].energy_per_atom <= entry.energy_per_atom:
+                return
+            self._insert_point(entry)
+            self._delete_point(current[0])
+        else:
+            self._insert_point(entry)
+
+    def remove_entry(self, entry):
+        """
+        Removes an entry from the phase diagram.
+
+        Args:
+            entry: A PDEntry-like object in all_entries.
+        """
+        inds = [i for i, e in enumerate(self.all_entries) if e is entry]
+        if not inds:
+            raise ValueError("{} is not in the phase diagram".format(entry))
+        if self.dim == 1 or any(entry is e for e in self.el_refs.values()):
+            self.__init__([e for e in self.all_entries if e is not entry],
+                          self.elements)
+            return
+
+        self.all_entries.pop(inds[0])
+        inds = [i for i, e in enumerate(self.qhull_entries) if e is entry]
+        if not inds:
+            return
+        # The next lowest entry of the same composition takes its place
+        rcomp = entry.composition.reduced_composition
+        others = [e for e in self.all_entries
+                  if e.composition.reduced_composition == rcomp]
+        if others:
+            other = min(others, key=lambda e: e.energy_per_atom)
+            if self.get_form_energy_per_atom(other) < -self.formation_energy_tol:
+                self._insert_point(other)
+        self._delete_point(inds[0])
+
+    def _get_planes(self, facets):
+        """
+        Filters out degenerate facets and calculates the hyperplanes through
+        the remaining ones.
+
+        Args:
+            facets: Facets of the phase diagram.
+
+        Returns:
+            (facets, planes), where the energy of the plane through facet i is
+            np.dot(planes[i], [pd_coords, 1]).
+        """
+        facets = np.array(facets, dtype=int).reshape(-1, self.dim)
+        m = self.qhull_data[facets]
+        a = m.copy()
+        a[:, :, -1] = 1
+        valid = np.abs(np.linalg.det(a)) > 1e-14
+        planes = np.linalg.solve(a[valid], m[valid][:, :, -1:])[:, :, 0]
+        return list(facets[valid]), planes
+
+    def _get_bary_coords(self, facets, coords):
+        """
+        Barycentric coordinates of pd coordinates in each of the facets, as
+        an array of shape (len(facets), len(coords), dim).
+        """
+        a = self.qhull_data[np.array(facets)]
+        a[:, :, -1] = 1
+        coords = np.concatenate([coords, np.ones((len(coords), 1))], axis=1)
+        return np.einsum("nd,sde->sne", coords, np.linalg.inv(a))
+
+    def _get_lower_hull(self, points):
+        """
+        Facets and hyperplanes of the lower convex hull of a subset of the
+        qhull_data points.
+        """
+        points = np.asarray(points)
+        data = self.qhull_data[np.append(points, len(self.qhull_data) - 1)]
+        facets = [points[f] for f in get_facets(data) if max(f) != len(points)]
+        facets, planes = self._get_planes(facets)
+        # The extra point need not lie above the region spanned by the subset,
+        # in which case the hull also has upper facets without it.
+        lower = np.dot(planes, np.append(data[-1, :-1], 1)) < data[-1, -1]
+        return [f for f, l in zip(facets, lower) if l], planes[lower]
+
+    def _update_facets(self, keep, facets, planes):
+        """
+        Replaces the facets not in keep by new facets.
+        """
+        self.facets = [f for f, k in zip(self.facets, keep) if k] + facets
+        self.simplexes = [s for s, k in zip(self.simplexes, keep) if k] + \
+            [Simplex(self.qhull_data[f, :-1]) for f in facets]
+        self._facet_planes = np.concatenate([self._facet_planes[keep], planes])
+        self._facet_inv = None
+        self._stable_entries = set(self.qhull_entries[i] for i in
+                                   set(itertools.chain(*self.facets)))
+        PhaseDiagram._get_facet_and_simplex.cache_clear()
+
+    def _insert_point(self, entry):
+        """
+        Adds an entry to the qhull data and updates the facets lying above it.
+        """
+        n = len(self.qhull_entries)
+        row = np.append(self.pd_coords(entry.composition), entry.energy_per_atom)
+        # The extra point enforcing full dimensionality stays last
+        self.qhull_data = np.insert(self.qhull_data, n, row, axis=0)
+        self.qhull_entries.append(entry)
+
+        x = np.append(row[:-1], 1)
+        above = np.dot(self._facet_planes, x) - row[-1] > self.formation_energy_tol
+        if not above.any():
+            return
+        points = np.union1d(np.array(self.facets)[above].ravel(), [n])
+        facets, planes = self._get_lower_hull(points)
+        # Only facets joining the new point to the horizon are new, and they
+        # must lie below all the other points of the hull.
+        data = self.qhull_data[:-1]
+        x = np.concatenate([data[:, :-1], np.ones((len(data), 1))], axis=1)
+        valid = [n in f and np.all(np.dot(x, p) - data[:, -1] <=
+                                   self.formation_energy_tol)
+                 for f, p in zip(facets, planes)]
+        facets = [f for f, v in zip(facets, valid) if v]
+        self._update_facets(~above, facets, planes[np.array(valid, dtype=bool)])
+
+    def _delete_point(self, i):
+        """
+        Removes a point from the qhull data, re-triangulating the facets of
+        which it was a vertex.
+        """
+        star = np.array([i in f for f in self.facets], dtype=bool)
+        if star.any():
+            facets = np.array(self.facets)[star]
+            coords = self.qhull_data[:-1, :-1]
+            # Points in the region covered by the removed facets
+            bary = self._get_bary_coords(facets, coords)
+            inside = np.all(bary > -self.numerical_tol, axis=-1).any(axis=0)
+            inside[i] = False
+            new_facets, planes = self._get_lower_hull(np.where(inside)[0])
+            centroids = np.array([coords[f].mean(axis=0) for f in new_facets])
+            bary = self._get_bary_coords(facets, centroids.reshape(-1, self.dim - 1))
+            valid = np.all(bary > -self.numerical_tol, axis=-1).any(axis=0)
+            self._update_facets(~star, [f for f, v in zip(new_facets, valid) if v],
+                                planes[valid])
+
+        self.qhull_data = np.delete(self.qhull_data, i, axis=0)
+        self.qhull_entries.pop(i)
+        self.facets = [f - (f > i) for f in self.facets]
+
+
+class PatchedPhaseDiagram(PhaseDiagram):
+    """
+    A phase diagram for chemical systems with many elements, for which a
+    single convex hull is too expensive to compute. Since the decomposition
+    of a composition only involves entries within its own chemical system,
+    phase diagrams are only built for the largest chemical subsystems spanned
+    by the entries, and queries are answered by the smallest of these
+    subsystems containing the composition. Compositions not contained in any
+    of them are answered by a phase diagram of their own chemical system,
+    built on first use.
+
+    The chemical potentials at a composition are those of the elements of the
+    phase diagram answering for it. Methods needing the convex hull of the
+    whole chemical system, such as get_chempot_range_map and plotting, build
+    it on first use through the facets, simplexes, qhull_data and
+    qhull_entries attributes.
+
+    .. attribute: pds:
+
+        Dict of {frozenset of elements: PhaseDiagram} of the phase diagrams
+        of the chemical subsystems.
+    """
+
+    def __init__(self, entries, elements=None, ncpus=None):
+        """
+        Standard constructor for patched phase diagram.
+
+        Args:
+            entries ([PDEntry]): A list of PDEntry-like objects having an
+                energy, energy_per_atom and composition.
+            elements ([Element]): Optional list of elements in the phase
+                diagram. If set to None, the elements are determined from
+                the the entries themselves and are sorted alphabetically.
+                If specified, element ordering (e.g. for pd coordinates)
+                is preserved.
+            ncpus (int): Number of processes used to build the phase diagrams
+                of the subsystems. Default of None means serial processing.
+        """
+        if elements is None:
+            elements = set()
+            for entry in entries:
+                elements.update(entry.composition.elements)
+            elements = sorted(list(elements))
+
+        elements = list(elements)
+        entries = list(entries)
+
+        el_refs = {}
+        for entry in entries:
+            comp = entry.composition
+            if comp.is_element:
+                el = comp.elements[0]
+                if el not in el_refs or entry.energy_per_atom < el_refs[el].energy_per_atom:
+                    el_refs[el] = entry
+
+        if len(el_refs) != len(elements):
+            raise PhaseDiagramError(
+                "There are no entries associated with a terminal element!.")
+
+        chemsys_entries = collections.defaultdict(list)
+        for entry in entries:
+            chemsys_entries[frozenset(entry.composition.elements)].append(entry)
+        # Only the largest subsystems need a phase diagram of their own
+        spaces = [s for s in chemsys_entries
+                  if not any(s < t for t in chemsys_entries)]
+        args = []
+        for space in spaces:
+            space_entries = []
+            for chemsys, g in chemsys_entries.items():
+                if chemsys <= space:
+                    space_entries.extend(g)
+            args.append((space_entries, [el for el in elements if el in space]))
+
+        if ncpus:
+            with Pool(ncpus) as pool:
+                pds = []
+                for (space_entries, _), (copies, pd) in zip(args, pool.imap(_get_pd, args)):
+                    _replace_entries(pd, dict(zip(map(id, copies), space_entries)))
+                    pds.append(pd)
+        else:
+            pds = [PhaseDiagram(*a) for a in args]
+
+        self.pds = dict(zip(spaces, pds))
+        self.all_entries = entries
+        self.dim = len(elements)
+        self.el_refs = el_refs
+        self.elements = elements
+        self._stable_entries = set(itertools.chain(*[pd.stable_entries for pd in pds]))
+        self._chemsys_entries = chemsys_entries
+        self._space_pds = {}
+        self._facet_inv = None
+
+    def get_pd(self, comp):
+        """
+        Returns the phase diagram of the smallest chemical subsystem
+        containing a composition. If there is none, a phase diagram of the
+        chemical system of the composition is built from the entries within
+        it.
+
+        Args:
+            comp: A composition
+
+        Returns:
+            PhaseDiagram
+        """
+        space = frozenset(comp.elements)
+        if space not in self._space_pds:
+            if space.difference(self.elements):
+                raise ValueError('{} has elements not in the phase diagram {}'
+                                 ''.format(comp, self.elements))
+            spaces = [s for s in self.pds if space <= s]
+            if spaces:
+                pd = self.pds[min(spaces, key=len)]
+            else:
+                entries = []
+                for chemsys, g in self._chemsys_entries.items():
+                    if chemsys <= space:
+                        entries.extend(g)
+                pd = PhaseDiagram(entries, [el for el in self.elements if el in space])
+            self._space_pds[space] = pd
+        return self._space_pds[space]
+
+    @property
+    def _full_pd(self):
+        """
+        The phase diagram of the whole chemical system.
+        """
+        return self.get_pd(Composition({el: 1 for el in self.elements}))
+
+    @property
+    def facets(self):
+        """
+        Facets of the convex hull of the whole chemical system.
+        """
+        return self._full_pd.facets
+
+    @property
+    def simplexes(self):
+        """
+        Simplexes of the convex hull of the whole chemical system.
+        """
+        return self._full_pd.simplexes
+
+    @property
+    def qhull_data(self):
+        """
+        Data used in the convex hull of the whole chemical system.
+        """
+        return self._full_pd.qhull_data
+
+    @property
+    def qhull_entries(self):
+        """
+        Entries used in the convex hull of the whole chemical system.
+        """
+        return self._full_pd.qhull_entries
+
+    def get_composition_chempots(self, comp):
+        """
+        Get the chemical potentials for the elements of the phase diagram
+        answering for a composition.
+
+        :param comp: Composition
+        :return: Dict of chemical potentials.
+        """
+        return self.get_pd(comp).get_composition_chempots(comp)
+
+    def get_all_chempots(self, comp):
+        """
+        Get chemical potentials at a given compositon, for the elements of
+        the phase diagram answering for it.
+
+        :param comp: Composition
+        :return: Chemical potentials.
+        """
+        return self.get_pd(comp).get_all_chempots(comp)
+
+    def get_decomposition(self, comp):
+        """
+        Provides the decomposition at a particular composition.
+
+        Args:
+            comp: A composition
+
+        Returns:
+            Decomposition as a dict of {Entry: amount}
+        """
+        return self.get_pd(comp).get_decomposition(comp)
+
+    def _get_pd_groups(self, amounts):
+        """
+        Groups compositions by the phase diagram answering for them.
+
+        Args:
+            amounts (np.ndarray): Amounts of self.elements in each composition.
+
+        Yields:
+            (PhaseDiagram, indices of the compositions, amounts of the
+            elements of the PhaseDiagram in these compositions)
+        """
+        chemsys, inverse = np.unique(amounts > 0, axis=0, return_inverse=True)
+        for i, present in enumerate(chemsys):
+            pd = self.get_pd(Composition({el: 1 for el, p in zip(self.elements, present) if p}))
+            inds = np.where(inverse.ravel() == i)[0]
+            cols = [self.elements.index(el) for el in pd.elements]
+            yield pd, inds, amounts[inds][:, cols]
+
+    def get_decompositions(self, comps):
+        """
+        Provides the decompositions of many compositions at once.
+
+        Args:
+            comps: A list of compositions or an array of shape
+                (len(comps), dim) of the amounts of self.elements in each.
+
+        Returns:
+            List of decompositions as dicts of {Entry: amount}
+        """
+        amounts = self._get_amounts(comps)
+        decomps = [None] * len(amounts)
+        for pd, inds, pd_amounts in self._get_pd_groups(amounts):
+            for i, decomp in zip(inds, pd.get_decompositions(pd_amounts)):
+                decomps[i] = decomp
+        return decomps
+
+    def get_hull_energies(self, comps, per_atom=False):
+        """
+        Provides the hull energies of many compositions at once.
+
+        Args:
+            comps: A list of compositions or an array of shape
+                (len(comps), dim) of the amounts of self.elements in each.
+            per_atom (bool): Whether to normalize the energies by the number
+                of atoms.
+
+        Returns:
+            Array of energies of the lowest energy equilibria at the
+            compositions.
+        """
+        amounts = self._get_amounts(comps)
+        energies = np.zeros(len(amounts))
+        for pd, inds, pd_amounts in self._get_pd_groups(amounts):
+            energies[inds] = pd.get_hull_energies(pd_amounts, per_atom=per_atom)
+        return energies
+
+    def get_decomp_and_e_above_hull(self, entry, allow_negative=False):
+        """
+        Provides the decomposition and energy above convex hull for an entry.
+
+        Args:
+            entry: A PDEntry like object
+            allow_negative: Whether to allow negative e_above_hulls. Used to
+                calculate equilibrium reaction energies. Defaults to False.
+
+        Returns:
+            (decomp, energy above convex hull)  Stable entries should have
+            energy above hull of 0. The decomposition is provided as a dict of
+            {Entry: amount}.
+        """
+        return self.get_pd(entry.composition).get_decomp_and_e_above_hull(
+            entry, allow_negative=allow_negative)
+
+    def get_equilibrium_reaction_energy(self, entry):
+        """
+        Provides the reaction energy of a stable entry from the neighboring
+        equilibrium stable entries (also known as the inverse distance to
+        hull).
+
+        Args:
+            entry: A PDEntry like object
+
+        Returns:
+            Equilibrium reaction energy of entry. Stable entries should have
+            equilibrium reaction energy <= 0.
+        """
+        return self.get_pd(entry.composition).get_equilibrium_reaction_energy(entry)
+
+
+def _get_pd(args):
+    """
+    Builds a PhaseDiagram in a worker process. The entries are returned along
+    with it so that they can be mapped back to the originals.
+    """
+    entries, elements = args
+    return entries, PhaseDiagram(entries, elements)
+
+
+def _replace_entries(pd, entries):
+    """
+    Replaces the entries of a PhaseDiagram using a dict of {id: entry}.
+    """
+    pd.all_entries = [entries[id(e)] for e in pd.all_entries]
+    pd.qhull_entries = [entries[id(e)] for e in pd.qhull_entries]
+    pd.el_refs = {el: entries[id(e)] for el, e in pd.el_refs.items()}
+    pd._stable_entries = set(entries[id(e)] for e in pd._stable_entries)
+
+
 class GrandPotentialPhaseDiagram(PhaseDiagram):
     """
     A class representing a Grand potential phase diagram. Grand potential phase
@@ -8,6 +8,9 @@ This module provides classes to perform fitting of structures.
 
 import itertools
 import abc
+import hashlib
+from collections import OrderedDict, namedtuple
+from multiprocessing import Pool
 
 import numpy as np
 
@@ -33,6 +36,119 @@ __status__ = "Production"
 __date__ = "Dec 3, 2012"
 
 
+def _get_successive_minima(lattice):
+    """
+    Returns the lengths of the three shortest linearly independent vectors
+    of a lattice.
+    """
+    # the lattice vectors themselves are independent, so the minima are
+    # never longer than the longest of them. The padding makes sure that
+    # vectors lying exactly on the sphere are found.
+    r = max(lattice.abc) * 1.01
+    frac, dist, _, _ = lattice.get_points_in_sphere(
+        [[0, 0, 0]], [0, 0, 0], r, zip_results=False)
+    frac = np.round(frac).astype(np.int_)
+    vecs = []
+    minima = []
+    for i in np.argsort(dist, kind="stable"):
+        if not np.any(frac[i]):
+            continue
+        if len(vecs) == 1 and not np.any(np.cross(vecs[0], frac[i])):
+            continue
+        if len(vecs) == 2 and np.dot(np.cross(vecs[0], vecs[1]), frac[i]) == 0:
+            continue
+        vecs.append(frac[i])
+        minima.append(dist[i])
+        if len(vecs) == 3:
+            break
+    return np.array(minima)
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class _LRUCache:
+    """
+    Least recently used cache holding at most maxsize entries, which keeps
+    count of its hits and misses.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, func):
+        """
+        Returns the value stored for key, calling func() to compute and
+        store it if it is not cached yet.
+        """
+        try:
+            val = self._data[key]
+        except KeyError:
+            self.misses += 1
+            val = func()
+            self._data[key] = val
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        return val
+
+    def info(self):
+        """
+        :return: CacheInfo
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self):
+        """
+        Empties the cache and resets the counters.
+        """
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def _get_structure_key(struct):
+    """
+    Returns a digest identifying the lattice, species, coordinates and site
+    properties of a structure.
+    """
+    h = hashlib.sha1()
+    h.update(struct.lattice.matrix.tobytes())
+    h.update(struct.frac_coords.tobytes())
+    species = ";".join(",".join("%r:%r" % (sp, amt) for sp, amt in comp.items())
+                       for comp in struct.species_and_occu)
+    h.update(species.encode())
+    h.update(repr(sorted(struct.site_properties.items())).encode())
+    return h.hexdigest()
+
+
+_GROUP_WORKER_STATE = {}
+
+
+def _init_group_worker(matcher, s_list, anonymous):
+    """
+    Initializes a StructureMatcher.group_structures worker process so that
+    only pairs of indices have to be sent to it.
+    """
+    _GROUP_WORKER_STATE["matcher"] = matcher
+    _GROUP_WORKER_STATE["s_list"] = s_list
+    _GROUP_WORKER_STATE["anonymous"] = anonymous
+
+
+def _fit_group_pair(pair):
+    matcher = _GROUP_WORKER_STATE["matcher"]
+    s_list = _GROUP_WORKER_STATE["s_list"]
+    i, j = pair
+    if _GROUP_WORKER_STATE["anonymous"]:
+        return matcher.fit_anonymous(s_list[i], s_list[j])
+    return matcher.fit(s_list[i], s_list[j])
+
+
 class AbstractComparator(MSONable, metaclass=abc.ABCMeta):
     """
     Abstract Comparator class. A Comparator defines how sites are compared in
@@ -336,7 +452,7 @@ class StructureMatcher(MSONable):
     def __init__(self, ltol=0.2, stol=0.3, angle_tol=5, primitive_cell=True,
                  scale=True, attempt_supercell=False, allow_subset=False,
                  comparator=SpeciesComparator(), supercell_size='num_sites',
-                 ignored_species=None):
+                 ignored_species=None, cache_size=None):
         """
         Args:
             ltol (float): Fractional length tolerance. Default is 0.2.
@@ -378,6 +494,17 @@ class StructureMatcher(MSONable):
                 except for certain ions, e.g., Li-ion intercalation frameworks.
                 This is more useful than allow_subset because it allows better
                 control over what species are ignored in the matching.
+            cache_size (int): If set, the reduced (Niggli and primitive)
+                structures computed during preprocessing and the candidate
+                lattice mappings are kept in LRU caches holding at most
+                cache_size entries each, so that they are reused across
+                calls to fit, get_rms_dist, fit_anonymous, group_structures,
+                etc. The reduced structures are reused whenever the same
+                structure is compared against many others. The lattice
+                mappings depend on both (scaled) lattices, so they are only
+                reused when the same pair of structures is compared again.
+                Default of None disables caching. See cache_info() for hit
+                and miss statistics.
         """
 
         self.ltol = ltol
@@ -391,6 +518,35 @@ class StructureMatcher(MSONable):
         self._subset = allow_subset
         self._ignored_species = [] if ignored_species is None else \
             ignored_species[:]
+        self._cache_size = cache_size
+        if cache_size:
+            self._structure_cache = _LRUCache(cache_size)
+            self._lattice_cache = _LRUCache(cache_size)
+        else:
+            self._structure_cache = None
+            self._lattice_cache = None
+
+    def cache_info(self):
+        """
+        Returns the statistics of the preprocessing caches.
+
+        Returns:
+            {"structures": CacheInfo, "lattices": CacheInfo}, where CacheInfo
+            is a namedtuple of (hits, misses, maxsize, currsize), or None if
+            caching is disabled.
+        """
+        if self._structure_cache is None:
+            return None
+        return {"structures": self._structure_cache.info(),
+                "lattices": self._lattice_cache.info()}
+
+    def cache_clear(self):
+        """
+        Empties the preprocessing caches and resets their statistics.
+        """
+        if self._structure_cache is not None:
+            self._structure_cache.clear()
+            self._lattice_cache.clear()
 
     def _get_supercell_size(self, s1, s2):
         """
@@ -433,12 +589,22 @@ class StructureMatcher(MSONable):
         Args:
             s, target_s: Structure objects
         """
-        lattices = s.lattice.find_all_mappings(
-            target_lattice, ltol=self.ltol, atol=self.angle_tol,
-            skip_rotation_matrix=True)
-        for l, _, scale_m in lattices:
-            if abs(abs(np.linalg.det(scale_m)) - supercell_size) < 0.5:
-                yield l, scale_m
+        def find_lattices():
+            lattices = s.lattice.find_all_mappings(
+                target_lattice, ltol=self.ltol, atol=self.angle_tol,
+                skip_rotation_matrix=True)
+            for l, _, scale_m in lattices:
+                if abs(abs(np.linalg.det(scale_m)) - supercell_size) < 0.5:
+                    yield l, scale_m
+
+        if self._lattice_cache is None:
+            return find_lattices()
+
+        # The lattices are already scaled to each other's volume when scale
+        # is True, so this only hits for a repeated pair of structures.
+        key = (s.lattice.matrix.tobytes(), target_lattice.matrix.tobytes(),
+               supercell_size, self.ltol, self.angle_tol)
+        return iter(self._lattice_cache.get(key, lambda: list(find_lattices())))
 
     def _get_supercells(self, struct1, struct2, fu, s1_supercell):
         """
@@ -651,17 +817,8 @@ class StructureMatcher(MSONable):
         and finds fu, the supercell size to make struct1 comparable to
         s2
         """
-        struct1 = struct1.copy()
-        struct2 = struct2.copy()
-
-        if niggli:
-            struct1 = struct1.get_reduced_structure(reduction_algo="niggli")
-            struct2 = struct2.get_reduced_structure(reduction_algo="niggli")
-
-        # primitive cell transformation
-        if self._primitive_cell:
-            struct1 = struct1.get_primitive_structure()
-            struct2 = struct2.get_primitive_structure()
+        struct1 = self._get_reduced_structure(struct1, niggli)
+        struct2 = self._get_reduced_structure(struct2, niggli)
 
         if self._supercell:
             fu, s1_supercell = self._get_supercell_size(struct1, struct2)
@@ -679,6 +836,27 @@ class StructureMatcher(MSONable):
 
         return struct1, struct2, fu, s1_supercell
 
+    def _get_reduced_structure(self, struct, niggli=True):
+        """
+        Returns a copy of struct reduced to its Niggli and primitive cell,
+        as set by niggli and the primitive_cell setting.
+        """
+        def reduce():
+            s = struct.copy()
+            if niggli:
+                s = s.get_reduced_structure(reduction_algo="niggli")
+            # primitive cell transformation
+            if self._primitive_cell:
+                s = s.get_primitive_structure()
+            return s
+
+        if self._structure_cache is None:
+            return reduce()
+
+        key = (_get_structure_key(struct), niggli, self._primitive_cell)
+        # cached structures are copied since preprocessing rescales them
+        return self._structure_cache.get(key, reduce).copy()
+
     def _match(self, struct1, struct2, fu, s1_supercell=True, use_rms=False,
                break_on_match=False):
         """
@@ -758,14 +936,43 @@ class StructureMatcher(MSONable):
 
         return None
 
-    def group_structures(self, s_list, anonymous=False):
+    def _get_grouping_invariants(self, struct):
+        """
+        Computes cheap invariants of a structure that are used by
+        group_structures to discard pairs that cannot possibly be fit.
+
+        Returns:
+            (num_sites, minima, lengths), where num_sites is the number of
+            sites after reduction, minima are the successive minima of the
+            reduced lattice and lengths are the sorted reduced lattice
+            parameters. Both length arrays are normalized by V ** (1/3) if
+            the matcher scales volumes.
+        """
+        struct = self._get_reduced_structure(struct)
+        latt = struct.lattice
+        norm = latt.volume ** (1 / 3) if self._scale else 1
+        return (len(struct), _get_successive_minima(latt) / norm,
+                np.sort(latt.abc) / norm)
+
+    def group_structures(self, s_list, anonymous=False, ncpus=None):
         """
         Given a list of structures, use fit to group
         them by structural equality.
 
+        Structures are first binned by composition hash and, unless
+        attempt_supercell is set, by their number of sites after
+        reduction. Within a bin, a pair is only fit if the successive
+        minima of the first lattice are within ltol of the reduced lattice
+        parameters of the second, which is a necessary condition for any
+        lattice mapping to be found. The screening therefore never changes
+        the result, only the number of calls to fit.
+
         Args:
             s_list ([Structure]): List of structures to be grouped
             anonymous (bool): Whether to use anonymous mode.
+            ncpus (int): Number of processes used to run the remaining fits.
+                Default of None means serial processing. The output is the
+                same regardless of the number of processes.
 
         Returns:
             A list of lists of matched structures
@@ -792,26 +999,69 @@ class StructureMatcher(MSONable):
         sorted_s_list = sorted(enumerate(s_list), key=s_hash)
         all_groups = []
 
-        # For each pre-grouped list of structures, perform actual matching.
-        for k, g in itertools.groupby(sorted_s_list, key=s_hash):
-            unmatched = list(g)
-            while len(unmatched) > 0:
-                i, refs = unmatched.pop(0)
-                matches = [i]
-                if anonymous:
-                    inds = filter(lambda i: self.fit_anonymous(refs,
-                                                               unmatched[i][1]), list(range(len(unmatched))))
-                else:
-                    inds = filter(lambda i: self.fit(refs, unmatched[i][1]),
-                                  list(range(len(unmatched))))
-                inds = list(inds)
-                matches.extend([unmatched[i][0] for i in inds])
-                unmatched = [unmatched[i] for i in range(len(unmatched))
-                             if i not in inds]
-                all_groups.append([original_s_list[i] for i in matches])
+        pool = None
+        if ncpus:
+            pool = Pool(ncpus, initializer=_init_group_worker,
+                        initargs=(self, s_list, anonymous))
+
+        try:
+            # For each pre-grouped list of structures, perform actual matching.
+            for k, g in itertools.groupby(sorted_s_list, key=s_hash):
+                inds = [i for i, s in g]
+                for group in self._group_by_fit(s_list, inds, anonymous, pool):
+                    all_groups.append([original_s_list[i] for i in group])
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
         return all_groups
 
+    def _group_by_fit(self, s_list, inds, anonymous, pool=None):
+        """
+        Greedily groups the structures s_list[inds], which all share the
+        same composition hash, and returns lists of indices in s_list.
+        """
+        if len(inds) == 1:
+            return [inds]
+
+        inds = np.array(inds)
+        if self._supercell:
+            bins = np.zeros(len(inds), dtype=np.int_)
+            minima = lengths = None
+        else:
+            invariants = [self._get_grouping_invariants(s_list[i])
+                          for i in inds]
+            bins = np.array([inv[0] for inv in invariants])
+            minima = np.array([inv[1] for inv in invariants])
+            lengths = np.array([inv[2] for inv in invariants])
+            # find_all_mappings only accepts vectors shorter than
+            # (1 + ltol) times the target lattice parameters
+            lengths *= (1 + self.ltol) * (1 + 1e-8)
+
+        groups = []
+        unmatched = np.ones(len(inds), dtype=bool)
+        for i in range(len(inds)):
+            if not unmatched[i]:
+                continue
+            unmatched[i] = False
+            cands = unmatched & (bins == bins[i])
+            if minima is not None:
+                cands &= np.all(minima[i] <= lengths, axis=1)
+            cands = np.where(cands)[0]
+            pairs = [(inds[i], inds[j]) for j in cands]
+            if pool is not None:
+                fits = pool.map(_fit_group_pair, pairs)
+            else:
+                fit = self.fit_anonymous if anonymous else self.fit
+                fits = [fit(s_list[a], s_list[b]) for a, b in pairs]
+            matches = cands[np.array(fits, dtype=bool)] \
+                if len(cands) else cands
+            unmatched[matches] = False
+            groups.append([inds[i]] + [inds[j] for j in matches])
+
+        return [[int(i) for i in g] for g in groups]
+
     def as_dict(self):
         """
         :return: MSONable dict
@@ -827,7 +1077,8 @@ class StructureMatcher(MSONable):
                 "attempt_supercell": self._supercell,
                 "allow_subset": self._subset,
                 "supercell_size": self._supercell_size,
-                "ignored_species": self._ignored_species}
+                "ignored_species": self._ignored_species,
+                "cache_size": self._cache_size}
 
     @classmethod
     def from_dict(cls, d):
@@ -842,7 +1093,8 @@ class StructureMatcher(MSONable):
             allow_subset=d["allow_subset"],
             comparator=AbstractComparator.from_dict(d["comparator"]),
             supercell_size=d["supercell_size"],
-            ignored_species=d["ignored_species"])
+            ignored_species=d["ignored_species"],
+            cache_size=d.get("cache_size"))
 
     def _anonymous_match(self, struct1, struct2, fu, s1_supercell=True,
                          use_rms=False, break_on_match=False, single_match=False):
@@ -14,6 +14,7 @@ import scipy.constants as const
 from pymatgen.analysis.diffusion_analyzer import DiffusionAnalyzer, \
     get_conversion_factor, fit_arrhenius
 from pymatgen.core.structure import Structure
+from pymatgen.io.vasp.outputs import Xdatcar
 from pymatgen.util.testing import PymatgenTest
 from monty.tempfile import ScratchDir
 
@@ -322,6 +323,18 @@ class DiffusionAnalyzerTest(PymatgenTest):
                                                          [0.21, 0.21, 0.21],
                                                          [0.40, 0.40, 0.40]]))
 
+    def test_from_xdatcars(self):
+        filepath = os.path.join(test_dir, "Traj_XDATCAR")
+        structures = Xdatcar(filepath).structures * 2
+        for step_skip in [1, 7]:
+            d = DiffusionAnalyzer.from_xdatcars([filepath, filepath], specie="Li", temperature=1000,
+                                                time_step=2, step_skip=step_skip, smoothed=False)
+            d2 = DiffusionAnalyzer.from_structures(structures[::step_skip], specie="Li", temperature=1000,
+                                                   time_step=2, step_skip=step_skip, smoothed=False)
+            self.assertArrayAlmostEqual(d.disp, d2.disp)
+            self.assertArrayAlmostEqual(d.lattices, d2.lattices)
+            self.assertAlmostEqual(d.diffusivity, d2.diffusivity)
+
 
 if __name__ == '__main__':
     unittest.main()
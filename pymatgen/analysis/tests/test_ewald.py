@@ -7,7 +7,7 @@ import unittest
 import os
 import warnings
 
-from pymatgen.analysis.ewald import EwaldSummation, EwaldMinimizer
+from pymatgen.analysis.ewald import EwaldSummation, EwaldMinimizer, EwaldEnergyUpdater
 from pymatgen.io.vasp.inputs import Poscar
 import numpy as np
 
@@ -64,6 +64,23 @@ class EwaldSummationTest(unittest.TestCase):
         ham2 = EwaldSummation(self.original_s)
         self.assertAlmostEqual(ham2.real_space_energy, -502.23549897772602, 4)
 
+    def test_real_space_energy_sparse_matrix(self):
+        ham = EwaldSummation(self.s)
+        sparse = ham.real_space_energy_sparse_matrix
+        self.assertIsNone(ham._real)
+        self.assertAlmostEqual(sparse.sum(), -502.23549897772602, 4)
+        self.assertTrue(np.allclose(sparse.toarray(), ham.real_space_energy_matrix))
+
+    def test_compute_partial_energy(self):
+        ham = EwaldSummation(self.s)
+        matrix = ham.total_energy_matrix
+        matrix[[0, 5], :] = 0
+        matrix[:, [0, 5]] = 0
+        self.assertAlmostEqual(ham.compute_partial_energy([0, 5, 5]), np.sum(matrix))
+        s = self.s.copy()
+        s.remove_sites([0, 5])
+        self.assertAlmostEqual(ham.compute_sub_structure(s), np.sum(matrix))
+
     def test_from_dict(self):
         ham = EwaldSummation(self.s, compute_forces=True)
         ham2 = EwaldSummation.from_dict(ham.as_dict())
@@ -95,6 +112,43 @@ class EwaldSummationTest(unittest.TestCase):
                          EwaldSummation.from_dict(d).as_dict())
 
 
+class EwaldEnergyUpdaterTest(unittest.TestCase):
+
+    def setUp(self):
+        warnings.simplefilter("ignore")
+        filepath = os.path.join(test_dir, 'POSCAR')
+        p = Poscar.from_file(filepath, check_for_POTCAR=False)
+        self.s = p.structure
+        self.s.add_oxidation_state_by_element({"Li": 1, "Fe": 2,
+                                               "P": 5, "O": -2})
+        self.ewald = EwaldSummation(self.s)
+
+    def tearDown(self):
+        warnings.simplefilter("default")
+
+    def test_update(self):
+        updater = EwaldEnergyUpdater(self.ewald)
+        self.assertAlmostEqual(updater.energy, self.ewald.total_energy)
+
+        de = updater.get_removal_energy([0, 1])
+        self.assertAlmostEqual(updater.update([0, 1], [0, 0]), de)
+        s = self.s.copy()
+        s.remove_sites([0, 1])
+        self.assertAlmostEqual(updater.energy, EwaldSummation(s, eta=self.ewald.eta).total_energy)
+
+        self.assertNotEqual(self.s[2].specie, self.s[10].specie)
+        de = updater.get_swap_energy(2, 10)
+        self.assertAlmostEqual(updater.update([2, 10], updater.charges[[10, 2]]), de)
+        s = self.s.copy()
+        specie = s[2].specie
+        s.replace(2, s[10].specie)
+        s.replace(10, specie)
+        s.remove_sites([0, 1])
+        self.assertAlmostEqual(updater.energy, EwaldSummation(s, eta=self.ewald.eta).total_energy)
+        self.assertEqual(updater.get_swap_energy(3, 3), 0)
+        self.assertRaises(ValueError, updater.get_energy_change, [3, 3], [1, 1])
+
+
 class EwaldMinimizerTest(unittest.TestCase):
     def setUp(self):
         warnings.simplefilter("ignore")
@@ -124,6 +178,19 @@ class EwaldMinimizerTest(unittest.TestCase):
                                "Returned wrong minimum value")
         self.assertEqual(len(e_min.best_m_list), 6,
                          "Returned wrong number of permutations")
+        self.assertGreater(e_min.nodes_expanded, 0)
+        self.assertGreater(e_min.nodes_pruned, 0)
+
+        e_min2 = EwaldMinimizer(matrix, m_list, 50, ncpus=2)
+        self.assertEqual(len(e_min2.output_lists), 15)
+        self.assertAlmostEqual(e_min2.minimized_sum, e_min.minimized_sum)
+        self.assertEqual(e_min2.best_m_list, e_min.best_m_list)
+        for (s1, _), (s2, _) in zip(e_min.output_lists, e_min2.output_lists):
+            self.assertAlmostEqual(s1, s2)
+
+        e_min3 = EwaldMinimizer(matrix, m_list, 50, time_limit=0)
+        self.assertEqual(len(e_min3.output_lists), 0)
+        self.assertIsNone(e_min3.best_m_list)
 
     def test_site(self):
         """Test that uses an uncharged structure"""
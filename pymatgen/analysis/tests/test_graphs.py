@@ -12,6 +12,7 @@ from monty.serialization import loadfn  # , dumpfn
 from pymatgen.command_line.critic2_caller import Critic2Analysis
 from pymatgen.core.structure import Molecule, Structure, FunctionalGroups, Site
 from pymatgen.analysis.graphs import *
+from pymatgen.analysis.graphs import _graph_hash
 from pymatgen.analysis.local_env import (
     MinimumDistanceNN,
     MinimumOKeeffeNN,
@@ -411,6 +412,18 @@ from    to  to_image
         for n in range(len(nio_sg)):
             self.assertEqual(nio_sg.get_coordination_of_site(n), 6)
 
+        # test edges going through several periodic boundaries at once
+
+        hcp = Structure(Lattice.hexagonal(3.2, 5.1), ["Zn", "Zn"],
+                        [[1 / 3, 2 / 3, 0.25], [2 / 3, 1 / 3, 0.75]])
+        hcp_sg_mul = StructureGraph.with_local_env_strategy(hcp, MinimumDistanceNN(cutoff=3.5)) * (3, 2, 2)
+        hcp_sg_premul = StructureGraph.with_local_env_strategy(
+            hcp * (3, 2, 2), MinimumDistanceNN(cutoff=3.5)
+        )
+        self.assertTrue(hcp_sg_mul == hcp_sg_premul)
+        for n in range(len(hcp_sg_mul)):
+            self.assertEqual(hcp_sg_mul.get_coordination_of_site(n), 12)
+
     @unittest.skipIf(
         not (which("neato") and which("fdp")), "graphviz executables not present"
     )
@@ -920,6 +933,28 @@ class MoleculeGraphTest(unittest.TestCase):
             # Test that each fragment is connected
             self.assertTrue(nx.is_connected(unique_fragments[ii].graph.to_undirected()))
 
+    def test_graph_hash(self):
+        self.cyclohexene.set_node_attributes()
+        graph = self.cyclohexene.graph
+        mapping = {n: (7 * n + 3) % len(graph) for n in graph.nodes}
+        relabelled = nx.relabel_nodes(graph, mapping)
+        self.assertEqual(_graph_hash(graph), _graph_hash(relabelled))
+        self.assertEqual(_graph_hash(graph, edge_attr="weight"), _graph_hash(relabelled, edge_attr="weight"))
+        self.assertEqual(_graph_hash(graph.to_undirected()), _graph_hash(graph))
+
+        # different species, weights or bonds give different hashes
+        species = nx.get_node_attributes(graph, "specie")
+        species[0] = "O"
+        self.assertNotEqual(_graph_hash(graph, node_labels=species), _graph_hash(graph))
+        changed = copy.deepcopy(graph)
+        u, v, k = next(iter(changed.edges(keys=True)))
+        changed[u][v][k]["weight"] = 3.0
+        self.assertEqual(_graph_hash(changed), _graph_hash(graph))
+        self.assertNotEqual(_graph_hash(changed, edge_attr="weight"), _graph_hash(graph, edge_attr="weight"))
+        changed.remove_edge(u, v, k)
+        changed.add_edge(0, 3)
+        self.assertNotEqual(_graph_hash(changed), _graph_hash(graph))
+
     def test_find_rings(self):
         rings = self.cyclohexene.find_rings(including=[0])
         self.assertEqual(
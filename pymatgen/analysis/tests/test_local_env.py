@@ -183,6 +183,42 @@ class VoronoiNNTest(PymatgenTest):
 
             self.assertArrayAlmostEqual(all_weights, by_one_weights)
 
+    def test_tessellation_cache(self):
+        nn = VoronoiNN(targets=[Element("O")])
+        by_one = [nn.get_nn_info(self.s, i) for i in range(len(self.s))]
+        self.assertIs(nn._voronoi_cache["structure"], self.s)
+        self.assertTrue(nn._voronoi_cache["polyhedra"])
+        self.assertEqual(nn, VoronoiNN(targets=[Element("O")]))
+        for i, info in enumerate(by_one):
+            expected = self.nn.get_nn_info(self.s.copy(), i)
+            self.assertEqual(
+                sorted((x["site_index"], tuple(x["image"])) for x in info),
+                sorted((x["site_index"], tuple(x["image"])) for x in expected))
+        # The cached polyhedra are not modified by get_nn_info
+        for poly_info in nn.get_voronoi_polyhedra(self.s, 0).values():
+            self.assertIn("site", poly_info)
+
+        # Modifying the structure in place invalidates the cache
+        s = self.s.copy()
+        for i in range(len(s)):
+            nn.get_cn(s, i)
+        s.translate_sites([0], [0.05, 0, 0])
+        self.assertAlmostEqual(nn.get_cn(s, 0, use_weights=True),
+                               self.nn.get_cn(s.copy(), 0, use_weights=True))
+        self.assertIsNone(nn._voronoi_cache["polyhedra"])
+        nn.clear_cache()
+        self.assertIsNone(nn._voronoi_cache)
+
+        # Sites outside of the unit cell
+        s = self.s.copy()
+        s.translate_sites([0, 5], [1.2, -0.7, 2.1], to_unit_cell=False)
+        all_nn_info = nn.get_all_nn_info(s)
+        for i in range(len(s)):
+            expected = self.nn.get_nn_info(s.copy(), i)
+            self.assertEqual(
+                sorted((x["site_index"], tuple(x["image"])) for x in all_nn_info[i]),
+                sorted((x["site_index"], tuple(x["image"])) for x in expected))
+
     def test_Cs2O(self):
         """A problematic structure in the Materials Project"""
         strc = Structure([[4.358219, 0.192833, 6.406960], [2.114414, 3.815824, 6.406960],
@@ -439,6 +475,27 @@ class MiniDistNNTest(PymatgenTest):
         self.assertEqual(crystalnn.get_cn(self.cscl, 0), 8)
         self.assertEqual(crystalnn.get_cn(self.lifepo4, 0), 6)
 
+    def test_get_all_nn_info(self):
+        def nn_keys(nn_info):
+            return sorted((d["site_index"], tuple(d["image"]), round(d["weight"], 8))
+                          for d in nn_info)
+
+        structure = self.lifepo4.copy()
+        structure.make_supercell([1, 2, 1])
+        structure.perturb(0.05)
+        strategies = [MinimumDistanceNN(), MinimumDistanceNN(cutoff=4, get_all_sites=True),
+                      JmolNN(), BrunnerNN_reciprocal(), BrunnerNN_relative(),
+                      BrunnerNN_real(), CutOffDictNN({("Fe2+", "O2-"): 2.3, ("P5+", "O2-"): 1.6})]
+        for nn in strategies:
+            for s in [self.diamond, self.nacl, self.cscl, self.mos2, structure]:
+                all_nn_info = nn.get_all_nn_info(s)
+                self.assertEqual(len(all_nn_info), len(s))
+                for n, nn_info in enumerate(all_nn_info):
+                    self.assertEqual(nn_keys(nn_info), nn_keys(nn.get_nn_info(s, n)))
+                    for d in nn_info:
+                        self.assertAlmostEqual(np.linalg.norm(d["site"].coords - s[n].coords),
+                                               d["site"].nn_distance)
+
     def test_get_local_order_params(self):
         nn = MinimumDistanceNN()
         ops = nn.get_local_order_parameters(self.diamond, 0)
@@ -1053,6 +1110,19 @@ class CrystalNNTest(PymatgenTest):
         self.assertAlmostEqual(cnn.get_cn(self.lifepo4, 0, use_weights=True),
                                5.8630, 2)
 
+    def test_get_all_nn_info(self):
+        for cnn in [CrystalNN(), CrystalNN(weighted_cn=True, cation_anion=True)]:
+            all_nn_info = cnn.get_all_nn_info(self.lifepo4)
+            self.assertEqual(len(all_nn_info), len(self.lifepo4))
+            for i, info in enumerate(all_nn_info):
+                # Compute using the by-one method, without cached tessellation
+                by_one = cnn.get_nn_info(self.lifepo4.copy(), i)
+                self.assertEqual(
+                    sorted((x["site_index"], tuple(x["image"]), x["weight"]) for x in info),
+                    sorted((x["site_index"], tuple(x["image"]), x["weight"]) for x in by_one))
+            cnn.clear_cache()
+            self.assertIsNone(cnn._voronoi_nn)
+
     def test_x_diff_weight(self):
         cnn = CrystalNN(weighted_cn=True, x_diff_weight=0)
         self.assertAlmostEqual(cnn.get_cn(self.lifepo4, 0, use_weights=True),
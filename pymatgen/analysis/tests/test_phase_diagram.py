@@ -5,6 +5,7 @@
 
 import unittest
 import os
+import random
 from numbers import Number
 import warnings
 from pathlib import Path
@@ -300,6 +301,32 @@ class PhaseDiagramTest(unittest.TestCase):
             n_h_e = self.pd.get_hull_energy(entry.composition.fractional_composition)
             self.assertAlmostEqual(n_h_e, entry.energy_per_atom)
 
+    def test_get_hull_energies(self):
+        comps = [e.composition for e in self.pd.all_entries] + [Composition("Li3Fe7O11")]
+        energies = self.pd.get_hull_energies(comps)
+        for comp, e in zip(comps, energies):
+            self.assertAlmostEqual(e, self.pd.get_hull_energy(comp))
+        amounts = np.array([[c[el] for el in self.pd.elements] for c in comps])
+        np.testing.assert_array_almost_equal(self.pd.get_hull_energies(amounts), energies)
+        np.testing.assert_array_almost_equal(self.pd.get_hull_energies(comps, per_atom=True),
+                                             energies / amounts.sum(axis=1))
+        self.assertRaises(ValueError, self.pd.get_hull_energies, [Composition("NaCl")])
+
+    def test_get_decompositions(self):
+        comps = [e.composition for e in self.pd.all_entries] + [Composition("Li3Fe7O11")]
+        for comp, decomp in zip(comps, self.pd.get_decompositions(comps)):
+            expected = self.pd.get_decomposition(comp)
+            self.assertEqual(set(map(id, decomp)), set(map(id, expected)))
+            for entry, amt in decomp.items():
+                self.assertAlmostEqual(amt, expected[entry])
+
+    def test_get_e_above_hulls(self):
+        ehulls = self.pd.get_e_above_hulls(self.pd.all_entries)
+        for entry, ehull in zip(self.pd.all_entries, ehulls):
+            self.assertAlmostEqual(ehull, self.pd.get_e_above_hull(entry))
+        self.assertRaises(ValueError, self.pd.get_e_above_hulls, [PDEntry("Li2O", -100)])
+        self.assertLess(self.pd.get_e_above_hulls([PDEntry("Li2O", -100)], allow_negative=True)[0], 0)
+
     def test_1d_pd(self):
         entry = PDEntry('H', 0)
         pd = PhaseDiagram([entry])
@@ -413,6 +440,120 @@ class PhaseDiagramTest(unittest.TestCase):
                          pd_roundtrip.all_entries[0].entry_id)
 
 
+class IncrementalPhaseDiagramTest(unittest.TestCase):
+    def setUp(self):
+        self.entries = sorted(EntrySet.from_csv(str(module_dir / "pdentries_test.csv")),
+                              key=lambda e: (e.composition.reduced_formula, e.energy_per_atom))
+        warnings.simplefilter("ignore")
+
+    def assertSamePD(self, pd, entries):
+        ref = PhaseDiagram(entries)
+        self.assertEqual(set(map(id, pd.stable_entries)), set(map(id, ref.stable_entries)))
+        for entry in self.entries:
+            decomp, ehull = pd.get_decomp_and_e_above_hull(entry, allow_negative=True)
+            ref_decomp, ref_ehull = ref.get_decomp_and_e_above_hull(entry, allow_negative=True)
+            self.assertAlmostEqual(ehull, ref_ehull)
+            self.assertEqual(set(map(id, decomp)), set(map(id, ref_decomp)))
+
+    def test_add_remove_entry(self):
+        random.seed(42)
+        elements = [e for e in self.entries if e.composition.is_element]
+        compounds = [e for e in self.entries if not e.composition.is_element]
+        random.shuffle(compounds)
+        entries = elements + compounds[:10]
+        pd = IncrementalPhaseDiagram(entries)
+        self.assertSamePD(pd, entries)
+        for entry in compounds[10:40]:
+            pd.add_entry(entry)
+            entries.append(entry)
+            self.assertSamePD(pd, entries)
+        for entry in random.sample(entries[len(elements):], 20):
+            pd.remove_entry(entry)
+            entries.remove(entry)
+            self.assertSamePD(pd, entries)
+
+        # Changing the elemental references rebuilds the phase diagram
+        entry = PDEntry("O", pd.el_refs[Element("O")].energy_per_atom - 1)
+        pd.add_entry(entry)
+        self.assertSamePD(pd, entries + [entry])
+        self.assertIs(pd.el_refs[Element("O")], entry)
+        pd.remove_entry(entry)
+        self.assertSamePD(pd, entries)
+
+        self.assertRaises(ValueError, pd.remove_entry, entry)
+        self.assertRaises(ValueError, pd.add_entry, PDEntry("Na", 0))
+
+
+class PatchedPhaseDiagramTest(unittest.TestCase):
+    def setUp(self):
+        self.entries = list(EntrySet.from_csv(str(module_dir / "pdentries_test.csv")))
+        self.entries += [PDEntry("Co", 0), PDEntry("LiCo", -2), PDEntry("Li2Co", -2.5),
+                         PDEntry("CoO", -6), PDEntry("Co3O4", -20)]
+        self.pd = PhaseDiagram(self.entries)
+        self.ppd = PatchedPhaseDiagram(self.entries)
+        warnings.simplefilter("ignore")
+
+    def test_pds(self):
+        self.assertEqual(set(self.ppd.pds), {frozenset(Composition(s).elements) for s in ["LiFeO", "LiCo", "CoO"]})
+        self.assertIs(self.ppd.get_pd(Composition("Li2O")), self.ppd.pds[frozenset(Composition("LiFeO").elements)])
+        self.assertIs(self.ppd.get_pd(Composition("CoO")), self.ppd.pds[frozenset(Composition("CoO").elements)])
+        self.assertEqual(len(self.ppd.get_pd(Composition("Co")).elements), 2)
+        # LiCoO2 is not in any of the subsystems, so its own is built
+        pd = self.ppd.get_pd(Composition("LiCoO2"))
+        self.assertEqual(set(pd.elements), set(Composition("LiCoO2").elements))
+        self.assertIs(self.ppd.get_pd(Composition("Li2CoO3")), pd)
+        self.assertRaises(ValueError, self.ppd.get_pd, Composition("NaCl"))
+
+    def test_uncovered_chemsys(self):
+        entries = [PDEntry("Li", 0), PDEntry("Co", 0), PDEntry("O", 0),
+                   PDEntry("Li2O", -6), PDEntry("CoO", -4)]
+        pd = PhaseDiagram(entries)
+        ppd = PatchedPhaseDiagram(entries)
+        comp = Composition("LiCoO2")
+        self.assertEqual(set(map(id, ppd.get_decomposition(comp))),
+                         set(map(id, pd.get_decomposition(comp))))
+        entry = PDEntry("LiCoO2", -5)
+        self.assertAlmostEqual(ppd.get_e_above_hull(entry), pd.get_e_above_hull(entry))
+        comps = [comp, Composition("Li2O"), Composition("Co2O")]
+        np.testing.assert_array_almost_equal(ppd.get_hull_energies(comps), pd.get_hull_energies(comps))
+        for decomp, expected in zip(ppd.get_decompositions(comps), pd.get_decompositions(comps)):
+            self.assertEqual(set(map(id, decomp)), set(map(id, expected)))
+
+    def test_chempots(self):
+        comp = Composition("Li2O")
+        self.assertEqual(self.ppd.get_all_chempots(comp), self.ppd.get_pd(comp).get_all_chempots(comp))
+        self.assertEqual(self.ppd.get_composition_chempots(comp),
+                         self.ppd.get_pd(comp).get_composition_chempots(comp))
+        # The convex hull of the whole system is built when needed
+        elements = [Element("Li"), Element("O")]
+        self.assertEqual(len(self.ppd.get_chempot_range_map(elements)), len(self.pd.get_chempot_range_map(elements)))
+        self.assertEqual(len(self.ppd.facets), len(self.pd.facets))
+        comp = Composition("LiFeCoO")
+        self.assertEqual({frozenset(k.split("-")) for k in self.ppd.get_all_chempots(comp)},
+                         {frozenset(k.split("-")) for k in self.pd.get_all_chempots(comp)})
+
+    def test_get_e_above_hull(self):
+        for ppd in [self.ppd, PatchedPhaseDiagram(self.entries, ncpus=2)]:
+            self.assertEqual(set(map(id, ppd.stable_entries)), set(map(id, self.pd.stable_entries)))
+            for entry in self.entries:
+                decomp, ehull = ppd.get_decomp_and_e_above_hull(entry)
+                ref_decomp, ref_ehull = self.pd.get_decomp_and_e_above_hull(entry)
+                self.assertAlmostEqual(ehull, ref_ehull)
+                self.assertEqual(set(map(id, decomp)), set(map(id, ref_decomp)))
+                self.assertAlmostEqual(ppd.get_hull_energy(entry.composition),
+                                       self.pd.get_hull_energy(entry.composition))
+            comps = [e.composition for e in self.entries]
+            np.testing.assert_array_almost_equal(ppd.get_hull_energies(comps), self.pd.get_hull_energies(comps))
+            np.testing.assert_array_almost_equal(ppd.get_e_above_hulls(self.entries),
+                                                 self.pd.get_e_above_hulls(self.entries))
+            for decomp, expected in zip(ppd.get_decompositions(comps), self.pd.get_decompositions(comps)):
+                self.assertEqual(set(map(id, decomp)), set(map(id, expected)))
+
+    def test_to_from_dict(self):
+        ppd = PatchedPhaseDiagram.from_dict(self.ppd.as_dict())
+        self.assertEqual(len(ppd.stable_entries), len(self.ppd.stable_entries))
+
+
 class GrandPotentialPhaseDiagramTest(unittest.TestCase):
     def setUp(self):
         self.entries = EntrySet.from_csv(str(module_dir / "pdentries_test.csv"))
@@ -312,6 +312,9 @@ class StructureMatcherTest(PymatgenTest):
         out = sm.group_structures(self.struct_list)
         self.assertEqual(list(map(len, out)), [4, 1, 1, 1, 1, 1, 1, 1, 2, 2, 1])
         self.assertEqual(sum(map(len, out)), len(self.struct_list))
+        out_parallel = sm.group_structures(self.struct_list, ncpus=2)
+        self.assertEqual([[self.struct_list.index(s) for s in g] for g in out_parallel],
+                         [[self.struct_list.index(s) for s in g] for g in out])
         for s in self.struct_list[::2]:
             s.replace_species({'Ti': 'Zr', 'O': 'Ti'})
         out = sm.group_structures(self.struct_list, anonymous=True)
@@ -347,6 +350,29 @@ class StructureMatcherTest(PymatgenTest):
         sm2 = StructureMatcher.from_dict(d)
         self.assertEqual(sm2.as_dict(), d)
 
+    def test_cache(self):
+        sm = StructureMatcher(cache_size=10)
+        sm_nocache = StructureMatcher()
+        self.assertIsNone(sm_nocache.cache_info())
+        s1, s2 = self.struct_list[0], self.struct_list[1]
+        self.assertEqual(sm.fit(s1, s2), sm_nocache.fit(s1, s2))
+        self.assertEqual(sm.cache_info()["structures"].misses, 2)
+        self.assertEqual(sm.cache_info()["structures"].hits, 0)
+        self.assertArrayAlmostEqual(sm.get_rms_dist(s1, s2),
+                                    sm_nocache.get_rms_dist(s1, s2))
+        self.assertEqual(sm.cache_info()["structures"].hits, 2)
+        self.assertGreater(sm.cache_info()["lattices"].hits, 0)
+        self.assertEqual(sm.fit_anonymous(s1, s2), sm_nocache.fit_anonymous(s1, s2))
+
+        groups = sm.group_structures(self.struct_list)
+        self.assertEqual(list(map(len, groups)), [4, 1, 1, 1, 1, 1, 1, 1, 2, 2, 1])
+        info = sm.cache_info()["structures"]
+        self.assertEqual(info.maxsize, 10)
+        self.assertEqual(info.currsize, 10)
+        sm.cache_clear()
+        self.assertEqual(sm.cache_info()["structures"], (0, 0, 10, 0))
+        self.assertEqual(StructureMatcher.from_dict(sm.as_dict()).as_dict(), sm.as_dict())
+
     def test_no_scaling(self):
         sm = StructureMatcher(ltol=0.1, stol=0.1, angle_tol=2,
                               scale=False, comparator=ElementComparator())
@@ -11,7 +11,8 @@ data using Python's multiprocessing.
 import os
 import json
 import logging
-from multiprocessing import Manager, Pool
+import warnings
+from multiprocessing import Pool
 
 from monty.io import zopen
 from monty.json import MontyEncoder, MontyDecoder
@@ -24,9 +25,15 @@ class BorgQueen:
     The Borg Queen controls the drones to assimilate data in an entire
     directory tree. Uses multiprocessing to speed up things considerably. It
     also contains convenience methods to save and load data between sessions.
+
+    Assimilated data can also be streamed to a sink, a JSON lines file with
+    one {"path": path, "data": data} record per assimilated path, instead of
+    being held in memory. The sink doubles as a checkpoint: paths already
+    recorded in it are skipped, so an interrupted assimilation is resumed by
+    running it again with the same sink.
     """
 
-    def __init__(self, drone, rootpath=None, number_of_drones=1):
+    def __init__(self, drone, rootpath=None, number_of_drones=1, sink=None):
         """
         Args:
             drone (Drone): An implementation of
@@ -41,6 +48,9 @@ class BorgQueen:
                 will definitely see a significant speedup of at least 50% or so.
                 If you are running this over a server with far more processors,
                 the speedup will be even greater.
+            sink (str): Filename of a JSON lines file to stream the assimilated
+                data to, instead of keeping it in memory. If the filename ends
+                with gz or bz2, the relevant compression will be applied.
         """
         self._drone = drone
         self._num_drones = number_of_drones
@@ -48,40 +58,48 @@ class BorgQueen:
 
         if rootpath:
             if number_of_drones > 1:
-                self.parallel_assimilate(rootpath)
+                self.parallel_assimilate(rootpath, sink=sink)
             else:
-                self.serial_assimilate(rootpath)
+                self.serial_assimilate(rootpath, sink=sink)
 
-    def parallel_assimilate(self, rootpath):
+    def parallel_assimilate(self, rootpath, sink=None):
         """
-        Assimilate the entire subdirectory structure in rootpath.
+        Assimilate the entire subdirectory structure in rootpath. Both the
+        scan for valid paths and the assimilation are spread over a pool of
+        number_of_drones processes, and results are collected as they finish.
+
+        Args:
+            rootpath (str): The root directory to start assimilation.
+            sink (str): Filename of a JSON lines file to stream the
+                assimilated data to. Paths already in the sink are skipped.
         """
-        logger.info('Scanning for valid paths...')
-        valid_paths = []
-        for (parent, subdirs, files) in os.walk(rootpath):
-            valid_paths.extend(self._drone.get_valid_paths((parent, subdirs,
-                                                            files)))
-        manager = Manager()
-        data = manager.list()
-        status = manager.dict()
-        status['count'] = 0
-        status['total'] = len(valid_paths)
-        logger.info('{} valid paths found.'.format(len(valid_paths)))
-        p = Pool(self._num_drones)
-        p.map(order_assimilation, ((path, self._drone, data, status)
-                                   for path in valid_paths))
-        for d in data:
-            self._data.append(json.loads(d, cls=MontyDecoder))
-
-    def serial_assimilate(self, rootpath):
+        with Pool(self._num_drones) as p:
+            logger.info('Scanning for valid paths...')
+            valid_paths = self._get_valid_paths(rootpath, p)
+            logger.info('{} valid paths found.'.format(len(valid_paths)))
+            done = self._read_sink(sink, truncate=True) if sink else set()
+            valid_paths = [path for path in valid_paths if path not in done]
+            results = p.imap_unordered(
+                order_assimilation, ((path, self._drone) for path in valid_paths),
+                chunksize=max(1, min(64, len(valid_paths) // (4 * self._num_drones))))
+            self._collect(results, len(valid_paths), sink)
+
+    def serial_assimilate(self, rootpath, sink=None):
         """
         Assimilate the entire subdirectory structure in rootpath serially.
+
+        Args:
+            rootpath (str): The root directory to start assimilation.
+            sink (str): Filename of a JSON lines file to stream the
+                assimilated data to. Paths already in the sink are skipped.
         """
-        valid_paths = []
-        for (parent, subdirs, files) in os.walk(rootpath):
-            valid_paths.extend(self._drone.get_valid_paths((parent, subdirs,
-                                                            files)))
-        data = []
+        valid_paths = self._get_valid_paths(rootpath)
+        if sink:
+            done = self._read_sink(sink, truncate=True)
+            valid_paths = [path for path in valid_paths if path not in done]
+            self._collect((order_assimilation((path, self._drone))
+                           for path in valid_paths), len(valid_paths), sink)
+            return
         count = 0
         total = len(valid_paths)
         for path in valid_paths:
@@ -90,12 +108,100 @@ class BorgQueen:
             count += 1
             logger.info('{}/{} ({:.2f}%) done'.format(count, total,
                                                       count / total * 100))
-        for d in data:
-            self._data.append(json.loads(d, cls=MontyDecoder))
+
+    def _get_valid_paths(self, rootpath, pool=None):
+        """
+        Scans the directory tree in rootpath for valid paths. With a pool,
+        the top levels of the tree are walked until there are enough
+        subdirectories to share out between the processes, which then walk
+        the subtrees.
+        """
+        if pool is None:
+            return _walk((self._drone, rootpath))
+        valid_paths = []
+        dirs = [rootpath]
+        while 0 < len(dirs) < 4 * self._num_drones:
+            subtrees = []
+            for d in dirs:
+                step = next(os.walk(d), None)
+                if step is None:
+                    continue
+                valid_paths.extend(self._drone.get_valid_paths(step))
+                # Like os.walk, do not follow symbolic links
+                subtrees.extend(path for path in (os.path.join(step[0], s) for s in step[1])
+                                if not os.path.islink(path))
+            dirs = subtrees
+        for paths in pool.imap(_walk, ((self._drone, d) for d in dirs)):
+            valid_paths.extend(paths)
+        return valid_paths
+
+    def _collect(self, results, total, sink=None):
+        """
+        Collects (path, json) results of order_assimilation as they come,
+        writing them to the sink if given. Results without data (json is
+        None) are not added to the assimilated data.
+        """
+        f = zopen(sink, "at") if sink else None
+        try:
+            for count, (path, d) in enumerate(results, 1):
+                if f is not None:
+                    # Paths without data are recorded too, so that they are
+                    # skipped when resuming
+                    f.write('{{"path": {}, "data": {}}}\n'.format(json.dumps(path), d or "null"))
+                    f.flush()
+                elif d is not None:
+                    self._data.append(json.loads(d, cls=MontyDecoder))
+                logger.info('{}/{} ({:.2f}%) done'.format(count, total,
+                                                          count / total * 100))
+        finally:
+            if f is not None:
+                f.close()
+
+    @staticmethod
+    def _read_sink(filename, data=None, truncate=False):
+        """
+        Reads the paths recorded in a sink, appending the assimilated data to
+        data if given. A record left incomplete by an interruption is
+        skipped. With truncate, the sink is also rewritten without it so
+        that it can be appended to, which must only be done when no other
+        process is still writing to the sink.
+
+        Returns:
+            Set of the recorded paths.
+        """
+        if not os.path.exists(filename):
+            return set()
+        lines = []
+        complete = True
+        with zopen(filename, "rt") as f:
+            try:
+                for line in f:
+                    if not line.endswith("\n"):
+                        complete = False
+                        break
+                    lines.append(line)
+            except EOFError:
+                complete = False
+        paths = set()
+        for line in lines:
+            d = json.loads(line, cls=MontyDecoder if data is not None else None)
+            paths.add(d["path"])
+            if data is not None and d["data"] is not None:
+                data.append(d["data"])
+        if not complete and truncate:
+            logger.warning('Discarding incomplete record in {}'.format(filename))
+            # Keep the extension so that the same compression is used
+            tmp = os.path.join(os.path.dirname(filename), "tmp_" + os.path.basename(filename))
+            with zopen(tmp, "wt") as f:
+                f.writelines(lines)
+            os.replace(tmp, filename)
+        return paths
 
     def get_data(self):
         """
-        Returns an list of assimilated objects
+        Returns an list of assimilated objects. With more than one drone,
+        the objects are in the order in which their assimilation finished,
+        which can differ between runs.
         """
         return self._data
 
@@ -113,22 +219,68 @@ class BorgQueen:
 
     def load_data(self, filename):
         """
-        Load assimilated data from a file
+        Load assimilated data from a file, either saved with save_data or a
+        sink (recognized by a .jsonl extension, optionally compressed). The
+        file is only read, so a sink can be loaded while it is still being
+        written to.
         """
+        if _is_sink(filename):
+            self._data = []
+            self._read_sink(filename, self._data)
+            return
         with zopen(filename, "rt") as f:
             self._data = json.load(f, cls=MontyDecoder)
 
 
+def _is_sink(filename):
+    """
+    Internal helper method for BorgQueen to tell a sink from a file saved
+    with save_data by its extension.
+    """
+    root, ext = os.path.splitext(filename)
+    if ext.lower() in (".gz", ".z", ".bz2", ".xz", ".lzma"):
+        ext = os.path.splitext(root)[1]
+    return ext.lower() == ".jsonl"
+
+
+def _walk(args):
+    """
+    Internal helper method for BorgQueen to scan a directory tree for valid
+    paths
+    """
+    (drone, rootpath) = args
+    valid_paths = []
+    for (parent, subdirs, files) in os.walk(rootpath):
+        valid_paths.extend(drone.get_valid_paths((parent, subdirs, files)))
+    return valid_paths
+
+
 def order_assimilation(args):
     """
-    Internal helper method for BorgQueen to process assimilation
+    Internal helper method for BorgQueen to process assimilation. Returns the
+    path and the assimilated data serialized to json, or None if the drone
+    returned no data.
+
+    The former (path, drone, data, status) arguments, where the json is
+    appended to the shared list data and the progress is counted in the
+    shared dict status, are deprecated but still supported.
     """
-    (path, drone, data, status) = args
+    if len(args) == 4:
+        warnings.warn("order_assimilation((path, drone, data, status)) is deprecated, "
+                      "pass (path, drone) and use the returned json instead.",
+                      DeprecationWarning)
+        (path, drone, data, status) = args
+        d = order_assimilation((path, drone))[1]
+        if d is not None:
+            data.append(d)
+        status['count'] += 1
+        count = status['count']
+        total = status['total']
+        logger.info('{}/{} ({:.2f}%) done'.format(count, total,
+                                                  count / total * 100))
+        return None
+    (path, drone) = args
     newdata = drone.assimilate(path)
-    if newdata:
-        data.append(json.dumps(newdata, cls=MontyEncoder))
-    status['count'] += 1
-    count = status['count']
-    total = status['total']
-    logger.info('{}/{} ({:.2f}%) done'.format(count, total,
-                                              count / total * 100))
+    if not newdata:
+        return path, None
+    return path, json.dumps(newdata, cls=MontyEncoder)
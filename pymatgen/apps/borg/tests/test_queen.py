@@ -17,15 +17,31 @@ __date__ = "Mar 18, 2012"
 
 import unittest
 import os
+import json
 import warnings
 
-from pymatgen.apps.borg.hive import VaspToComputedEntryDrone
-from pymatgen.apps.borg.queen import BorgQueen
+from monty.io import zopen
+from monty.tempfile import ScratchDir
+
+from pymatgen.apps.borg.hive import AbstractDrone, VaspToComputedEntryDrone
+from pymatgen.apps.borg.queen import BorgQueen, _is_sink, order_assimilation
 
 test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..",
                         'test_files')
 
 
+class EmptyDrone(AbstractDrone):
+    """
+    Drone returning no data for the directories with a POSCAR.
+    """
+
+    def assimilate(self, path):
+        return {} if "POSCAR" in os.listdir(path) else {"path": path}
+
+    def get_valid_paths(self, path):
+        return [path[0]]
+
+
 class BorgQueenTest(unittest.TestCase):
     def setUp(self):
         warnings.simplefilter("ignore")
@@ -39,12 +55,66 @@ class BorgQueenTest(unittest.TestCase):
         data = self.queen.get_data()
         self.assertEqual(len(data), 12)
 
+    def test_sink(self):
+        drone = VaspToComputedEntryDrone()
+        data = BorgQueen(drone, test_dir, 1).get_data()
+        self.assertEqual(sorted(d.energy for d in BorgQueen(drone, test_dir, 2).get_data()),
+                         sorted(d.energy for d in data if d))
+        with ScratchDir("."):
+            queen = BorgQueen(drone, test_dir, 2, sink="data.jsonl.gz")
+            self.assertEqual(queen.get_data(), [])
+            queen.load_data("data.jsonl.gz")
+            self.assertEqual(len(queen.get_data()), len([d for d in data if d]))
+
+            # Interrupt the assimilation in the middle of a record
+            with zopen("data.jsonl.gz", "rt") as f:
+                lines = f.readlines()
+            with zopen("data.jsonl.gz", "wt") as f:
+                f.writelines(lines[:5])
+                f.write(lines[5][:20])
+            # Loading skips the incomplete record but leaves the sink as is
+            queen.load_data("data.jsonl.gz")
+            self.assertEqual(len(queen.get_data()), len([line for line in lines[:5] if '"data": null' not in line]))
+            with zopen("data.jsonl.gz", "rt") as f:
+                self.assertEqual(f.read(), "".join(lines[:5]) + lines[5][:20])
+            queen = BorgQueen(drone, test_dir, 1, sink="data.jsonl.gz")
+            with zopen("data.jsonl.gz", "rt") as f:
+                paths = [json.loads(line)["path"] for line in f]
+            self.assertEqual(sorted(paths), sorted(json.loads(line)["path"] for line in lines))
+
+    def test_is_sink(self):
+        for filename in ["data.jsonl", "data.jsonl.gz", "dir/data.JSONL.bz2", "data.jsonl.xz"]:
+            self.assertTrue(_is_sink(filename))
+        for filename in ["data.json", "data.json.gz", "data.jsonl.json", "my.jsonl.dir/data.json", "data.gz"]:
+            self.assertFalse(_is_sink(filename))
+
     def test_load_data(self):
         drone = VaspToComputedEntryDrone()
         queen = BorgQueen(drone)
         queen.load_data(os.path.join(test_dir, "assimilated.json"))
         self.assertEqual(len(queen.get_data()), 1)
 
+    def test_no_data(self):
+        drone = EmptyDrone()
+        expected = sorted(d["path"] for d in BorgQueen(drone, test_dir, 1).get_data() if d)
+        self.assertEqual(sorted(d["path"] for d in BorgQueen(drone, test_dir, 2).get_data()),
+                         expected)
+        with ScratchDir("."):
+            queen = BorgQueen(drone, test_dir, 2, sink="data.jsonl")
+            queen.load_data("data.jsonl")
+            self.assertEqual(sorted(d["path"] for d in queen.get_data()), expected)
+
+    def test_order_assimilation(self):
+        drone = EmptyDrone()
+        self.assertEqual(order_assimilation((test_dir, drone)), (test_dir, None))
+        data, status = [], {"count": 0, "total": 1}
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            order_assimilation((test_dir, drone, data, status))
+            self.assertTrue(issubclass(w[-1].category, DeprecationWarning))
+        self.assertEqual(data, [])
+        self.assertEqual(status["count"], 1)
+
 
 if __name__ == "__main__":
     unittest.main()
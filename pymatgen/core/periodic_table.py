@@ -9,6 +9,7 @@ import re
 import warnings
 from collections import Counter
 from enum import Enum
+from functools import lru_cache
 from io import open
 from itertools import product, \
     combinations
@@ -28,6 +29,9 @@ with open(str(Path(__file__).absolute().parent / "periodic_table.json"), "rt") a
 
 _pt_row_sizes = (2, 8, 8, 18, 18, 32, 32)
 
+# Symbols of the elements indexed by atomic number
+_pt_symbols = {d["Atomic no"]: sym for sym, d in _pt_data.items()}
+
 
 class Element(Enum):
     """Enum representing an element in the periodic table."""
@@ -506,6 +510,9 @@ class Element(Enum):
                         except ValueError:
                             # Ignore error. val will just remain a string.
                             pass
+            # Elements are singletons, so the parsed value is stored to
+            # avoid parsing it again on the next access.
+            self.__dict__[item] = val
             return val
         raise AttributeError("Element has no attribute %s!" % item)
 
@@ -571,9 +578,11 @@ class Element(Enum):
         All ionic radii of the element as a dict of
         {oxidation state: ionic radii}. Radii are given in ang.
         """
-        if "Ionic radii" in self._data:
-            return {int(k): FloatWithUnit(v, "ang") for k, v in self._data["Ionic radii"].items()}
-        return {}
+        if "_ionic_radii" not in self.__dict__:
+            self.__dict__["_ionic_radii"] = {
+                int(k): FloatWithUnit(v, "ang")
+                for k, v in self._data.get("Ionic radii", {}).items()}
+        return dict(self.__dict__["_ionic_radii"])
 
     @property
     def number(self):
@@ -794,9 +803,8 @@ class Element(Enum):
         Returns:
             Element with atomic number z.
         """
-        for sym, data in _pt_data.items():
-            if data["Atomic no"] == z:
-                return Element(sym)
+        if z in _pt_symbols:
+            return Element(_pt_symbols[z])
         raise ValueError("No element with this atomic number %s" % z)
 
     @staticmethod
@@ -1057,6 +1065,55 @@ class Element(Enum):
             print(" ".join(rowstr))
 
 
+@lru_cache(maxsize=None)
+def _get_property_table(prop: str) -> np.ndarray:
+    """
+    Returns a read-only array of an Element property indexed by atomic
+    number. Missing or non-numeric values are stored as NaN.
+    """
+    table = np.full(max(_pt_symbols) + 1, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for z, sym in _pt_symbols.items():
+            try:
+                table[z] = float(getattr(Element(sym), prop))
+            except (TypeError, ValueError):
+                pass
+    table.flags.writeable = False
+    return table
+
+
+def get_element_properties(prop: str, atomic_numbers) -> np.ndarray:
+    """
+    Vectorized lookup of an Element property for many atomic numbers at
+    once, e.g., the electronegativities of all sites in a Structure::
+
+        get_element_properties("X", structure.atomic_numbers)
+
+    The property table is built once per property and reused afterwards.
+
+    Args:
+        prop (str): Name of a numeric Element property, e.g., "X",
+            "atomic_mass" or "mendeleev_no".
+        atomic_numbers: Sequence or array of atomic numbers.
+
+    Returns:
+        Float array with the same shape as atomic_numbers. Elements without
+        data for prop give NaN.
+
+    Raises:
+        AttributeError if prop is not an Element property, ValueError if an
+        atomic number does not belong to an element.
+    """
+    if not hasattr(Element.H, prop):
+        raise AttributeError("Element has no attribute %s!" % prop)
+    zs = np.asarray(atomic_numbers, dtype=int)
+    invalid = (zs < 1) | (zs > max(_pt_symbols))
+    if np.any(invalid):
+        raise ValueError("No element with this atomic number %s" % zs[invalid][0])
+    return _get_property_table(prop)[zs]
+
+
 class Specie(MSONable):
     """
     An extension of Element with an oxidation state and other optional
@@ -1164,9 +1221,10 @@ class Specie(MSONable):
         Ionic radius of specie. Returns None if data is not present.
         """
 
-        if self._oxi_state in self.ionic_radii:
-            return self.ionic_radii[self._oxi_state]
-        d = self._el.data
+        ionic_radii = self._el.ionic_radii
+        if self._oxi_state in ionic_radii:
+            return ionic_radii[self._oxi_state]
+        d = self._el._data
         oxstr = str(int(self._oxi_state))
         if oxstr in d.get("Ionic radii hs", {}):
             warnings.warn("No default ionic radius for %s. Using hs data." %
@@ -1615,6 +1673,18 @@ def get_el_sp(obj):
     if i is not None:
         return Element.from_Z(i)
 
+    if isinstance(obj, str):
+        # Species are immutable, so parsed strings can be shared.
+        return _get_el_sp_from_string(obj)
+    return _parse_el_sp(obj)
+
+
+@lru_cache(maxsize=1024)
+def _get_el_sp_from_string(obj):
+    return _parse_el_sp(obj)
+
+
+def _parse_el_sp(obj):
     try:
         return Specie.from_string(obj)
     except (ValueError, KeyError):
@@ -18,7 +18,7 @@ import warnings
 from fnmatch import fnmatch
 import re
 import functools
-from typing import Dict, List, Tuple, Optional, Union, Iterator, Set, Sequence, Iterable
+from typing import Dict, List, Tuple, Optional, Union, Iterator, Set, Sequence, Iterable, Callable
 import numpy as np
 
 from tabulate import tabulate
@@ -385,7 +385,7 @@ class SiteCollection(collections.abc.Sequence, metaclass=ABCMeta):
             (bool) True if SiteCollection does not contain atoms that are too
             close together.
         """
-        if len(self.sites) == 1:
+        if len(self) == 1:
             return True
         all_dists = self.distance_matrix[np.triu_indices(len(self), 1)]
         return bool(np.min(all_dists) > tol)
@@ -607,6 +607,128 @@ class SiteCollection(collections.abc.Sequence, metaclass=ABCMeta):
         return cluster
 
 
+def _get_composition(species):
+    """
+    Converts a site species specification to a Composition, in the same way
+    as Site does.
+    """
+    if not isinstance(species, Composition):
+        try:
+            species = Composition({get_el_sp(species): 1})
+        except TypeError:
+            species = Composition(species)
+    if species.num_atoms > 1 + Composition.amount_tolerance:
+        raise ValueError("Species occupancies sum to more than 1!")
+    return species
+
+
+class _SiteArrays:
+    """
+    Struct-of-arrays storage of the sites of an IStructure. The distinct
+    species of the sites are stored once and referenced by index, and site
+    properties are stored as one list per property.
+    """
+
+    def __init__(self, frac_coords, species, species_indices, properties):
+        """
+        Args:
+            frac_coords (Nx3 array): Fractional coordinates.
+            species ([Composition]): Distinct species of the sites.
+            species_indices (N array): Index of the species of each site.
+            properties (dict): Site properties as {name: [N values]}.
+        """
+        self.frac_coords = frac_coords
+        self.species = species
+        self.species_indices = species_indices
+        self.properties = properties
+
+    def __len__(self):
+        return len(self.species_indices)
+
+    @classmethod
+    def from_species(cls, frac_coords, species, properties):
+        """
+        Creates the storage from a sequence of species specifications, which
+        are parsed once per distinct input.
+        """
+        parsed = {}  # type: Dict
+        table = {}  # type: Dict[tuple, int]
+        distinct = []  # type: List[Composition]
+        indices = []
+        for sp in species:
+            # Compositions compare with a tolerance, so they are looked up by
+            # identity instead.
+            key = (id(sp),) if isinstance(sp, Composition) else sp
+            try:
+                indices.append(parsed[key])
+                continue
+            except KeyError:
+                pass
+            except TypeError:
+                # unhashable species, e.g., dicts of occupancies
+                key = None
+            comp = _get_composition(sp)
+            comp_key = tuple(comp.items())
+            if comp_key not in table:
+                table[comp_key] = len(distinct)
+                distinct.append(comp)
+            indices.append(table[comp_key])
+            if key is not None:
+                parsed[key] = table[comp_key]
+        indices = np.array(indices, dtype=int)
+        return cls(frac_coords, distinct, indices, properties)
+
+    @classmethod
+    def from_sites(cls, sites):
+        """
+        Creates the storage from a sequence of sites. Missing properties are
+        set to None.
+        """
+        props = {}  # type: Dict[str, List]
+        for i, site in enumerate(sites):
+            for k, v in site.properties.items():
+                if k not in props:
+                    props[k] = [None] * len(sites)
+                props[k][i] = v
+        frac_coords = np.array([site.frac_coords for site in sites], dtype=float).reshape((-1, 3))
+        return cls.from_species(frac_coords, [site.species for site in sites], props)
+
+    def take(self, indices):
+        """
+        Returns the storage of the sites at indices, with the species table
+        restricted to the species still in use.
+        """
+        used, species_indices = np.unique(self.species_indices[indices], return_inverse=True)
+        return _SiteArrays(self.frac_coords[indices], [self.species[i] for i in used],
+                           species_indices.reshape(-1),
+                           {k: [v[i] for i in indices] for k, v in self.properties.items()})
+
+    def repeat(self, n):
+        """
+        Returns the storage with each site repeated n times in a row, without
+        coordinates, which have to be set by the caller.
+        """
+        return _SiteArrays(None, list(self.species), np.repeat(self.species_indices, n),
+                           {k: [x for x in v for _ in range(n)] for k, v in self.properties.items()})
+
+    def get_species(self):
+        """
+        Returns the species of each site.
+        """
+        return [self.species[i] for i in self.species_indices]
+
+    def get_sites(self, lattice):
+        """
+        Returns the PeriodicSites. Their fractional coordinates are rows of
+        frac_coords, so the storage must not be used afterwards.
+        """
+        props = self.properties
+        return [PeriodicSite(self.species[j], fcoords, lattice,
+                             properties={k: v[i] for k, v in props.items()},
+                             skip_checks=True)
+                for i, (j, fcoords) in enumerate(zip(self.species_indices, self.frac_coords))]
+
+
 class IStructure(SiteCollection, MSONable):
     """
     Basic immutable Structure object with periodicity. Essentially a sequence
@@ -672,19 +794,20 @@ class IStructure(SiteCollection, MSONable):
         else:
             self._lattice = Lattice(lattice)
 
-        sites = []
-        for i, sp in enumerate(species):
-            prop = None
-            if site_properties:
-                prop = {k: v[i]
-                        for k, v in site_properties.items()}
-
-            sites.append(
-                PeriodicSite(sp, coords[i], self._lattice,
-                             to_unit_cell,
-                             coords_are_cartesian=coords_are_cartesian,
-                             properties=prop))
-        self._sites = tuple(sites)
+        # The sites are stored as arrays and only created as PeriodicSites
+        # when they are accessed.
+        if len(coords) == 0:
+            frac_coords = np.zeros((0, 3))
+        else:
+            frac_coords = np.array(coords, dtype=float)
+            if coords_are_cartesian:
+                frac_coords = self._lattice.get_fractional_coords(frac_coords)
+        if to_unit_cell:
+            frac_coords = np.mod(frac_coords, 1)
+        props = {k: [v[i] for i in range(len(species))]
+                 for k, v in (site_properties or {}).items()}
+        self._site_list = None
+        self._site_arrays = _SiteArrays.from_species(frac_coords, species, props)
         if validate_proximity and not self.is_valid():
             raise StructureError(("Structure contains sites that are ",
                                   "less than 0.01 Angstrom apart!"))
@@ -959,6 +1082,58 @@ class IStructure(SiteCollection, MSONable):
         """
         return self._sites
 
+    # Type of the sequence of sites once they are created.
+    _site_sequence = tuple  # type: Callable[..., Sequence[PeriodicSite]]
+
+    @property
+    def _sites(self):
+        """
+        The sites of the structure. Accessing them switches the structure
+        from the array storage to PeriodicSites, which are then the only
+        representation of the sites.
+        """
+        if self._site_list is None:
+            self._site_list = self._site_sequence(self._site_arrays.get_sites(self._lattice))
+            self._site_arrays = None
+        return self._site_list
+
+    @_sites.setter
+    def _sites(self, sites):
+        self._site_list = sites
+        self._site_arrays = None
+
+    def _set_site_arrays(self, site_arrays):
+        """
+        Replaces the sites of the structure with array storage.
+        """
+        self._site_arrays = site_arrays
+        self._site_list = None
+
+    @classmethod
+    def _from_site_arrays(cls, lattice, site_arrays, charge=None):
+        """
+        Creates a structure directly from array storage, which it takes over.
+        Only for IStructure and Structure, since it skips __init__.
+        """
+        struct = cls.__new__(cls)
+        struct._lattice = lattice
+        struct._charge = charge
+        struct._set_site_arrays(site_arrays)
+        return struct
+
+    def __setstate__(self, d):
+        # Pickles of older versions hold the sites as _sites.
+        if "_sites" in d:
+            d = dict(d)
+            d["_site_list"] = d.pop("_sites")
+            d["_site_arrays"] = None
+        self.__dict__.update(d)
+
+    def __len__(self):
+        if self._site_arrays is not None:
+            return len(self._site_arrays)
+        return len(self._site_list)
+
     @property
     def lattice(self):
         """
@@ -1068,18 +1243,14 @@ class IStructure(SiteCollection, MSONable):
         f_lat = lattice_points_in_supercell(scale_matrix)
         c_lat = new_lattice.get_cartesian_coords(f_lat)
 
-        new_sites = []
-        for site in self:
-            for v in c_lat:
-                s = PeriodicSite(
-                    site.species, site.coords + v,
-                    new_lattice, properties=site.properties,
-                    coords_are_cartesian=True, to_unit_cell=False,
-                    skip_checks=True)
-                new_sites.append(s)
+        # Each site is followed by its images, as the sites of the supercell
+        # are ordered by site of the original structure.
+        cart_coords = self.cart_coords[:, None, :] + c_lat[None, :, :]
+        site_arrays = self._get_site_arrays().repeat(len(c_lat))
+        site_arrays.frac_coords = new_lattice.get_fractional_coords(cart_coords.reshape((-1, 3)))
 
         new_charge = self._charge * np.linalg.det(scale_matrix) if self._charge else None
-        return Structure.from_sites(new_sites, charge=new_charge)
+        return Structure._from_site_arrays(new_lattice, site_arrays, charge=new_charge)
 
     def __rmul__(self, scaling_matrix):
         """
@@ -1087,13 +1258,102 @@ class IStructure(SiteCollection, MSONable):
         """
         return self.__mul__(scaling_matrix)
 
+    def _get_site_arrays(self):
+        """
+        Returns the array storage of the sites, which is created from the
+        PeriodicSites if they exist. Not to be modified.
+        """
+        if self._site_arrays is not None:
+            return self._site_arrays
+        return _SiteArrays.from_sites(self._site_list)
+
     @property
     def frac_coords(self):
         """
         Fractional coordinates as a Nx3 numpy array.
         """
+        if self._site_arrays is not None:
+            return self._site_arrays.frac_coords.copy()
         return np.array([site.frac_coords for site in self._sites])
 
+    @property
+    def cart_coords(self):
+        """
+        Returns a np.array of the cartesian coordinates of sites in the
+        structure.
+        """
+        if self._site_arrays is not None:
+            return self._lattice.get_cartesian_coords(self._site_arrays.frac_coords)
+        return np.array([site.coords for site in self._sites])
+
+    @property
+    def species_and_occu(self):
+        """
+        List of species and occupancies at each site of the structure.
+        """
+        if self._site_arrays is not None:
+            return self._site_arrays.get_species()
+        return [site.species for site in self._sites]
+
+    @property
+    def species(self):
+        """
+        Only works for ordered structures.
+        Disordered structures will raise an AttributeError.
+
+        Returns:
+            ([Specie]) List of species at each site of the structure.
+        """
+        if self._site_arrays is None:
+            return [site.specie for site in self._sites]
+        distinct = []
+        for comp in self._site_arrays.species:
+            if not (comp.num_atoms == 1 and len(comp) == 1):
+                raise AttributeError("specie property only works for ordered sites!")
+            distinct.append(list(comp.keys())[0])
+        return [distinct[i] for i in self._site_arrays.species_indices]
+
+    @property
+    def atomic_numbers(self):
+        """List of atomic numbers."""
+        return tuple(sp.Z for sp in self.species)
+
+    @property
+    def composition(self):
+        """
+        (Composition) Returns the composition
+        """
+        if self._site_arrays is None:
+            return super().composition
+        # Occupancies are summed site by site, as for PeriodicSites, so that
+        # the result is the same to the last digit.
+        items = [list(comp.items()) for comp in self._site_arrays.species]
+        elmap = collections.defaultdict(float)  # type: Dict[Specie, float]
+        for i in self._site_arrays.species_indices.tolist():
+            for sp, occu in items[i]:
+                elmap[sp] += occu
+        return Composition(elmap)
+
+    @property
+    def site_properties(self):
+        """
+        Returns the site properties as a dict of sequences. E.g.,
+        {"magmom": (5,-5), "charge": (-4,4)}.
+        """
+        if self._site_arrays is not None:
+            return {k: list(v) for k, v in self._site_arrays.properties.items()}
+        return super().site_properties
+
+    @property
+    def is_ordered(self):
+        """
+        Checks if structure is ordered, meaning no partial occupancies in any
+        of the sites.
+        """
+        if self._site_arrays is not None:
+            return all(comp.num_atoms == 1 and len(comp) == 1 for comp in self._site_arrays.species)
+        return super().is_ordered
+
     @property
     def volume(self):
         """
@@ -2966,6 +3226,8 @@ class Structure(IStructure, collections.abc.MutableSequence):
     """
     __hash__ = None  # type: ignore
 
+    _site_sequence = list
+
     def __init__(self,
                  lattice: Union[List, np.ndarray, Lattice],
                  species: Sequence[Union[str, Element, Specie, DummySpecie, Composition]],
@@ -3015,8 +3277,6 @@ class Structure(IStructure, collections.abc.MutableSequence):
             coords_are_cartesian=coords_are_cartesian,
             site_properties=site_properties)
 
-        self._sites = list(self._sites)  # type: ignore
-
     def __setitem__(self, i, site):
         """
         Modify a site in the structure.
@@ -3103,8 +3363,9 @@ class Structure(IStructure, collections.abc.MutableSequence):
     @lattice.setter
     def lattice(self, lattice):
         self._lattice = lattice
-        for site in self._sites:
-            site.lattice = lattice
+        if self._site_arrays is None:
+            for site in self._sites:
+                site.lattice = lattice
 
     def append(self, species, coords, coords_are_cartesian=False,
                validate_proximity=False, properties=None):
@@ -3315,8 +3576,13 @@ class Structure(IStructure, collections.abc.MutableSequence):
         Args:
             indices: Sequence of indices of sites to delete.
         """
-        self._sites = [s for i, s in enumerate(self._sites)
-                       if i not in indices]
+        if self._site_arrays is not None:
+            indices = set(indices)
+            self._site_arrays = self._site_arrays.take(
+                [i for i in range(len(self)) if i not in indices])
+        else:
+            self._sites = [s for i, s in enumerate(self._sites)
+                           if i not in indices]
 
     def apply_operation(self, symmop, fractional=False):
         """
@@ -3330,30 +3596,20 @@ class Structure(IStructure, collections.abc.MutableSequence):
                 fractional space. Defaults to False, i.e., symmetry operation
                 is applied in cartesian coordinates.
         """
+        # All sites are replaced, so the result is kept as arrays.
+        site_arrays = self._get_site_arrays()
         if not fractional:
+            cart_coords = symmop.operate_multi(self.cart_coords)
             self._lattice = Lattice([symmop.apply_rotation_only(row)
                                      for row in self._lattice.matrix])
-
-            def operate_site(site):
-                new_cart = symmop.operate(site.coords)
-                new_frac = self._lattice.get_fractional_coords(new_cart)
-                return PeriodicSite(site.species, new_frac,
-                                    self._lattice,
-                                    properties=site.properties,
-                                    skip_checks=True)
-
+            frac_coords = self._lattice.get_fractional_coords(cart_coords)
         else:
+            frac_coords = symmop.operate_multi(self.frac_coords)
             new_latt = np.dot(symmop.rotation_matrix, self._lattice.matrix)
             self._lattice = Lattice(new_latt)
 
-            def operate_site(site):
-                return PeriodicSite(site.species,
-                                    symmop.operate(site.frac_coords),
-                                    self._lattice,
-                                    properties=site.properties,
-                                    skip_checks=True)
-
-        self._sites = [operate_site(s) for s in self._sites]
+        self._set_site_arrays(_SiteArrays(frac_coords.reshape((-1, 3)), site_arrays.species,
+                                          site_arrays.species_indices, site_arrays.properties))
 
     @deprecated(message="Simply set using Structure.lattice = lattice. This will be removed in pymatgen v2020.")
     def modify_lattice(self, new_lattice):
@@ -3417,17 +3673,22 @@ class Structure(IStructure, collections.abc.MutableSequence):
         """
         if not isinstance(indices, collections.abc.Iterable):
             indices = [indices]
-
-        for i in indices:
-            site = self._sites[i]
-            if frac_coords:
-                fcoords = site.frac_coords + vector
-            else:
-                fcoords = self._lattice.get_fractional_coords(
-                    site.coords + vector)
+        indices = list(indices)
+
+        if not frac_coords:
+            vector = self._lattice.get_fractional_coords(vector)
+        if self._site_arrays is not None:
+            all_fcoords = self._site_arrays.frac_coords
+            # add.at translates sites repeated in indices several times
+            np.add.at(all_fcoords, indices, vector)
             if to_unit_cell:
-                fcoords = np.mod(fcoords, 1)
-            self._sites[i].frac_coords = fcoords
+                all_fcoords[indices] = np.mod(all_fcoords[indices], 1)
+        else:
+            for i in indices:
+                fcoords = self._sites[i].frac_coords + vector
+                if to_unit_cell:
+                    fcoords = np.mod(fcoords, 1)
+                self._sites[i].frac_coords = fcoords
 
     def rotate_sites(self, indices=None, theta=0, axis=None, anchor=None,
                      to_unit_cell=True):
@@ -3521,10 +3782,10 @@ class Structure(IStructure, collections.abc.MutableSequence):
             to_unit_cell: Whether or not to fall back sites into the unit cell
         """
         s = self * scaling_matrix
+        site_arrays = s._get_site_arrays()
         if to_unit_cell:
-            for site in s:
-                site.to_unit_cell(in_place=True)
-        self._sites = s.sites
+            site_arrays.frac_coords = np.mod(site_arrays.frac_coords, 1)
+        self._set_site_arrays(site_arrays)
         self._lattice = s.lattice
 
     def scale_lattice(self, volume):
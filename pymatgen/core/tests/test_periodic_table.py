@@ -10,7 +10,8 @@ import math
 import numpy as np
 
 from pymatgen.util.testing import PymatgenTest
-from pymatgen.core.periodic_table import Element, Specie, DummySpecie, get_el_sp
+from pymatgen.core.periodic_table import Element, Specie, DummySpecie, get_el_sp, \
+    get_element_properties
 from pymatgen.core.composition import Composition
 from copy import deepcopy
 
@@ -408,6 +409,24 @@ class FuncTest(unittest.TestCase):
         self.assertEqual(get_el_sp("Mn3+"), Specie("Mn", 3))
         self.assertEqual(get_el_sp(["Li+", "Mn3+"]),
                          [Specie("Li", 1), Specie("Mn", 3)])
+        self.assertIs(get_el_sp("Mn3+"), get_el_sp("Mn3+"))
+        self.assertRaises(ValueError, get_el_sp, "mn3+")
+
+    def test_get_element_properties(self):
+        zs = (26, 8, 8, 1)
+        x = get_element_properties("X", zs)
+        self.assertEqual(x.tolist(), [Element.from_Z(z).X for z in zs])
+        masses = get_element_properties("atomic_mass", np.array([[3, 26]]))
+        self.assertEqual(masses.shape, (1, 2))
+        self.assertAlmostEqual(masses[0, 1], Element.Fe.atomic_mass)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.assertTrue(np.isnan(get_element_properties("X", [2])[0]))
+        self.assertEqual(get_element_properties("X", []).shape, (0,))
+        self.assertRaises(ValueError, get_element_properties, "atomic_mass", [-1])
+        self.assertRaises(ValueError, get_element_properties, "atomic_mass", [1, 0])
+        self.assertRaises(ValueError, get_element_properties, "atomic_mass", [[1, 119]])
+        self.assertRaises(AttributeError, get_element_properties, "foo", zs)
 
 
 if __name__ == "__main__":
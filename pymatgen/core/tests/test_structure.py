@@ -6,6 +6,7 @@ import unittest
 from pathlib import Path
 import warnings
 import random
+import pickle
 import os
 import numpy as np
 
@@ -856,6 +857,43 @@ class StructureTest(PymatgenTest):
         self.assertArrayAlmostEqual(self.structure.lattice.abc,
                                     [15.360792, 35.195996, 7.680396], 5)
 
+    def test_site_arrays(self):
+        s = self.structure.copy(site_properties={"magmom": [1, -1]})
+        s2 = s.copy()
+        s2.sites  # switches to PeriodicSites
+        self.assertIsNotNone(s._site_arrays)
+        self.assertIsNone(s2._site_arrays)
+
+        op = SymmOp.from_axis_angle_and_translation([0, 0, 1], 30, translation_vec=[0.1, 0, 0])
+        for struct in (s, s2):
+            struct.make_supercell([2, 2, 1])
+            struct.translate_sites([0, 0, 3], [0.1, 0.2, 0.3], frac_coords=False)
+            struct.apply_operation(op)
+            struct.remove_sites([1, 2])
+        self.assertIsNotNone(s._site_arrays)
+        self.assertEqual(len(s), 6)
+        self.assertEqual(s.composition, s2.composition)
+        self.assertEqual(s.site_properties, s2.site_properties)
+        self.assertArrayAlmostEqual(s.frac_coords, s2.frac_coords)
+        self.assertArrayAlmostEqual(s.cart_coords, s2.cart_coords)
+        self.assertArrayAlmostEqual(s.lattice.matrix, s2.lattice.matrix)
+
+        # Sites are created on access and keep changes made through them
+        site = s[0]
+        self.assertIsNone(s._site_arrays)
+        self.assertEqual(site, s2[0])
+        site.frac_coords = [0.5, 0.5, 0.5]
+        self.assertArrayAlmostEqual(s.frac_coords[0], [0.5, 0.5, 0.5])
+        s[1].properties["magmom"] = 3
+        self.assertEqual(s.site_properties["magmom"][1], 3)
+
+        s = self.structure.copy()
+        s.make_supercell(2)
+        self.assertEqual(s.species, [Element("Si")] * 16)
+        self.assertEqual(s.atomic_numbers, (14,) * 16)
+        self.assertTrue(s.is_ordered)
+        self.assertEqual(pickle.loads(pickle.dumps(s)), s)
+
     def test_disordered_supercell_primitive_cell(self):
         l = Lattice.cubic(2)
         f = [[0.5, 0.5, 0.5]]
@@ -1,11 +1,12 @@
 from pymatgen.util.testing import PymatgenTest
 from pymatgen.io.vasp.outputs import Xdatcar
 from pymatgen.io.vasp.inputs import Poscar
-from pymatgen.core.trajectory import Trajectory
+from pymatgen.core.trajectory import Trajectory, TrajectoryStore
 from pymatgen.core.structure import Structure
 from pymatgen.core.lattice import Lattice
 import numpy as np
 import os
+from monty.tempfile import ScratchDir
 
 test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
                         'test_files')
@@ -348,6 +349,55 @@ class TrajectoryTest(PymatgenTest):
         self._check_traj_equality(self.traj, written_traj)
         os.remove("traj_test_XDATCAR")
 
+    def test_store(self):
+        with ScratchDir("."):
+            self.traj.to_store("traj_store", chunk_size=7)
+            traj = Trajectory.from_file("traj_store")
+            self.assertEqual(len(traj), len(self.structures))
+            self.assertTrue(all([traj[i] == self.structures[i] for i in range(0, len(self.structures), 19)]))
+
+            # Slices are backed by the store as well
+            for frames in [slice(2, 99, 3), slice(None, -4, 2), [10, 30, 70]]:
+                sliced_traj = traj[frames]
+                expected = self.traj[frames]
+                self.assertEqual(len(sliced_traj), len(expected))
+                self.assertTrue(all([i == j for i, j in zip(sliced_traj, expected)]))
+
+            # Xdatcar is streamed from the store
+            traj.write_Xdatcar("XDATCAR_store")
+            self.traj.write_Xdatcar("XDATCAR_memory")
+            with open("XDATCAR_store") as f1, open("XDATCAR_memory") as f2:
+                self.assertEqual(f1.read(), f2.read())
+
+            # Appending while another reader has the store open
+            reader = TrajectoryStore("traj_store")
+            traj.extend(self.traj[:5])
+            self.assertEqual(len(traj), len(self.structures) + 5)
+            self.assertEqual(traj[-1], self.structures[4])
+            self.assertEqual(len(reader), len(self.structures))
+            reader.refresh()
+            self.assertEqual(len(reader), len(self.structures) + 5)
+
+            self.assertRaises(ValueError, self.traj.to_store, "traj_store")
+
+    def test_store_properties(self):
+        structures = []
+        for i in range(10):
+            structure = self.structures[i].copy()
+            structure.lattice = Lattice(structure.lattice.matrix * (1 + i / 100))
+            structure.add_site_property("magmom", [i] * len(structure))
+            structures.append(structure)
+        traj = Trajectory.from_structures(structures, constant_lattice=False,
+                                          frame_properties={"energy": list(range(10))})
+
+        with ScratchDir("."):
+            traj.to_store("traj_store", chunk_size=3)
+            stored_traj = Trajectory.from_store("traj_store")
+            self.assertTrue(all([i == j for i, j in zip(stored_traj, structures)]))
+            self.assertEqual(stored_traj[4].site_properties["magmom"], [4] * len(structures[4]))
+            self.assertArrayAlmostEqual(stored_traj[::2].frame_properties["energy"], [0, 2, 4, 6, 8])
+            self.assertEqual(Trajectory.from_dict(stored_traj.as_dict())[7], structures[7])
+
 
 if __name__ == '__main__':
     import unittest
@@ -6,7 +6,9 @@
 This module provides classes used to define a MD trajectory.
 """
 
+import collections
 import itertools
+import json
 import os
 import warnings
 from fnmatch import fnmatch
@@ -24,6 +26,276 @@ __version__ = "0.0"
 __date__ = "Jan 25, 2019"
 
 
+class TrajectoryStore:
+    """
+    Columnar, chunked on-disk storage for the frames of a trajectory. A store is a
+    directory holding a small JSON metadata file and, for every chunk of frames,
+    one .npy file per column (fractional coordinates, lattices of variable-lattice
+    runs and numeric site and frame properties). Chunks are memory-mapped when
+    read, so only the frames that are accessed are loaded into memory, and new
+    chunks can be appended while a simulation is still running.
+
+    Only a single process should append to a store at a time. Readers in other
+    processes pick up newly appended frames by calling refresh().
+    """
+
+    metadata_file = "trajectory.json"
+    max_open_chunks = 64
+
+    def __init__(self, dirname):
+        """
+        Open an existing store.
+
+        Args:
+            dirname (str): Directory of the store.
+        """
+        self.dirname = dirname
+        self._chunks = collections.OrderedDict()
+        self.refresh()
+
+    @classmethod
+    def create(cls, dirname, species, lattice=None, time_step=2, constant_lattice=True):
+        """
+        Create a new, empty store.
+
+        Args:
+            dirname (str): Directory of the store. Created if it does not exist.
+            species: List of species on each site, as for Trajectory.
+            lattice (3x3 array): The lattice of a constant-lattice trajectory.
+            time_step (int, float): Timestep of simulation in femtoseconds.
+            constant_lattice (bool): Whether the lattice is the same for all frames.
+                Otherwise the lattice of each frame is stored as a column.
+        Returns:
+            (TrajectoryStore)
+        """
+        if constant_lattice and lattice is None:
+            raise ValueError("A lattice is required for a constant-lattice store")
+        if os.path.exists(os.path.join(dirname, cls.metadata_file)):
+            raise ValueError("{} already contains a trajectory store".format(dirname))
+        os.makedirs(dirname, exist_ok=True)
+        if isinstance(lattice, Lattice):
+            lattice = lattice.matrix
+        species = [{str(k): v for k, v in sp.items()} if isinstance(sp, (dict, Composition)) else str(sp)
+                   for sp in species]
+        metadata = {"species": species,
+                    "lattice": np.asarray(lattice).tolist() if constant_lattice else None,
+                    "time_step": time_step,
+                    "constant_lattice": constant_lattice,
+                    "columns": None,
+                    "chunk_lengths": []}
+        cls._write_metadata(dirname, metadata)
+        return cls(dirname)
+
+    @classmethod
+    def _write_metadata(cls, dirname, metadata):
+        # Write to a temporary file first so that readers never see a partial file
+        path = os.path.join(dirname, cls.metadata_file)
+        with open(path + ".tmp", "w") as f:
+            json.dump(metadata, f)
+        os.replace(path + ".tmp", path)
+
+    def refresh(self):
+        """
+        Re-read the metadata of the store, e.g., to pick up frames that were
+        appended by another process since the store was opened.
+        """
+        with open(os.path.join(self.dirname, self.metadata_file)) as f:
+            metadata = json.load(f)
+        self.species = metadata["species"]
+        self.lattice = None if metadata["lattice"] is None else np.array(metadata["lattice"])
+        self.time_step = metadata["time_step"]
+        self.constant_lattice = metadata["constant_lattice"]
+        self.columns = metadata["columns"]
+        self.chunk_lengths = metadata["chunk_lengths"]
+        self._offsets = np.cumsum([0] + self.chunk_lengths)
+
+    def __len__(self):
+        return int(self._offsets[-1])
+
+    def append(self, frac_coords, lattice=None, site_properties=None, frame_properties=None):
+        """
+        Append a chunk of frames to the store.
+
+        Args:
+            frac_coords (MxNx3 array): Fractional coordinates of the M frames.
+            lattice (Mx3x3 array): Lattices of the frames. Required for, and only
+                used by, stores of variable-lattice trajectories.
+            site_properties (dict): Numeric site properties of the frames as arrays
+                with a leading frame axis, e.g., {"forces": MxNx3 array}.
+            frame_properties (dict): Numeric frame properties as arrays with a
+                leading frame axis, e.g., {"energy": M array}.
+        """
+        frac_coords = np.asarray(frac_coords, dtype=float)
+        if frac_coords.ndim != 3 or frac_coords.shape[1:] != (len(self.species), 3):
+            raise ValueError("frac_coords must have shape (nframes, {}, 3)".format(len(self.species)))
+        nframes = len(frac_coords)
+        if nframes == 0:
+            return
+
+        columns = {"frac_coords": frac_coords}
+        if not self.constant_lattice:
+            if lattice is None:
+                raise ValueError("Lattices are required for a variable-lattice store")
+            columns["lattice"] = np.asarray(lattice, dtype=float).reshape(nframes, 3, 3)
+        for prefix, props in (("site_properties", site_properties), ("frame_properties", frame_properties)):
+            for key, values in (props or {}).items():
+                values = np.asarray(values)
+                if values.dtype.kind not in "biuf" or len(values) != nframes:
+                    raise ValueError("Only numeric {} with one value per frame can be stored, "
+                                     "{} is not".format(prefix, key))
+                columns["{}.{}".format(prefix, key)] = values
+
+        self.refresh()
+        if self.columns is None:
+            self.columns = sorted(columns.keys())
+        elif sorted(columns.keys()) != self.columns:
+            raise ValueError("Columns of the appended frames {} do not match those of the store {}".format(
+                sorted(columns.keys()), self.columns))
+
+        chunk = len(self.chunk_lengths)
+        for name, values in columns.items():
+            np.save(self._get_chunk_path(name, chunk), values)
+        self._write_metadata(self.dirname, {
+            "species": self.species,
+            "lattice": None if self.lattice is None else self.lattice.tolist(),
+            "time_step": self.time_step,
+            "constant_lattice": self.constant_lattice,
+            "columns": self.columns,
+            "chunk_lengths": self.chunk_lengths + [nframes]})
+        self.refresh()
+
+    def get_column(self, name):
+        """
+        Args:
+            name (str): Name of the column, e.g., "frac_coords", "lattice",
+                "site_properties.forces" or "frame_properties.energy".
+        Returns:
+            Lazy, array-like view of the column over all frames of the store.
+        """
+        if name not in (self.columns or ["frac_coords"]):
+            raise KeyError("No column {} in store".format(name))
+        return _FrameColumn(self, name)
+
+    def get_frame(self, name, frame):
+        """
+        Args:
+            name (str): Name of the column.
+            frame (int): Index of the frame.
+        Returns:
+            The values of the column for a single frame.
+        """
+        chunk = int(np.searchsorted(self._offsets, frame, side="right")) - 1
+        value = self._load_chunk(name, chunk)[frame - self._offsets[chunk]]
+        return np.array(value) if isinstance(value, np.ndarray) else value
+
+    def get_frames(self, name, frames):
+        """
+        Args:
+            name (str): Name of the column.
+            frames ([int]): Indices of the frames.
+        Returns:
+            (ndarray) The values of the column for the frames, read chunk by chunk.
+        """
+        frames = np.asarray(frames, dtype=int)
+        if not self.chunk_lengths:
+            return np.zeros((0, len(self.species), 3))
+        chunks = np.searchsorted(self._offsets, frames, side="right") - 1
+        data = self._load_chunk(name, 0)
+        values = np.empty((len(frames),) + data.shape[1:], dtype=data.dtype)
+        for chunk in np.unique(chunks):
+            mask = chunks == chunk
+            values[mask] = self._load_chunk(name, chunk)[frames[mask] - self._offsets[chunk]]
+        return values
+
+    def _get_chunk_path(self, name, chunk):
+        return os.path.join(self.dirname, "{}.{:06d}.npy".format(name, chunk))
+
+    def _load_chunk(self, name, chunk):
+        key = (name, chunk)
+        if key in self._chunks:
+            self._chunks.move_to_end(key)
+        else:
+            if len(self._chunks) >= self.max_open_chunks:
+                self._chunks.popitem(last=False)
+            self._chunks[key] = np.load(self._get_chunk_path(name, chunk), mmap_mode="r")
+        return self._chunks[key]
+
+
+class _FrameColumn:
+    """
+    Read-only, array-like view of one column of a TrajectoryStore. Integer indexing
+    reads a single frame, while slicing and fancy indexing return new views without
+    reading any data. A view over the whole store follows frames appended to it.
+    """
+
+    def __init__(self, store, name, frames=None):
+        self.store = store
+        self.name = name
+        self.frames = frames
+
+    def __len__(self):
+        return len(self.store) if self.frames is None else len(self.frames)
+
+    @property
+    def shape(self):
+        """
+        :return: Shape of the column, with the frames along the first axis.
+        """
+        if len(self.store) == 0:
+            return (0,)
+        return (len(self),) + self.store._load_chunk(self.name, 0).shape[1:]
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            nframes = len(self)
+            if item < 0:
+                item += nframes
+            if not 0 <= item < nframes:
+                raise IndexError("Frame index out of range")
+            return self.store.get_frame(self.name, item if self.frames is None else self.frames[item])
+        frames = np.arange(len(self))[item]
+        if self.frames is not None:
+            frames = self.frames[frames]
+        return _FrameColumn(self.store, self.name, frames)
+
+    def __iter__(self):
+        # Read blocks of frames at a time rather than a frame per call
+        for start in range(0, len(self), 1024):
+            yield from np.asarray(self[start:start + 1024])
+
+    def __array__(self, dtype=None):
+        frames = np.arange(len(self)) if self.frames is None else self.frames
+        values = self.store.get_frames(self.name, frames)
+        return values if dtype is None else values.astype(dtype)
+
+
+class _SitePropertiesView(collections.abc.Sequence):
+    """
+    Per-frame site properties of a store-backed trajectory, read lazily from the
+    site property columns of the store.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return {key: column[item].tolist() for key, column in self.columns.items()}
+        return _SitePropertiesView({key: column[item] for key, column in self.columns.items()})
+
+
+def _take_frames(values, frames):
+    """
+    Select frames from a per-frame sequence, keeping store-backed views lazy.
+    """
+    if isinstance(values, (_FrameColumn, _SitePropertiesView)):
+        return values[list(frames)]
+    return [values[i] for i in frames]
+
+
 class Trajectory(MSONable):
     """
     Trajectory object that stores structural information related to a MD simulation.
@@ -99,6 +371,7 @@ class Trajectory(MSONable):
         self.site_properties = site_properties
         self.frame_properties = frame_properties
         self.time_step = time_step
+        self._store = None
 
     def get_structure(self, i):
         """
@@ -149,6 +422,14 @@ class Trajectory(MSONable):
         self.to_positions()
         trajectory.to_positions()
 
+        if self._store is not None:
+            # Append the frames to the store on disk; the views of self follow the store
+            if self._store.constant_lattice and not trajectory.constant_lattice:
+                raise ValueError('Trajectory not extended: cannot append variable lattices to a '
+                                 'constant-lattice store')
+            trajectory._append_to_store(self._store)
+            return
+
         self.site_properties = self._combine_site_props(self.site_properties, trajectory.site_properties,
                                                         np.shape(self.frac_coords)[0],
                                                         np.shape(trajectory.frac_coords)[0])
@@ -210,16 +491,16 @@ class Trajectory(MSONable):
             # For slice input, return a trajectory of the sliced time
             start, stop, step = frames.indices(len(self))
             pruned_frames = range(start, stop, step)
-            lattice = self.lattice if self.constant_lattice else [self.lattice[i] for i in pruned_frames]
-            frac_coords = [self.frac_coords[i] for i in pruned_frames]
+            lattice = self.lattice if self.constant_lattice else _take_frames(self.lattice, pruned_frames)
+            frac_coords = _take_frames(self.frac_coords, pruned_frames)
             if self.site_properties is not None:
-                site_properties = [self.site_properties[i] for i in pruned_frames]
+                site_properties = _take_frames(self.site_properties, pruned_frames)
             else:
                 site_properties = None
             if self.frame_properties is not None:
                 frame_properties = {}
                 for key, item in self.frame_properties.items():
-                    frame_properties[key] = [item[i] for i in pruned_frames]
+                    frame_properties[key] = _take_frames(item, pruned_frames)
             else:
                 frame_properties = None
             return Trajectory(lattice, self.species, frac_coords, time_step=self.time_step,
@@ -231,16 +512,16 @@ class Trajectory(MSONable):
             pruned_frames = [i for i in frames if i < len(self)]  # Get rid of frames that exceed trajectory length
             if len(pruned_frames) < len(frames):
                 warnings.warn('Some or all selected frames exceed trajectory length')
-            lattice = self.lattice if self.constant_lattice else [self.lattice[i] for i in pruned_frames]
-            frac_coords = [self.frac_coords[i] for i in pruned_frames]
+            lattice = self.lattice if self.constant_lattice else _take_frames(self.lattice, pruned_frames)
+            frac_coords = _take_frames(self.frac_coords, pruned_frames)
             if self.site_properties is not None:
-                site_properties = [self.site_properties[i] for i in pruned_frames]
+                site_properties = _take_frames(self.site_properties, pruned_frames)
             else:
                 site_properties = None
             if self.frame_properties is not None:
                 frame_properties = {}
                 for key, item in self.frame_properties.items():
-                    frame_properties[key] = [item[i] for i in pruned_frames]
+                    frame_properties[key] = _take_frames(item, pruned_frames)
             else:
                 frame_properties = None
             return Trajectory(lattice, self.species, frac_coords, time_step=self.time_step,
@@ -267,7 +548,7 @@ class Trajectory(MSONable):
         Args:
             structures (list): list of pymatgen Structure objects.
             constant_lattice (bool): Whether the lattice changes during the simulation, such as in an NPT MD
-                simulation. True results in
+                simulation. True results in the lattice of the first structure being used for all frames.
         Returns:
             (Trajectory)
         """
@@ -285,40 +566,127 @@ class Trajectory(MSONable):
     @classmethod
     def from_file(cls, filename, constant_lattice=True, **kwargs):
         """
-        Convenience constructor to obtain trajectory from XDATCAR or vasprun.xml file
+        Convenience constructor to obtain trajectory from XDATCAR or vasprun.xml file, or from
+        the directory of a TrajectoryStore.
         Args:
             filename (str): The filename to read from.
             constant_lattice (bool): Whether the lattice changes during the simulation, such as in an NPT MD
-                simulation. True results in
+                simulation. True results in the lattice of the first frame being used for all frames.
+                Ignored for stores, which record this themselves.
         Returns:
             (Trajectory)
         """
         # TODO: Support other filetypes
 
+        if os.path.isdir(filename):
+            return cls.from_store(filename)
+
         fname = os.path.basename(filename)
         if fnmatch(fname, "*XDATCAR*"):
-            structures = Xdatcar(filename).structures
-        elif fnmatch(fname, "vasprun*.xml*"):
+            # Stream the raw frames rather than creating a Structure for each
+            frames = list(Xdatcar.iter_frames(filename))
+            lattice = frames[0].lattice if constant_lattice else [frame.lattice for frame in frames]
+            return cls(lattice, frames[0].species, np.array([frame.frac_coords for frame in frames]),
+                       site_properties=[{} for frame in frames], constant_lattice=constant_lattice, **kwargs)
+        if fnmatch(fname, "vasprun*.xml*"):
             structures = Vasprun(filename).structures
         else:
             raise ValueError("Unsupported file")
 
         return cls.from_structures(structures, constant_lattice=constant_lattice, **kwargs)
 
+    @classmethod
+    def from_store(cls, dirname):
+        """
+        Obtain a trajectory backed by a TrajectoryStore. Frames are read from disk
+        only when they are accessed, slicing returns trajectories backed by the same
+        store, and extend() appends frames to the store.
+        Args:
+            dirname (str): Directory of the store.
+        Returns:
+            (Trajectory)
+        """
+        store = TrajectoryStore(dirname)
+        if len(store) == 0:
+            raise ValueError("Trajectory store {} contains no frames".format(dirname))
+        site_properties = {}
+        frame_properties = {}
+        for name in store.columns:
+            prefix, _, key = name.partition(".")
+            if prefix == "site_properties":
+                site_properties[key] = store.get_column(name)
+            elif prefix == "frame_properties":
+                frame_properties[key] = store.get_column(name)
+        lattice = store.lattice if store.constant_lattice else store.get_column("lattice")
+        traj = cls(lattice, store.species, store.get_column("frac_coords"), time_step=store.time_step,
+                   site_properties=_SitePropertiesView(site_properties) if site_properties else None,
+                   frame_properties=frame_properties or None, constant_lattice=store.constant_lattice)
+        traj._store = store
+        return traj
+
+    def to_store(self, dirname, chunk_size=1000):
+        """
+        Write the trajectory to a new TrajectoryStore, a chunk of frames at a time.
+        Only numeric site and frame properties can be stored.
+        Args:
+            dirname (str): Directory of the store.
+            chunk_size (int): Number of frames per chunk.
+        Returns:
+            (TrajectoryStore)
+        """
+        store = TrajectoryStore.create(dirname, self.species, self.lattice if self.constant_lattice else None,
+                                       time_step=self.time_step, constant_lattice=self.constant_lattice)
+        self._append_to_store(store, chunk_size=chunk_size)
+        return store
+
+    def _append_to_store(self, store, chunk_size=1000):
+        """
+        Append the frames of the trajectory to a store in chunks of chunk_size frames.
+        """
+        self.to_positions()
+        nframes = len(self)
+        for start in range(0, nframes, chunk_size):
+            stop = min(start + chunk_size, nframes)
+            lattice = None
+            if not store.constant_lattice:
+                lattice = [self.lattice] * (stop - start) if self.constant_lattice else self.lattice[start:stop]
+            site_properties = None
+            if self.site_properties:
+                if len(self.site_properties) == 1:
+                    frame_site_properties = [self.site_properties[0]] * (stop - start)
+                else:
+                    frame_site_properties = [self.site_properties[i] for i in range(start, stop)]
+                if any(props is None for props in frame_site_properties):
+                    raise ValueError("Frames without site properties cannot be stored")
+                site_properties = {key: [props[key] for props in frame_site_properties]
+                                   for key in frame_site_properties[0]}
+            frame_properties = None
+            if self.frame_properties:
+                frame_properties = {key: item[start:stop] for key, item in self.frame_properties.items()}
+            store.append(self.frac_coords[start:stop], lattice=lattice, site_properties=site_properties,
+                         frame_properties=frame_properties)
+
     def as_dict(self):
         """
         :return: MSONAble dict.
         """
+        site_properties = self.site_properties
+        if isinstance(site_properties, _SitePropertiesView):
+            site_properties = list(site_properties)
+        frame_properties = self.frame_properties
+        if frame_properties is not None:
+            frame_properties = {key: np.asarray(item).tolist() if isinstance(item, _FrameColumn) else item
+                                for key, item in frame_properties.items()}
         d = {"@module": self.__class__.__module__,
              "@class": self.__class__.__name__,
              "species": self.species, "time_step": self.time_step,
-             "site_properties": self.site_properties,
-             "frame_properties": self.frame_properties,
+             "site_properties": site_properties,
+             "frame_properties": frame_properties,
              "constant_lattice": self.constant_lattice,
              "coords_are_displacement": self.coords_are_displacement,
              "base_positions": self.base_positions}
-        d["lattice"] = self.lattice.tolist()
-        d["frac_coords"] = self.frac_coords.tolist()
+        d["lattice"] = np.asarray(self.lattice).tolist()
+        d["frac_coords"] = np.asarray(self.frac_coords).tolist()
 
         return d
 
@@ -438,37 +806,37 @@ class Trajectory(MSONable):
         if system is None:
             system = f'{self[0].composition.reduced_formula}'
 
-        lines = []
         format_str = "{{:.{0}f}}".format(significant_figures)
         syms = [site.specie.symbol for site in self[0]]
         site_symbols = [a[0] for a in itertools.groupby(syms)]
         syms = [site.specie.symbol for site in self[0]]
         natoms = [len(tuple(a[1])) for a in itertools.groupby(syms)]
 
-        for si, frac_coords in enumerate(self.frac_coords):
-            # Only print out the info block if
-            if self.constant_lattice and si == 0:
-                lines.extend([system, "1.0"])
-
-                if self.constant_lattice:
-                    _lattice = self.lattice
-                else:
-                    _lattice = self.lattice[si]
+        # Frames are written as they are read so that store-backed trajectories
+        # never have to be held in memory as a whole
+        with zopen(filename, "wt") as f:
+            for si, frac_coords in enumerate(self.frac_coords):
+                lines = []
+                # Only print out the info block if
+                if self.constant_lattice and si == 0:
+                    lines.extend([system, "1.0"])
 
-                for latt_vec in _lattice:
-                    lines.append(f'{" ".join([str(el) for el in latt_vec])}')
+                    if self.constant_lattice:
+                        _lattice = self.lattice
+                    else:
+                        _lattice = self.lattice[si]
 
-                lines.append(" ".join(site_symbols))
-                lines.append(" ".join([str(x) for x in natoms]))
+                    for latt_vec in _lattice:
+                        lines.append(f'{" ".join([str(el) for el in latt_vec])}')
 
-            lines.append(f"Direct configuration=     {str(si + 1)}")
+                    lines.append(" ".join(site_symbols))
+                    lines.append(" ".join([str(x) for x in natoms]))
 
-            for (frac_coord, specie) in zip(frac_coords, self.species):
-                coords = frac_coord
-                line = f'{" ".join([format_str.format(c) for c in coords])} {specie}'
-                lines.append(line)
+                lines.append(f"Direct configuration=     {str(si + 1)}")
 
-        xdatcar_string = "\n".join(lines) + "\n"
+                for (frac_coord, specie) in zip(frac_coords, self.species):
+                    coords = frac_coord
+                    line = f'{" ".join([format_str.format(c) for c in coords])} {specie}'
+                    lines.append(line)
 
-        with zopen(filename, "wt") as f:
-            f.write(xdatcar_string)
+                f.write("\n".join(lines) + "\n")
@@ -30,7 +30,7 @@ from pymatgen.core.periodic_table import Element, Specie, get_el_sp, DummySpecie
 from pymatgen.core.structure import Structure
 from pymatgen.electronic_structure.core import Magmom
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
-from pymatgen.symmetry.groups import SpaceGroup, SYMM_DATA
+from pymatgen.symmetry.groups import SpaceGroup, _get_symm_data
 from pymatgen.symmetry.maggroups import MagneticSpaceGroup
 from pymatgen.util.coord import in_coord_list_pbc, find_in_coord_list_pbc
 
@@ -44,9 +44,9 @@ __date__ = "Sep 23, 2011"
 
 sub_spgrp = partial(re.sub, r"[\s_]", "")
 
-space_groups = {sub_spgrp(k): k for k in SYMM_DATA['space_group_encoding'].keys()}  # type: ignore
+space_groups = {sub_spgrp(k): k for k in _get_symm_data('space_group_encoding').keys()}  # type: ignore
 
-space_groups.update({sub_spgrp(k): k for k in SYMM_DATA['space_group_encoding'].keys()})  # type: ignore
+space_groups.update({sub_spgrp(k): k for k in _get_symm_data('space_group_encoding').keys()})  # type: ignore
 
 _COD_DATA = None
 
@@ -10,7 +10,11 @@ files (log and dump).
 
 import re
 import glob
+import collections
+import itertools
+from functools import partial
 from io import StringIO
+from multiprocessing import Pool
 
 import numpy as np
 import pandas as pd
@@ -29,6 +33,32 @@ __email__ = "z4deng@eng.ucsd.edu"
 __date__ = "Aug 1, 2018"
 
 
+LammpsDumpFrame = collections.namedtuple("LammpsDumpFrame",
+                                         ["timestep", "natoms", "box", "columns", "data", "dtypes"])
+
+
+def _parse_dump_header(lines):
+    """
+    Parses the 9 header lines of a dump snapshot.
+
+    Returns:
+        timestep, natoms, LammpsBox and the names of the atom columns.
+    """
+    timestep = int(lines[1])
+    natoms = int(lines[3])
+    box_arr = np.loadtxt(StringIO("\n".join(lines[5:8])))
+    bounds = box_arr[:, :2]
+    tilt = None
+    if "xy xz yz" in lines[4]:
+        tilt = box_arr[:, 2]
+        x = (0, tilt[0], tilt[1], tilt[0] + tilt[1])
+        y = (0, tilt[2])
+        bounds -= np.array([[min(x), max(x)], [min(y), max(y)], [0, 0]])
+    box = LammpsBox(bounds, tilt)
+    names = lines[8].replace("ITEM: ATOMS", "").split()
+    return timestep, natoms, box, names
+
+
 class LammpsDump(MSONable):
     """
     Object for representing dump data for a single snapshot.
@@ -60,22 +90,24 @@ class LammpsDump(MSONable):
 
         """
         lines = string.split("\n")
-        timestep = int(lines[1])
-        natoms = int(lines[3])
-        box_arr = np.loadtxt(StringIO("\n".join(lines[5:8])))
-        bounds = box_arr[:, :2]
-        tilt = None
-        if "xy xz yz" in lines[4]:
-            tilt = box_arr[:, 2]
-            x = (0, tilt[0], tilt[1], tilt[0] + tilt[1])
-            y = (0, tilt[2])
-            bounds -= np.array([[min(x), max(x)], [min(y), max(y)], [0, 0]])
-        box = LammpsBox(bounds, tilt)
-        data_head = lines[8].replace("ITEM: ATOMS", "").split()
+        timestep, natoms, box, data_head = _parse_dump_header(lines)
         data = pd.read_csv(StringIO("\n".join(lines[9:])), names=data_head,
                            delim_whitespace=True)
         return cls(timestep, natoms, box, data)
 
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Constructor from a frame parsed by iter_lammps_dump.
+
+        Args:
+            frame (LammpsDumpFrame): Parsed snapshot.
+
+        """
+        data = pd.DataFrame(frame.data, columns=frame.columns)
+        data = data.astype(dict(zip(frame.columns, frame.dtypes)))
+        return cls(frame.timestep, frame.natoms, frame.box, data)
+
     @classmethod
     def from_dict(cls, d):
         """
@@ -104,7 +136,120 @@ class LammpsDump(MSONable):
         return d
 
 
-def parse_lammps_dumps(file_pattern):
+def _read_dump_atoms(lines, names, columns):
+    """
+    Parses the atom lines of a snapshot into a DataFrame of the selected
+    columns for LammpsDump. Each column keeps the dtype inferred by pandas.
+    """
+    if not lines:
+        return pd.DataFrame(np.empty((0, len(columns))), columns=columns)
+    data = pd.read_csv(StringIO("".join(lines)), header=None, names=names,
+                       usecols=columns, sep=r"\s+")
+    # usecols keeps the order of the columns in the dump
+    if list(data.columns) != columns:
+        data = data[columns]
+    return data
+
+
+def _read_dump_array(lines, names, columns):
+    """
+    Parses the atom lines of a snapshot into a preallocated array of the
+    selected columns, without building a DataFrame. The array holds floats
+    unless a column is not numeric, in which case it holds objects.
+
+    Returns:
+        The (natoms, len(columns)) array and the dtypes of the columns,
+        int64 or float64 for numeric columns and object otherwise, as
+        pandas would infer them.
+    """
+    tokens = np.array("".join(lines).split())
+    if tokens.size != len(lines) * len(names):
+        raise ValueError("Expected %d columns per atom line" % len(names))
+    tokens = tokens.reshape((len(lines), len(names)))
+    values, dtypes = [], []
+    for c in columns:
+        col = tokens[:, names.index(c)]
+        for dt in (np.int64, np.float64):
+            try:
+                col = col.astype(dt)
+                break
+            except ValueError:
+                pass
+        else:
+            col = np.array(col.tolist(), dtype=object)
+        values.append(col)
+        dtypes.append(col.dtype)
+    numeric = all(dt.kind in "biuf" for dt in dtypes)
+    data = np.empty((len(lines), len(columns)), dtype=float if numeric else object)
+    for j, col in enumerate(values):
+        data[:, j] = col
+    return data, dtypes
+
+
+def _iter_dumps(filename, as_frames=False, columns=None, start=0, stop=None, step=1):
+    """
+    Generator that streams the selected snapshots of a single dump file,
+    either as LammpsDump objects or as LammpsDumpFrame tuples. The atom
+    lines of the other snapshots are skipped without being parsed.
+    """
+    with zopen(filename, "rt") as f:
+        i = 0
+        for line in f:
+            if not line.startswith("ITEM: TIMESTEP"):
+                continue
+            if stop is not None and i >= stop:
+                break
+            header = [line] + list(itertools.islice(f, 8))
+            timestep, natoms, box, names = _parse_dump_header(header)
+            atom_lines = itertools.islice(f, natoms)
+            if i >= start and (i - start) % step == 0:
+                selected = names if columns is None else list(columns)
+                missing = set(selected) - set(names)
+                if missing:
+                    raise ValueError("Columns %s not in dump %s" % (sorted(missing), filename))
+                if as_frames:
+                    data, dtypes = _read_dump_array(list(atom_lines), names, selected)
+                    yield LammpsDumpFrame(timestep, natoms, box, selected, data, dtypes)
+                else:
+                    data = _read_dump_atoms(list(atom_lines), names, selected)
+                    yield LammpsDump(timestep, natoms, box, data)
+            else:
+                collections.deque(atom_lines, maxlen=0)
+            i += 1
+
+
+def iter_lammps_dump(filename, columns=None, start=0, stop=None, step=1):
+    """
+    Generator that streams the snapshots of a single dump file into NumPy
+    arrays. Only the selected snapshots are parsed; the atom lines of the
+    others are skipped.
+
+    Args:
+        filename (str): Filename to parse. Compressed files are supported.
+        columns ([str]): Names of the atom columns to keep, e.g.,
+            ["id", "x", "y", "z"]. Defaults to None, i.e., all columns.
+        start (int): Index of the first snapshot to parse. Defaults to 0.
+        stop (int): Index of the snapshot to stop at (exclusive). Defaults
+            to None, i.e., parse to the end of the file.
+        step (int): Stride between parsed snapshots. Defaults to 1.
+
+    Yields:
+        LammpsDumpFrame(timestep, natoms, box, columns, data, dtypes) for
+        each selected snapshot, with data as a (natoms, len(columns)) array,
+        of floats unless a column is not numeric, and dtypes the dtypes of
+        the columns.
+
+    """
+    return _iter_dumps(filename, as_frames=True, columns=columns, start=start,
+                       stop=stop, step=step)
+
+
+def _read_lammps_dumps(filename, **kwargs):
+    return list(_iter_dumps(filename, **kwargs))
+
+
+def parse_lammps_dumps(file_pattern, columns=None, start=0, stop=None,
+                       step=1, ncpus=None, as_frames=False):
     """
     Generator that parses dump file(s).
 
@@ -112,9 +257,21 @@ def parse_lammps_dumps(file_pattern):
         file_pattern (str): Filename to parse. The timestep wildcard
             (e.g., dump.atom.'*') is supported and the files are parsed
             in the sequence of timestep.
+        columns ([str]): Names of the atom columns to keep. Defaults to
+            None, i.e., all columns.
+        start (int): Index of the first snapshot to parse in each file.
+        stop (int): Index of the snapshot to stop at in each file
+            (exclusive). Defaults to None.
+        step (int): Stride between parsed snapshots in each file.
+        ncpus (int): Number of processes used to parse the files of a
+            wildcard pattern concurrently. Defaults to None, i.e., the
+            files are parsed one after another in this process.
+        as_frames (bool): Whether to yield LammpsDumpFrame tuples, see
+            iter_lammps_dump, instead of LammpsDump objects. Defaults to
+            False.
 
     Yields:
-        LammpsDump for each available snapshot.
+        LammpsDump (or LammpsDumpFrame) for each available snapshot.
 
     """
     files = glob.glob(file_pattern)
@@ -124,17 +281,77 @@ def parse_lammps_dumps(file_pattern):
         files = sorted(files,
                        key=lambda f: int(re.match(pattern, f).group(1)))
 
-    for fname in files:
-        with zopen(fname, "rt") as f:
-            dump_cache = []
-            for line in f:
-                if line.startswith("ITEM: TIMESTEP"):
-                    if len(dump_cache) > 0:
-                        yield LammpsDump.from_string("".join(dump_cache))
-                    dump_cache = [line]
-                else:
-                    dump_cache.append(line)
-            yield LammpsDump.from_string("".join(dump_cache))
+    kwargs = {"as_frames": as_frames, "columns": columns, "start": start,
+              "stop": stop, "step": step}
+    if ncpus and ncpus > 1 and len(files) > 1:
+        with Pool(min(ncpus, len(files))) as pool:
+            for dumps in pool.imap(partial(_read_lammps_dumps, **kwargs), files):
+                yield from dumps
+    else:
+        for fname in files:
+            yield from _iter_dumps(fname, **kwargs)
+
+
+def parse_lammps_trajectory(file_pattern, species_map=None, time_step=1,
+                            constant_lattice=None, **kwargs):
+    """
+    Parses dump file(s) into a Trajectory. The snapshots are read directly
+    into arrays and sorted by atom id when available, so that sites keep
+    their order between snapshots.
+
+    Args:
+        file_pattern (str): Filename or wildcard pattern, see
+            parse_lammps_dumps.
+        species_map (dict): Mapping of atom types to species, e.g.,
+            {1: "Li", 2: "O"}. Not needed if the dump has an "element"
+            column.
+        time_step (float): Time between the snapshots in femtoseconds.
+            Defaults to 1.
+        constant_lattice (bool): Whether the box is constant. Defaults to
+            None, i.e., determined from the parsed snapshots.
+        **kwargs: Passed to parse_lammps_dumps (start, stop, step, ncpus).
+
+    Returns:
+        Trajectory
+
+    """
+    from pymatgen.core.trajectory import Trajectory
+
+    coord_sets = [("xs", "ys", "zs"), ("xsu", "ysu", "zsu"),
+                  ("x", "y", "z"), ("xu", "yu", "zu")]
+    frac_coords, lattices, species = [], [], None
+    for frame in parse_lammps_dumps(file_pattern, as_frames=True, **kwargs):
+        cols = frame.columns
+        coord_cols = next((c for c in coord_sets if set(c).issubset(cols)), None)
+        if coord_cols is None:
+            raise ValueError("No atomic coordinates in dump")
+        data = frame.data
+        if "id" in cols:
+            data = data[np.argsort(data[:, cols.index("id")].astype(float), kind="stable")]
+        coords = data[:, [cols.index(c) for c in coord_cols]].astype(float)
+        matrix = frame.box.to_lattice().matrix
+        if "s" not in coord_cols[0]:
+            origin = np.array(frame.box.bounds)[:, 0]
+            coords = np.linalg.solve(matrix.T, (coords - origin).T).T
+        if species is None:
+            if "element" in cols:
+                species = data[:, cols.index("element")].tolist()
+            elif "type" in cols and species_map:
+                species = [species_map[int(float(t))] for t in data[:, cols.index("type")]]
+            else:
+                raise ValueError("species_map is required for dumps without an element column")
+        frac_coords.append(coords)
+        lattices.append(matrix)
+
+    if not lattices:
+        raise ValueError("No snapshots in %s for start=%s, stop=%s, step=%s"
+                         % (file_pattern, kwargs.get("start", 0), kwargs.get("stop"),
+                            kwargs.get("step", 1)))
+    if constant_lattice is None:
+        constant_lattice = all(np.allclose(m, lattices[0]) for m in lattices)
+    lattice = lattices[0] if constant_lattice else lattices
+    return Trajectory(lattice, species, np.array(frac_coords), time_step=time_step,
+                      constant_lattice=constant_lattice)
 
 
 def parse_lammps_log(filename="log.lammps"):
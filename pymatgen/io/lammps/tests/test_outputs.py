@@ -7,9 +7,10 @@ import json
 
 import numpy as np
 import pandas as pd
+from monty.tempfile import ScratchDir
 
 from pymatgen.io.lammps.outputs import LammpsDump, parse_lammps_dumps, \
-    parse_lammps_log
+    parse_lammps_log, iter_lammps_dump, parse_lammps_trajectory
 
 test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..",
                         "test_files", "lammps")
@@ -75,6 +76,74 @@ class FuncTest(unittest.TestCase):
         timesteps_25 = [d.timestep for d in rdx_25]
         np.testing.assert_array_equal(timesteps_25, np.arange(0, 101, 25))
         self.assertTupleEqual(rdx_25[-1].data.shape, (21, 5))
+        rdx_25_parallel = list(parse_lammps_dumps(file_pattern=rdx_25_pattern,
+                                                  ncpus=2))
+        for d1, d2 in zip(rdx_25, rdx_25_parallel):
+            self.assertEqual(d1.timestep, d2.timestep)
+            pd.testing.assert_frame_equal(d1.data, d2.data)
+        with open(os.path.join(test_dir, "dump.rdx_wc.100")) as f:
+            rdx_100 = LammpsDump.from_string(f.read())
+        pd.testing.assert_frame_equal(rdx_25[-1].data, rdx_100.data)
+
+    def test_iter_lammps_dump(self):
+        frames = list(iter_lammps_dump(os.path.join(test_dir, "dump.rdx.gz"),
+                                       columns=["id", "zs"], start=1,
+                                       stop=8, step=3))
+        self.assertEqual([f.timestep for f in frames], [10, 40, 70])
+        self.assertEqual(frames[0].columns, ["id", "zs"])
+        self.assertTupleEqual(frames[0].data.shape, (21, 2))
+        self.assertRaises(ValueError, list,
+                          iter_lammps_dump(os.path.join(test_dir, "dump.tatb"),
+                                           columns=["xs"]))
+
+    def test_dtypes(self):
+        with open(os.path.join(test_dir, "dump.rdx_wc.100")) as f:
+            lines = f.read().splitlines()
+        # Add a custom integer column
+        lines[8] += " c_cn"
+        lines[9:] = ["%s %d" % (line, i % 4) for i, line in enumerate(lines[9:])]
+        expected = LammpsDump.from_string("\n".join(lines)).data
+        self.assertEqual(expected["c_cn"].dtype, np.int64)
+        with ScratchDir("."):
+            with open("dump.cn", "w") as f:
+                f.write("\n".join(lines) + "\n")
+            dump = list(parse_lammps_dumps("dump.cn"))[0]
+            pd.testing.assert_frame_equal(dump.data, expected)
+            frame = list(iter_lammps_dump("dump.cn", columns=["c_cn", "xs", "id"]))[0]
+            self.assertEqual(frame.data.dtype, float)
+            pd.testing.assert_frame_equal(LammpsDump.from_frame(frame).data,
+                                          expected[["c_cn", "xs", "id"]])
+
+    def test_parse_lammps_trajectory(self):
+        species_map = {1: "C", 2: "H", 3: "N", 4: "O"}
+        traj = parse_lammps_trajectory(os.path.join(test_dir, "dump.rdx.gz"),
+                                       species_map=species_map)
+        self.assertEqual(len(traj), 11)
+        self.assertTrue(traj.constant_lattice)
+        self.assertEqual(traj[0].composition.alphabetical_formula, "C3 H6 N6 O6")
+        dump = list(parse_lammps_dumps(os.path.join(test_dir, "dump.rdx.gz")))[-1]
+        data = dump.data.sort_values("id")
+        np.testing.assert_array_almost_equal(traj.frac_coords[-1],
+                                             data[["xs", "ys", "zs"]])
+
+        traj = parse_lammps_trajectory(os.path.join(test_dir, "dump.tatb"),
+                                       species_map=species_map)
+        with open(os.path.join(test_dir, "dump.tatb")) as f:
+            dump = LammpsDump.from_string(f.read())
+        data = dump.data.sort_values("id")
+        lattice = dump.box.to_lattice()
+        origin = np.array(dump.box.bounds)[:, 0]
+        np.testing.assert_array_almost_equal(
+            lattice.get_cartesian_coords(traj.frac_coords[0]) + origin,
+            data[["x", "y", "z"]])
+        self.assertRaises(ValueError, parse_lammps_trajectory,
+                          os.path.join(test_dir, "dump.tatb"))
+        self.assertRaises(ValueError, parse_lammps_trajectory,
+                          os.path.join(test_dir, "dump.missing.*"),
+                          species_map=species_map)
+        self.assertRaises(ValueError, parse_lammps_trajectory,
+                          os.path.join(test_dir, "dump.rdx.gz"),
+                          species_map=species_map, start=100)
 
     def test_parse_lammps_log(self):
         comb_file = "log.5Oct16.comb.Si.elastic.g++.1"
@@ -17,7 +17,7 @@ import warnings
 from pathlib import Path
 import xml.etree.cElementTree as ET
 from collections import defaultdict
-from io import StringIO
+from io import StringIO, BytesIO
 import collections
 from typing import Optional, Tuple, List
 
@@ -148,6 +148,92 @@ def _vasprun_float(f):
         raise e
 
 
+def _get_calculation_offsets(filename, chunk_size=2 ** 24):
+    """
+    Scans a vasprun.xml file once, reading it in chunks, and returns the byte
+    offsets (start, end) of every complete <calculation> block.
+    """
+    tags = (b"<calculation>", b"</calculation>")
+    offsets = []
+    start = None
+    with zopen(filename, "rb") as f:
+        buf = b""
+        buf_offset = 0
+        pos = 0
+        while True:
+            tag = tags[start is not None]
+            i = buf.find(tag, pos)
+            if i >= 0:
+                pos = i + len(tag)
+                if start is None:
+                    start = buf_offset + i
+                else:
+                    offsets.append((start, buf_offset + pos))
+                    start = None
+                continue
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # keep the end of the buffer in case a tag is split across chunks
+            keep = max(pos, len(buf) - len(tag) + 1)
+            buf_offset += keep
+            buf = buf[keep:] + chunk
+            pos = 0
+    return offsets
+
+
+class LazyIonicSteps(collections.abc.Sequence):
+    """
+    Read-only sequence of the ionic steps of a vasprun.xml file, used by
+    Vasprun when lazy_ionic_steps is True. Only the byte offsets of each
+    <calculation> block are kept in memory, and a step is read from the file
+    and parsed every time it is accessed. Supports len, indexing (including
+    negative indices), iteration and slicing, which returns another
+    LazyIonicSteps.
+    """
+
+    def __init__(self, filename, offsets, parse_calculation, cached_steps=None):
+        """
+        Args:
+            filename (str): Path to the vasprun.xml file.
+            offsets ([(int, int)]): Byte offsets of the start and end of the
+                <calculation> block of each step.
+            parse_calculation (callable): Function converting a calculation
+                Element into an ionic step dict.
+            cached_steps (dict): Already parsed steps, keyed by the start
+                offset of their block.
+        """
+        self.filename = filename
+        self.offsets = list(offsets)
+        self._parse_calculation = parse_calculation
+        self._cached_steps = cached_steps or {}
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.__class__(self.filename, self.offsets[i],
+                                  self._parse_calculation, self._cached_steps)
+        start, end = self.offsets[i]
+        if start in self._cached_steps:
+            return self._cached_steps[start]
+        with zopen(self.filename, "rb") as f:
+            return self._read_step(f, start, end)
+
+    def __iter__(self):
+        with zopen(self.filename, "rb") as f:
+            for start, end in self.offsets:
+                if start in self._cached_steps:
+                    yield self._cached_steps[start]
+                else:
+                    yield self._read_step(f, start, end)
+
+    def _read_step(self, f, start, end):
+        f.seek(start)
+        return self._parse_calculation(ET.fromstring(f.read(end - start)))
+
+
 class Vasprun(MSONable):
     """
     Vastly improved cElementTree-based parser for vasprun.xml files. Uses
@@ -163,6 +249,8 @@ class Vasprun(MSONable):
         {"structure": structure at end of run,
         "electronic_steps": {All electronic step data in vasprun file},
         "stresses": stress matrix}
+        If lazy_ionic_steps is True, this is a LazyIonicSteps sequence
+        instead, which parses the steps on access.
 
     .. attribute:: tdos
 
@@ -274,7 +362,7 @@ class Vasprun(MSONable):
                  ionic_step_offset=0, parse_dos=True,
                  parse_eigen=True, parse_projected_eigen=False,
                  parse_potcar_file=True, occu_tol=1e-8,
-                 exception_on_bad_xml=True):
+                 exception_on_bad_xml=True, lazy_ionic_steps=False):
         """
         Args:
             filename (str): Filename to parse
@@ -316,6 +404,16 @@ class Vasprun(MSONable):
                 proper vasprun.xml are parsed. You can set to False if you want
                 partial results (e.g., if you are monitoring a calculation during a
                 run), but use the results with care. A warning is issued.
+            lazy_ionic_steps (bool): Whether to parse the ionic steps lazily.
+                If True, the file is first scanned once to record the byte
+                offsets of each ionic step, and only the data outside the
+                ionic steps and the final step are parsed. ionic_steps is then
+                a LazyIonicSteps sequence that reads and parses steps on
+                access, so memory use does not grow with the length of the
+                run. This is meant for long MD runs; random access is fast
+                for uncompressed files only. ionic_step_skip and
+                ionic_step_offset are applied to the lazy sequence. Not
+                supported for chemical shielding (LCHIMAG) runs.
         """
         self.filename = filename
         self.ionic_step_skip = ionic_step_skip
@@ -324,7 +422,11 @@ class Vasprun(MSONable):
         self.exception_on_bad_xml = exception_on_bad_xml
 
         with zopen(filename, "rt") as f:
-            if ionic_step_skip or ionic_step_offset:
+            if lazy_ionic_steps:
+                self._parse_lazily(parse_dos=parse_dos,
+                                   parse_eigen=parse_eigen,
+                                   parse_projected_eigen=parse_projected_eigen)
+            elif ionic_step_skip or ionic_step_offset:
                 # remove parts of the xml file and parse the string
                 run = f.read()
                 steps = run.split("<calculation>")
@@ -359,6 +461,31 @@ class Vasprun(MSONable):
             msg += "Ionic convergence reached: %s." % self.converged_ionic
             warnings.warn(msg, UnconvergedVASPWarning)
 
+    def _parse_lazily(self, parse_dos, parse_eigen, parse_projected_eigen):
+        offsets = _get_calculation_offsets(self.filename)
+        self.nionic_steps = len(offsets)
+        # Parse everything but the ionic steps, which are replaced by the
+        # final step as it also holds the dos, eigenvalues, etc.
+        with zopen(self.filename, "rb") as f:
+            if offsets:
+                preamble = f.read(offsets[0][0])
+                f.seek(offsets[-1][0])
+                to_parse = preamble + f.read()
+            else:
+                to_parse = f.read()
+        self._parse(BytesIO(to_parse), parse_dos=parse_dos,
+                    parse_eigen=parse_eigen,
+                    parse_projected_eigen=parse_projected_eigen)
+        if self.parameters.get("LCHIMAG", False):
+            raise ValueError("Lazy parsing of ionic steps is not supported "
+                             "for chemical shielding calculations.")
+        cached_steps = {}
+        if offsets and self.ionic_steps:
+            cached_steps[offsets[-1][0]] = self.ionic_steps[-1]
+        offsets = offsets[self.ionic_step_offset::int(self.ionic_step_skip or 1)]
+        self.ionic_steps = LazyIonicSteps(self.filename, offsets,
+                                          self._parse_calculation, cached_steps)
+
     def _parse(self, stream, parse_dos, parse_eigen, parse_projected_eigen):
         self.efermi = None
         self.eigenvalues = None
@@ -1000,13 +1127,13 @@ class Vasprun(MSONable):
         nsites = len(self.final_structure)
 
         try:
-            vout = {"ionic_steps": self.ionic_steps,
+            vout = {"ionic_steps": list(self.ionic_steps),
                     "final_energy": self.final_energy,
                     "final_energy_per_atom": self.final_energy / nsites,
                     "crystal": self.final_structure.as_dict(),
                     "efermi": self.efermi}
         except (ArithmeticError, TypeError):
-            vout = {"ionic_steps": self.ionic_steps,
+            vout = {"ionic_steps": list(self.ionic_steps),
                     "final_energy": self.final_energy,
                     "final_energy_per_atom": None,
                     "crystal": self.final_structure.as_dict(),
@@ -1651,23 +1778,42 @@ class Outcar:
         self.final_energy = total_energy
         self.data = {}
 
-        # Read "total number of plane waves", NPLWV:
-        self.read_pattern(
-            {"nplwv": r"total plane-waves  NPLWV =\s+(\*{6}|\d+)"},
-            terminate_on_match=True
-        )
+        # Read the patterns of the regular parameters in a single pass.
+        patterns = {
+            # "total number of plane waves", NPLWV
+            "nplwv": {"pattern": r"total plane-waves  NPLWV =\s+(\*{6}|\d+)",
+                      "terminate_on_match": True},
+            # number of plane waves at each k-point
+            "nplwvs_at_kpoints": r"plane waves:\s+(\*{6,}|\d+)",
+            "drift": {"pattern": r"total drift:\s+([\.\-\d]+)\s+([\.\-\d]+)\s+([\.\-\d]+)",
+                      "postprocess": float},
+            "spin": 'ISPIN  =      2',
+            "noncollinear": 'LNONCOLLINEAR =      T',
+            "ibrion": {"pattern": r"IBRION =\s+([\-\d]+)",
+                       "terminate_on_match": True, "postprocess": int},
+            "epsilon": 'LEPSILON=     T',
+            "calcpol": 'LCALCPOL   =     T',
+            "electrostatic": r"average \(electrostatic\) potential at core",
+            "nmr_cs": r"LCHIMAG   =     (T)",
+            "nmr_efg": r"NMR quadrupolar parameters",
+            "has_onsite_density_matrices": {"pattern": r"onsite density matrix",
+                                            "terminate_on_match": True},
+        }
+        energy_contribs = ["PSCENC", "TEWEN", "DENC", "EXHF", "XCENC", "PAW double counting",
+                           "EENTRO", "EBANDS", "EATOM", "Ediel_sol"]
+        for k in energy_contribs:
+            if k == "PAW double counting":
+                patterns[k] = r"%s\s+=\s+([\.\-\d]+)\s+([\.\-\d]+)" % (k)
+            else:
+                patterns[k] = r"%s\s+=\s+([\d\-\.]+)" % (k)
+        self.read_patterns(patterns)
+
         try:
             self.data["nplwv"] = [[int(self.data["nplwv"][0][0])]]
         except ValueError:
             self.data["nplwv"] = [[None]]
 
-        nplwvs_at_kpoints = [
-            n for [n] in self.read_table_pattern(
-                r"\n{3}-{104}\n{3}",
-                r".+plane waves:\s+(\*{6,}|\d+)",
-                r"maximum and minimum number of plane-waves"
-            )
-        ]
+        nplwvs_at_kpoints = [n for [n] in self.data["nplwvs_at_kpoints"]]
         self.data["nplwvs_at_kpoints"] = [None for n in nplwvs_at_kpoints]
         for (n, nplwv) in enumerate(nplwvs_at_kpoints):
             try:
@@ -1676,36 +1822,26 @@ class Outcar:
                 pass
 
         # Read the drift:
-        self.read_pattern({
-            "drift": r"total drift:\s+([\.\-\d]+)\s+([\.\-\d]+)\s+([\.\-\d]+)"},
-            terminate_on_match=False,
-            postprocess=float)
         self.drift = self.data.get('drift', [])
 
         # Check if calculation is spin polarized
         self.spin = False
-        self.read_pattern({'spin': 'ISPIN  =      2'})
         if self.data.get('spin', []):
             self.spin = True
 
         # Check if calculation is noncollinear
         self.noncollinear = False
-        self.read_pattern({'noncollinear': 'LNONCOLLINEAR =      T'})
         if self.data.get('noncollinear', []):
             self.noncollinear = False
 
         # Check if the calculation type is DFPT
         self.dfpt = False
-        self.read_pattern({'ibrion': r"IBRION =\s+([\-\d]+)"},
-                          terminate_on_match=True,
-                          postprocess=int)
         if self.data.get("ibrion", [[0]])[0][0] > 6:
             self.dfpt = True
             self.read_internal_strain_tensor()
 
         # Check to see if LEPSILON is true and read piezo data if so
         self.lepsilon = False
-        self.read_pattern({'epsilon': 'LEPSILON=     T'})
         if self.data.get('epsilon', []):
             self.lepsilon = True
             self.read_lepsilon()
@@ -1715,20 +1851,16 @@ class Outcar:
 
         # Check to see if LCALCPOL is true and read polarization data if so
         self.lcalcpol = False
-        self.read_pattern({'calcpol': 'LCALCPOL   =     T'})
         if self.data.get('calcpol', []):
             self.lcalcpol = True
             self.read_lcalcpol()
             self.read_pseudo_zval()
 
         # Read electrostatic potential
-        self.read_pattern({
-            'electrostatic': r"average \(electrostatic\) potential at core"})
         if self.data.get('electrostatic', []):
             self.read_electrostatic_potential()
 
         self.nmr_cs = False
-        self.read_pattern({"nmr_cs": r"LCHIMAG   =     (T)"})
         if self.data.get("nmr_cs", None):
             self.nmr_cs = True
             self.read_chemical_shielding()
@@ -1737,27 +1869,22 @@ class Outcar:
             self.read_cs_raw_symmetrized_tensors()
 
         self.nmr_efg = False
-        self.read_pattern({"nmr_efg": r"NMR quadrupolar parameters"})
         if self.data.get("nmr_efg", None):
             self.nmr_efg = True
             self.read_nmr_efg()
             self.read_nmr_efg_tensor()
 
-        self.has_onsite_density_matrices = False
-        self.read_pattern({"has_onsite_density_matrices": r"onsite density matrix"},
-                          terminate_on_match=True)
-        if "has_onsite_density_matrices" in self.data:
-            self.has_onsite_density_matrices = True
+        # onsite_density_matrices is always set (and empty if there are no
+        # matrices), as callers rely on it
+        self.has_onsite_density_matrices = True
+        if self.data.get("has_onsite_density_matrices", []):
             self.read_onsite_density_matrices()
+        else:
+            self.data["onsite_density_matrices"] = []
 
         # Store the individual contributions to the final total energy
         final_energy_contribs = {}
-        for k in ["PSCENC", "TEWEN", "DENC", "EXHF", "XCENC", "PAW double counting",
-                  "EENTRO", "EBANDS", "EATOM", "Ediel_sol"]:
-            if k == "PAW double counting":
-                self.read_pattern({k: r"%s\s+=\s+([\.\-\d]+)\s+([\.\-\d]+)" % (k)})
-            else:
-                self.read_pattern({k: r"%s\s+=\s+([\d\-\.]+)" % (k)})
+        for k in energy_contribs:
             if not self.data[k]:
                 continue
             final_energy_contribs[k] = sum([float(f) for f in self.data[k][-1]])
@@ -1793,6 +1920,63 @@ class Outcar:
         for k in patterns.keys():
             self.data[k] = [i[0] for i in matches.get(k, [])]
 
+    def read_patterns(self, patterns, reverse=False, terminate_on_match=False,
+                      postprocess=str):
+        r"""
+        Reads several patterns in a single pass through the file. Unlike
+        read_pattern, terminate_on_match and postprocess can be set for each
+        pattern, so the patterns of many properties can be read together
+        instead of rescanning the file for each of them. Lines that match
+        none of the patterns are rejected with a single combined regex.
+
+        Args:
+            patterns (dict): A dict of patterns, e.g.,
+                {"energy": r"energy\\(sigma->0\\)\\s+=\\s+([\\d\\-.]+)"}.
+                A value can also be a dict with a "pattern" key, and
+                "terminate_on_match" and "postprocess" keys overriding the
+                defaults for this pattern.
+            reverse (bool): Read files in reverse. Defaults to false. Useful
+                for properties for which only the final values are needed.
+            terminate_on_match (bool): Default for whether to stop matching a
+                pattern after its first matching line. The pass ends once
+                there are no patterns left to match.
+            postprocess (callable): Default post processing function to
+                convert all matches. Defaults to str, i.e., no change.
+
+        Renders accessible:
+            Any attribute in patterns, as for read_pattern.
+        """
+        compiled = {}
+        options = {}
+        for k, v in patterns.items():
+            if not isinstance(v, dict):
+                v = {"pattern": v}
+            compiled[k] = re.compile(v["pattern"])
+            options[k] = (v.get("terminate_on_match", terminate_on_match),
+                          v.get("postprocess", postprocess))
+        try:
+            any_patt = re.compile("|".join("(?:%s)" % p.pattern for p in compiled.values()))
+        except re.error:
+            any_patt = None
+
+        matches = {k: [] for k in compiled}
+        active = dict(compiled)
+        gen = reverse_readfile(self.filename) if reverse else zopen(self.filename, "rt")
+        for line in gen:
+            if any_patt is not None and not any_patt.search(line):
+                continue
+            for k, p in list(active.items()):
+                m = p.search(line)
+                if m:
+                    matches[k].append([options[k][1](g) for g in m.groups()])
+                    if options[k][0]:
+                        del active[k]
+            if not active:
+                break
+        gen.close()
+        for k, v in matches.items():
+            self.data[k] = v
+
     def read_table_pattern(self, header_pattern, row_pattern, footer_pattern,
                            postprocess=str, attribute_name=None,
                            last_one_only=True):
@@ -3020,77 +3204,64 @@ class VolumetricData(MSONable):
         return VolumetricData(self.structure, data, self._distance_matrix)
 
     @staticmethod
-    def parse_file(filename):
+    def parse_file(filename, read_data_aug=True, read_spin=True):
         """
         Convenience method to parse a generic volumetric data file in the vasp
         like format. Used by subclasses for parsing file.
 
+        Each block of volumetric data is located using the number of values
+        per line, and converted to an array in bulk.
+
         Args:
             filename (str): Path of file to parse
+            read_data_aug (bool): Whether to read the lines that are not
+                volumetric data (typically augmentation charges). Defaults to
+                True.
+            read_spin (bool): Whether to read the data blocks after the first
+                one, i.e., the magnetization density of spin-polarized and
+                noncollinear calculations. Defaults to True.
 
         Returns:
-            (poscar, data)
+            (poscar, data, data_aug)
         """
         # pylint: disable=E1136,E1126
-        poscar_read = False
         poscar_string = []
-        dataset = []
         all_dataset = []
         # for holding any strings in input that are not Poscar
         # or VolumetricData (typically augmentation charges)
         all_dataset_aug = {}
-        dim = None
-        dimline = None
-        read_dataset = False
-        ngrid_pts = 0
-        data_count = 0
-        poscar = None
         with zopen(filename, "rt") as f:
             for line in f:
-                original_line = line
                 line = line.strip()
-                if read_dataset:
-                    for tok in line.split():
-                        if data_count < ngrid_pts:
-                            # This complicated procedure is necessary because
-                            # vasp outputs x as the fastest index, followed by y
-                            # then z.
-                            no_x = data_count // dim[0]
-                            dataset[
-                                data_count % dim[0],
-                                no_x % dim[1],
-                                no_x // dim[1]
-                            ] = float(tok)
-                            data_count += 1
-                    if data_count >= ngrid_pts:
-                        read_dataset = False
-                        data_count = 0
-                        all_dataset.append(dataset)
-                elif not poscar_read:
-                    if line != "" or len(poscar_string) == 0:
-                        poscar_string.append(line)
-                    elif line == "":
-                        poscar = Poscar.from_string("\n".join(poscar_string))
-                        poscar_read = True
-                elif not dim:
-                    dim = [int(i) for i in line.split()]
-                    ngrid_pts = dim[0] * dim[1] * dim[2]
-                    dimline = line
-                    read_dataset = True
-                    dataset = np.zeros(dim)
-                elif line == dimline:
-                    # when line == dimline, expect volumetric data to follow
-                    # so set read_dataset to True
-                    read_dataset = True
-                    dataset = np.zeros(dim)
+                if line != "" or len(poscar_string) == 0:
+                    poscar_string.append(line)
                 else:
-                    # store any extra lines that were not part of the
-                    # volumetric data so we know which set of data the extra
-                    # lines are associated with
-                    key = len(all_dataset) - 1
-                    if key not in all_dataset_aug:
-                        all_dataset_aug[key] = []
-                    all_dataset_aug[key].append(original_line)
+                    break
+            poscar = Poscar.from_string("\n".join(poscar_string))
+
+            dimline = f.readline().strip()
+            while dimline == "":
+                dimline = f.readline().strip()
+            dim = [int(i) for i in dimline.split()]
+            while True:
+                all_dataset.append(VolumetricData._read_dataset(f, dim))
+                # store any extra lines that were not part of the
+                # volumetric data so we know which set of data the extra
+                # lines are associated with. When line == dimline, expect
+                # volumetric data to follow.
+                aug = []
+                next_dataset = False
+                if read_data_aug or read_spin:
+                    for line in f:
+                        if line.strip() == dimline:
+                            next_dataset = True
+                            break
+                        if read_data_aug:
+                            aug.append(line)
+                if aug:
+                    all_dataset_aug[len(all_dataset) - 1] = aug
+                if not (next_dataset and read_spin):
+                    break
             if len(all_dataset) == 4:
 
                 data = {"total": all_dataset[0], "diff_x": all_dataset[1],
@@ -3124,6 +3295,42 @@ class VolumetricData(MSONable):
                 data_aug = {"total": all_dataset_aug.get(0, None)}
             return poscar, data, data_aug
 
+    @staticmethod
+    def _read_dataset(f, dim, chunk_size=100000):
+        """
+        Reads a block of volumetric data from an open file.
+
+        Args:
+            f: File object positioned at the start of the data.
+            dim: Dimensions of the grid.
+            chunk_size (int): Maximum number of lines converted at once.
+
+        Returns:
+            Data as an array of shape dim.
+        """
+        ngrid_pts = dim[0] * dim[1] * dim[2]
+        dataset = np.empty(ngrid_pts)
+        line = f.readline()
+        values = np.array(line.split(), dtype=float)
+        count = min(len(values), ngrid_pts)
+        dataset[:count] = values[:count]
+        per_line = len(values)
+        while count < ngrid_pts:
+            nlines = min(-(-(ngrid_pts - count) // per_line), chunk_size)
+            lines = list(itertools.islice(f, nlines))
+            if not lines:
+                raise ValueError("Unexpected end of file while reading "
+                                 "volumetric data.")
+            values = np.fromstring("".join(lines), sep=" ")
+            if count + len(values) > ngrid_pts or \
+                    (count + len(values) < ngrid_pts and len(values) < nlines * per_line):
+                raise ValueError("Inconsistent number of values per line "
+                                 "in volumetric data.")
+            dataset[count:count + len(values)] = values
+            count += len(values)
+        # vasp outputs x as the fastest index, followed by y then z.
+        return dataset.reshape(dim, order="F")
+
     def write_file(self, file_name, vasp4_compatible=False):
         """
         Write the VolumetricData object to a vasp compatible file.
@@ -3319,6 +3526,7 @@ class VolumetricData(MSONable):
         to this file format is as follows:
 
         VolumetricData.data -> f["vdata"]
+        VolumetricData.data_aug -> f["vdata_aug"]
         VolumetricData.structure ->
             f["Z"]: Sequence of atomic numbers
             f["fcoords"]: Fractional coords
@@ -3326,46 +3534,134 @@ class VolumetricData(MSONable):
                 format
             f.attrs["structure_json"]: String of json representation
 
+        The volumetric data are stored contiguously and uncompressed, so that
+        they can be memory-mapped by from_hdf5.
+
         Args:
             filename (str): Filename to output to.
         """
+        VolumetricData._write_hdf5(filename, self.structure, self.data,
+                                   self.data_aug, self.name)
+
+    @staticmethod
+    def _write_hdf5(filename, structure, data, data_aug, name):
         import h5py
         with h5py.File(filename, "w") as f:
             ds = f.create_dataset("lattice", (3, 3), dtype='float')
-            ds[...] = self.structure.lattice.matrix
-            ds = f.create_dataset("Z", (len(self.structure.species),),
+            ds[...] = structure.lattice.matrix
+            ds = f.create_dataset("Z", (len(structure.species),),
                                   dtype="i")
-            ds[...] = np.array([sp.Z for sp in self.structure.species])
-            ds = f.create_dataset("fcoords", self.structure.frac_coords.shape,
+            ds[...] = np.array([sp.Z for sp in structure.species])
+            ds = f.create_dataset("fcoords", structure.frac_coords.shape,
                                   dtype='float')
-            ds[...] = self.structure.frac_coords
+            ds[...] = structure.frac_coords
             dt = h5py.special_dtype(vlen=str)
-            ds = f.create_dataset("species", (len(self.structure.species),),
+            ds = f.create_dataset("species", (len(structure.species),),
                                   dtype=dt)
-            ds[...] = [str(sp) for sp in self.structure.species]
+            ds[...] = [str(sp) for sp in structure.species]
             grp = f.create_group("vdata")
-            for k, v in self.data.items():
-                ds = grp.create_dataset(k, self.data[k].shape, dtype='float')
-                ds[...] = self.data[k]
-            f.attrs["name"] = self.name
-            f.attrs["structure_json"] = json.dumps(self.structure.as_dict())
+            for k, v in data.items():
+                ds = grp.create_dataset(k, v.shape, dtype='float')
+                ds[...] = v
+            grp = f.create_group("vdata_aug")
+            for k, v in (data_aug or {}).items():
+                if v:
+                    ds = grp.create_dataset(k, (len(v),), dtype=dt)
+                    ds[...] = v
+            f.attrs["name"] = name
+            f.attrs["structure_json"] = json.dumps(structure.as_dict())
+
+    @staticmethod
+    def _read_hdf5(filename, mmap=False):
+        """
+        Reads the structure, data, augmentation data and name from a HDF5
+        file written by to_hdf5. If mmap is True, the volumetric data are
+        read-only memory maps of the file.
+        """
+        import h5py
+        with h5py.File(filename, "r") as f:
+            data = {}
+            for k, v in f["vdata"].items():
+                offset = v.id.get_offset()
+                if mmap and offset is not None:
+                    data[k] = np.memmap(filename, mode="r", dtype=v.dtype,
+                                        shape=v.shape, offset=offset)
+                else:
+                    data[k] = np.array(v)
+            data_aug = None
+            if 'vdata_aug' in f and len(f["vdata_aug"]):
+                data_aug = {k: [line.decode() if isinstance(line, bytes) else line
+                                for line in v[...]]
+                            for k, v in f["vdata_aug"].items()}
+            structure = Structure.from_dict(json.loads(f.attrs["structure_json"]))
+            name = f.attrs.get("name")
+        return structure, data, data_aug, name
 
     @classmethod
-    def from_hdf5(cls, filename, **kwargs):
+    def from_hdf5(cls, filename, mmap=False, **kwargs):
         """
         Reads VolumetricData from HDF5 file.
 
         :param filename: Filename
+        :param mmap: Whether to memory-map the volumetric data instead of
+            reading them into memory. Slicing the data then only reads the
+            part of the file needed, but the arrays are read-only.
         :return: VolumetricData
         """
-        import h5py
-        with h5py.File(filename, "r") as f:
-            data = {k: np.array(v) for k, v in f["vdata"].items()}
-            data_aug = None
-            if 'vdata_aug' in f:
-                data_aug = {k: np.array(v) for k, v in f["vdata_aug"].items()}
-            structure = Structure.from_dict(json.loads(f.attrs["structure_json"]))
-            return cls(structure, data=data, data_aug=data_aug, **kwargs)
+        structure, data, data_aug, name = VolumetricData._read_hdf5(filename, mmap=mmap)
+        if data_aug is not None:
+            kwargs["data_aug"] = data_aug
+        obj = cls(structure, data=data, **kwargs)
+        if name is not None:
+            obj.name = name
+        return obj
+
+    @staticmethod
+    def parse_file_with_cache(filename, read_data_aug=True, read_spin=True,
+                              mmap=False):
+        """
+        Parses a volumetric data file like parse_file, keeping a HDF5 copy of
+        the parsed data as a cache next to it (filename + ".h5"). If the cache
+        is more recent than the file, the data are read from it instead, so
+        repeated loads of the same file are much faster.
+
+        Args:
+            filename (str): Path of file to parse
+            read_data_aug (bool): Whether to return the augmentation data.
+            read_spin (bool): Whether to return the data blocks after the
+                first one, i.e., the magnetization density.
+            mmap (bool): Whether to memory-map the volumetric data of the
+                cache instead of reading them into memory.
+
+        Returns:
+            (poscar, data, data_aug)
+        """
+        cache_filename = "{}.h5".format(filename)
+        poscar = None
+        if os.path.exists(cache_filename) and \
+                os.path.getmtime(cache_filename) >= os.path.getmtime(filename):
+            try:
+                structure, data, data_aug, name = VolumetricData._read_hdf5(cache_filename, mmap=mmap)
+                poscar = Poscar(structure, comment=name)
+            except (ImportError, OSError) as ex:
+                warnings.warn("Unable to read cache {}: {}".format(cache_filename, ex))
+        if poscar is None:
+            poscar, data, data_aug = VolumetricData.parse_file(filename)
+            try:
+                VolumetricData._write_hdf5(cache_filename, poscar.structure, data,
+                                           data_aug, poscar.comment)
+            except (ImportError, OSError) as ex:
+                warnings.warn("Unable to write cache {}: {}".format(cache_filename, ex))
+            else:
+                if mmap:
+                    data = VolumetricData._read_hdf5(cache_filename, mmap=True)[1]
+        if not read_spin:
+            data = {"total": data["total"]}
+        keys = ["diff_x", "diff_y", "diff_z"] if "diff_x" in data else \
+            [k for k in data if k != "total"]
+        data_aug = {k: (data_aug or {}).get(k) if read_data_aug else None
+                    for k in ["total"] + keys}
+        return poscar, data, data_aug
 
 
 class Locpot(VolumetricData):
@@ -3376,21 +3672,33 @@ class Locpot(VolumetricData):
     def __init__(self, poscar, data):
         """
         Args:
-            poscar (Poscar): Poscar object containing structure.
+            poscar (Poscar or Structure): Object containing structure.
             data: Actual data.
         """
-        super().__init__(poscar.structure, data)
-        self.name = poscar.comment
+        if isinstance(poscar, Poscar):
+            super().__init__(poscar.structure, data)
+            self.name = poscar.comment
+        else:
+            super().__init__(poscar, data)
 
     @classmethod
-    def from_file(cls, filename, **kwargs):
+    def from_file(cls, filename, read_spin=True, cache=False, mmap=False, **kwargs):
         """
         Reads a LOCPOT file.
 
         :param filename: Filename
+        :param read_spin: Whether to read the spin-polarized data blocks.
+        :param cache: Whether to use a HDF5 cache of the parsed file. See
+            VolumetricData.parse_file_with_cache.
+        :param mmap: Whether to memory-map the data of the cache.
         :return: Locpot
         """
-        (poscar, data, data_aug) = VolumetricData.parse_file(filename)
+        if cache:
+            (poscar, data, data_aug) = VolumetricData.parse_file_with_cache(
+                filename, read_data_aug=False, read_spin=read_spin, mmap=mmap)
+        else:
+            (poscar, data, data_aug) = VolumetricData.parse_file(
+                filename, read_data_aug=False, read_spin=read_spin)
         return cls(poscar, data, **kwargs)
 
 
@@ -3420,14 +3728,25 @@ class Chgcar(VolumetricData):
         self._distance_matrix = {}
 
     @staticmethod
-    def from_file(filename):
+    def from_file(filename, read_data_aug=True, read_spin=True, cache=False,
+                  mmap=False):
         """
         Reads a CHGCAR file.
 
         :param filename: Filename
+        :param read_data_aug: Whether to read the augmentation charges.
+        :param read_spin: Whether to read the magnetization density.
+        :param cache: Whether to use a HDF5 cache of the parsed file. See
+            VolumetricData.parse_file_with_cache.
+        :param mmap: Whether to memory-map the data of the cache.
         :return: Chgcar
         """
-        (poscar, data, data_aug) = VolumetricData.parse_file(filename)
+        if cache:
+            (poscar, data, data_aug) = VolumetricData.parse_file_with_cache(
+                filename, read_data_aug=read_data_aug, read_spin=read_spin, mmap=mmap)
+        else:
+            (poscar, data, data_aug) = VolumetricData.parse_file(
+                filename, read_data_aug=read_data_aug, read_spin=read_spin)
         return Chgcar(poscar, data, data_aug=data_aug)
 
     @property
@@ -3472,14 +3791,23 @@ class Elfcar(VolumetricData):
         self.data = data
 
     @classmethod
-    def from_file(cls, filename):
+    def from_file(cls, filename, read_spin=True, cache=False, mmap=False):
         """
         Reads a ELFCAR file.
 
         :param filename: Filename
+        :param read_spin: Whether to read the spin down ELF.
+        :param cache: Whether to use a HDF5 cache of the parsed file. See
+            VolumetricData.parse_file_with_cache.
+        :param mmap: Whether to memory-map the data of the cache.
         :return: Elfcar
         """
-        (poscar, data, data_aug) = VolumetricData.parse_file(filename)
+        if cache:
+            (poscar, data, data_aug) = VolumetricData.parse_file_with_cache(
+                filename, read_data_aug=False, read_spin=read_spin, mmap=mmap)
+        else:
+            (poscar, data, data_aug) = VolumetricData.parse_file(
+                filename, read_data_aug=False, read_spin=read_spin)
         return cls(poscar, data)
 
     def get_alpha(self):
@@ -3857,6 +4185,9 @@ def get_band_structure_from_vasp_multiple_branches(dir_name, efermi=None,
     return None
 
 
+XdatcarFrame = collections.namedtuple("XdatcarFrame", ["ionic_step", "species", "lattice", "frac_coords"])
+
+
 class Xdatcar:
     """
     Class representing an XDATCAR file. Only tested with VASP 5.x files.
@@ -3880,59 +4211,85 @@ class Xdatcar:
             ionicstep_start (int): Starting number of ionic step.
             ionicstep_end (int): Ending number of ionic step.
         """
-        preamble = None
-        coords_str = []
-        structures = []
-        preamble_done = False
+        structures = list(self.iter_frames(filename, ionicstep_start=ionicstep_start,
+                                           ionicstep_end=ionicstep_end, as_structures=True))
+        self.structures = structures
+        self.comment = comment or self.structures[0].formula
+
+    @staticmethod
+    def iter_frames(filename, ionicstep_start=1, ionicstep_end=None,
+                    ionicstep_skip=1, as_structures=False):
+        """
+        Iterate over the frames of an XDATCAR file without holding the file or
+        a list of structures in memory. Coordinates of frames that are not
+        selected are skipped without being parsed. Both constant-lattice files
+        and variable-lattice files, in which the header is repeated before every
+        configuration, are supported.
+
+        Args:
+            filename (str): Filename of input XDATCAR file.
+            ionicstep_start (int): Starting number of ionic step.
+            ionicstep_end (int): Ending number of ionic step (exclusive).
+            ionicstep_skip (int): Only every ionicstep_skip-th ionic step,
+                counted from ionicstep_start, is yielded.
+            as_structures (bool): Whether to yield Structure objects rather
+                than XdatcarFrame tuples of raw arrays.
+
+        Yields:
+            XdatcarFrame(ionic_step, species, lattice, frac_coords) of each
+            selected frame, or the corresponding Structure if as_structures is
+            True. The lattice array of a constant-lattice file is shared by all
+            frames.
+
+        Returns:
+            The number of ionic steps read, as the return value of the generator.
+        """
         if ionicstep_start < 1:
             raise Exception('Start ionic step cannot be less than 1')
-        if ionicstep_end is not None and ionicstep_start < 1:
+        if ionicstep_end is not None and ionicstep_end < 1:
             raise Exception('End ionic step cannot be less than 1')
+        if ionicstep_skip < 1:
+            raise Exception('Ionic step skip cannot be less than 1')
 
-        # pylint: disable=E1136
-        ionicstep_cnt = 1
+        header = []
+        species = None
+        lattice = None
+        ionicstep_cnt = 0
         with zopen(filename, "rt") as f:
             for l in f:
                 l = l.strip()
-                if preamble is None:
-                    preamble = [l]
-                elif not preamble_done:
-                    if l == "" or "Direct configuration=" in l:
-                        preamble_done = True
-                        tmp_preamble = [preamble[0]]
-                        for i in range(1, len(preamble)):
-                            if preamble[0] != preamble[i]:
-                                tmp_preamble.append(preamble[i])
-                            else:
-                                break
-                        preamble = tmp_preamble
-                    else:
-                        preamble.append(l)
-                elif l == "" or "Direct configuration=" in l:
-                    p = Poscar.from_string("\n".join(preamble +
-                                                     ["Direct"] + coords_str))
-                    if ionicstep_end is None:
-                        if ionicstep_cnt >= ionicstep_start:
-                            structures.append(p.structure)
+                if l and "Direct configuration=" not in l:
+                    header.append(l)
+                    continue
+                if len(header) >= 5:
+                    # A new header gives the lattice of the following frames
+                    if species is None:
+                        natoms = sum(int(i) for i in header[-1].split())
+                        p = Poscar.from_string("\n".join(header + ["Direct"] + ["0 0 0"] * natoms))
+                        species = p.structure.species
+                    scale = float(header[1].split()[0])
+                    lattice = np.array([[float(i) for i in v.split()[:3]] for v in header[2:5]])
+                    if scale < 0:
+                        lattice *= (-scale / abs(np.linalg.det(lattice))) ** (1 / 3)
                     else:
-                        if ionicstep_start <= ionicstep_cnt < ionicstep_end:
-                            structures.append(p.structure)
-                        if ionicstep_cnt >= ionicstep_end:
-                            break
-                    ionicstep_cnt += 1
-                    coords_str = []
+                        lattice *= scale
+                header = []
+                if species is None:
+                    continue
+                if ionicstep_end is not None and ionicstep_cnt + 1 >= ionicstep_end:
+                    break
+                coords = list(itertools.islice(f, len(species)))
+                if len(coords) < len(species):
+                    break
+                ionicstep_cnt += 1
+                if ionicstep_cnt < ionicstep_start or (ionicstep_cnt - ionicstep_start) % ionicstep_skip:
+                    continue
+                frac_coords = np.array([c.split()[:3] for c in coords], dtype=float)
+                if as_structures:
+                    yield Structure(lattice, species, frac_coords)
                 else:
-                    coords_str.append(l)
-            p = Poscar.from_string("\n".join(preamble +
-                                             ["Direct"] + coords_str))
-            if ionicstep_end is None:
-                if ionicstep_cnt >= ionicstep_start:
-                    structures.append(p.structure)
-            else:
-                if ionicstep_start <= ionicstep_cnt < ionicstep_end:
-                    structures.append(p.structure)
-        self.structures = structures
-        self.comment = comment or self.structures[0].formula
+                    yield XdatcarFrame(ionicstep_cnt, species, lattice, frac_coords)
+        return ionicstep_cnt
 
     @property
     def site_symbols(self):
@@ -3965,56 +4322,9 @@ class Xdatcar:
            Requires a check to ensure if the new concatenating file has the
            same lattice structure and atoms as the Xdatcar class.
         """
-        preamble = None
-        coords_str = []
         structures = self.structures
-        preamble_done = False
-        if ionicstep_start < 1:
-            raise Exception('Start ionic step cannot be less than 1')
-        if (ionicstep_end is not None and
-                ionicstep_start < 1):
-            raise Exception('End ionic step cannot be less than 1')
-
-        # pylint: disable=E1136
-        ionicstep_cnt = 1
-        with zopen(filename, "rt") as f:
-            for l in f:
-                l = l.strip()
-                if preamble is None:
-                    preamble = [l]
-                elif not preamble_done:
-                    if l == "" or "Direct configuration=" in l:
-                        preamble_done = True
-                        tmp_preamble = [preamble[0]]
-                        for i in range(1, len(preamble)):
-                            if preamble[0] != preamble[i]:
-                                tmp_preamble.append(preamble[i])
-                            else:
-                                break
-                        preamble = tmp_preamble
-                    else:
-                        preamble.append(l)
-                elif l == "" or "Direct configuration=" in l:
-                    p = Poscar.from_string("\n".join(preamble +
-                                                     ["Direct"] + coords_str))
-                    if ionicstep_end is None:
-                        if ionicstep_cnt >= ionicstep_start:
-                            structures.append(p.structure)
-                    else:
-                        if ionicstep_start <= ionicstep_cnt < ionicstep_end:
-                            structures.append(p.structure)
-                    ionicstep_cnt += 1
-                    coords_str = []
-                else:
-                    coords_str.append(l)
-            p = Poscar.from_string("\n".join(preamble +
-                                             ["Direct"] + coords_str))
-            if ionicstep_end is None:
-                if ionicstep_cnt >= ionicstep_start:
-                    structures.append(p.structure)
-            else:
-                if ionicstep_start <= ionicstep_cnt < ionicstep_end:
-                    structures.append(p.structure)
+        structures.extend(self.iter_frames(filename, ionicstep_start=ionicstep_start,
+                                           ionicstep_end=ionicstep_end, as_structures=True))
         self.structures = structures
 
     def get_string(self, ionicstep_start=1,
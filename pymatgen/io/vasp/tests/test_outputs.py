@@ -4,6 +4,8 @@
 
 
 import unittest
+import sys
+from unittest.mock import patch
 import os
 from pathlib import Path
 import json
@@ -28,6 +30,11 @@ from pymatgen.electronic_structure.core import Magmom
 from pymatgen.util.testing import PymatgenTest
 from pymatgen.core import Element
 
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
 
 class VasprunTest(PymatgenTest):
     _multiprocess_shared_ = True
@@ -355,6 +362,32 @@ class VasprunTest(PymatgenTest):
         self.assertTrue(
             np.allclose(vasprun_fc.normalmode_eigenvecs[33], nm_ans))
 
+    def test_lazy_ionic_steps(self):
+        filepath = self.TEST_FILES_DIR / 'vasprun.xml.unconverged'
+        vasprun = Vasprun(filepath, parse_potcar_file=False)
+        vasprun_lazy = Vasprun(filepath, parse_potcar_file=False,
+                               lazy_ionic_steps=True)
+        self.assertEqual(vasprun_lazy.nionic_steps, vasprun.nionic_steps)
+        self.assertEqual(len(vasprun_lazy.ionic_steps), 5)
+        self.assertAlmostEqual(vasprun_lazy.final_energy, vasprun.final_energy)
+        self.assertEqual(vasprun_lazy.final_structure, vasprun.final_structure)
+        self.assertEqual(vasprun_lazy.converged, vasprun.converged)
+        for step, lazy_step in zip(vasprun.ionic_steps, vasprun_lazy.ionic_steps):
+            self.assertEqual(step["structure"], lazy_step["structure"])
+            self.assertEqual(step["electronic_steps"], lazy_step["electronic_steps"])
+            self.assertArrayAlmostEqual(step["forces"], lazy_step["forces"])
+        self.assertEqual(vasprun_lazy.ionic_steps[-2]["structure"],
+                         vasprun.ionic_steps[-2]["structure"])
+        sliced = vasprun_lazy.ionic_steps[1::2]
+        self.assertEqual(len(sliced), 2)
+        self.assertEqual(sliced[1]["structure"], vasprun.structures[3])
+        self.assertEqual(vasprun_lazy.structures, vasprun.structures)
+
+        vasprun_skip = Vasprun(filepath, 2, 1, parse_potcar_file=False,
+                               lazy_ionic_steps=True)
+        self.assertEqual(vasprun_skip.nionic_steps, 5)
+        self.assertEqual(vasprun_skip.structures, vasprun.structures[1::2])
+
     def test_Xe(self):
         vr = Vasprun(self.TEST_FILES_DIR / 'vasprun.xml.xe',
                      parse_potcar_file=False)
@@ -975,6 +1008,23 @@ class OutcarTest(PymatgenTest):
         self.assertEqual(len(outcar.drift), 79)
         self.assertAlmostEqual(np.sum(outcar.drift), 0.448010)
 
+    def test_read_patterns(self):
+        outcar = Outcar(self.TEST_FILES_DIR / "OUTCAR.CL")
+        patterns = {"drift": r"total drift:\s+([\.\-\d]+)\s+([\.\-\d]+)\s+([\.\-\d]+)",
+                    "ibrion": r"IBRION =\s+([\-\d]+)",
+                    "toten": r"free  energy   TOTEN\s+=\s+([\d\-\.]+)"}
+        for k, v in patterns.items():
+            outcar.read_pattern({k: v}, postprocess=float)
+        expected = {k: outcar.data[k] for k in patterns}
+        outcar.read_patterns(patterns, postprocess=float)
+        self.assertEqual({k: outcar.data[k] for k in patterns}, expected)
+
+        outcar.read_patterns({"ibrion": {"pattern": patterns["ibrion"], "postprocess": int},
+                              "toten": patterns["toten"]},
+                             reverse=True, terminate_on_match=True, postprocess=float)
+        self.assertEqual(outcar.data["ibrion"], [[int(expected["ibrion"][0][0])]])
+        self.assertEqual(outcar.data["toten"], expected["toten"][-1:])
+
     def test_electrostatic_potential(self):
 
         outcar = Outcar(self.TEST_FILES_DIR / "OUTCAR")
@@ -1018,6 +1068,9 @@ class OutcarTest(PymatgenTest):
         self.assertTrue("onsite_density_matrices" in outcar.as_dict())
         outcar = Outcar(self.TEST_FILES_DIR / "OUTCAR_merged_numbers2")
         self.assertTrue("onsite_density_matrices" in outcar.as_dict())
+        outcar = Outcar(self.TEST_FILES_DIR / "OUTCAR.Al")
+        self.assertEqual(outcar.data["onsite_density_matrices"], [])
+        self.assertEqual(outcar.as_dict()["onsite_density_matrices"], [])
 
     def test_nplwvs(self):
         outcar = Outcar(self.TEST_FILES_DIR / "OUTCAR")
@@ -1081,6 +1134,35 @@ class LocpotTest(PymatgenTest):
         self.assertAlmostEqual(locpot.get_axis_grid(1)[-1], 2.87629, 2)
         self.assertAlmostEqual(locpot.get_axis_grid(2)[-1], 2.87629, 2)
 
+    @unittest.skipIf(h5py is None, "h5py is needed to write the cache.")
+    def test_cache(self):
+        with ScratchDir("."):
+            copyfile(self.TEST_FILES_DIR / "LOCPOT", "LOCPOT")
+            locpot = Locpot.from_file("LOCPOT", cache=True)
+            self.assertTrue(os.path.exists("LOCPOT.h5"))
+            for mmap in [False, True]:
+                cached = Locpot.from_file("LOCPOT", cache=True, mmap=mmap)
+                self.assertEqual(cached.name, locpot.name)
+                self.assertEqual(cached.structure, locpot.structure)
+                self.assertArrayEqual(cached.data["total"], locpot.data["total"])
+            self.assertIsInstance(cached.data["total"], np.memmap)
+            locpot2 = Locpot.from_hdf5("LOCPOT.h5", mmap=True)
+            self.assertArrayAlmostEqual(locpot2.get_average_along_axis(2),
+                                        locpot.get_average_along_axis(2))
+
+    def test_cache_without_h5py(self):
+        with ScratchDir("."):
+            copyfile(self.TEST_FILES_DIR / "LOCPOT", "LOCPOT")
+            # Setting the module to None makes importing it fail.
+            with patch.dict(sys.modules, {"h5py": None}):
+                with warnings.catch_warnings(record=True) as w:
+                    warnings.simplefilter("always")
+                    locpot = Locpot.from_file("LOCPOT", cache=True)
+                    self.assertTrue(any("Unable to write cache" in str(x.message) for x in w))
+            self.assertFalse(os.path.exists("LOCPOT.h5"))
+            self.assertAlmostEqual(-217.05226954,
+                                   sum(locpot.get_average_along_axis(0)))
+
 
 class ChgcarTest(PymatgenTest):
 
@@ -1115,6 +1197,17 @@ class ChgcarTest(PymatgenTest):
         myans = self.chgcar_fe3o4.get_integrated_diff(0, 3, 6)
         self.assertTrue(np.allclose(myans[:, 1], ans))
 
+    def test_from_file_read_options(self):
+        filepath = self.TEST_FILES_DIR / 'CHGCAR.spin'
+        chgcar = Chgcar.from_file(filepath, read_data_aug=False, read_spin=False)
+        self.assertFalse(chgcar.is_spin_polarized)
+        self.assertEqual(chgcar.data_aug, {"total": None})
+        self.assertTrue(np.array_equal(chgcar.data["total"],
+                                       self.chgcar_spin.data["total"]))
+        chgcar = Chgcar.from_file(filepath, read_spin=False)
+        self.assertEqual(chgcar.data_aug["total"],
+                         self.chgcar_spin.data_aug["total"])
+
     def test_write(self):
         self.chgcar_spin.write_file("CHGCAR_pmg")
         with open("CHGCAR_pmg") as f:
@@ -1171,6 +1264,7 @@ class ChgcarTest(PymatgenTest):
         chgcar2 = Chgcar.from_hdf5("chgcar_test.hdf5")
         self.assertArrayAlmostEqual(chgcar2.data["total"],
                                     chgcar.data["total"])
+        self.assertEqual(chgcar2.data_aug["total"], chgcar.data_aug["total"])
         os.remove("chgcar_test.hdf5")
 
     def test_spin_data(self):
@@ -1294,6 +1388,31 @@ class XdatcarTest(PymatgenTest):
         self.assertEqual(len(x.structures), 8)
         self.assertIsNotNone(x.get_string())
 
+    def test_iter_frames(self):
+        filepath = self.TEST_FILES_DIR / 'Traj_XDATCAR'
+        structures = Xdatcar(filepath).structures
+        frames = list(Xdatcar.iter_frames(filepath, ionicstep_start=3, ionicstep_end=50, ionicstep_skip=4))
+        self.assertEqual([f.ionic_step for f in frames], list(range(3, 50, 4)))
+        for f in frames:
+            s = structures[f.ionic_step - 1]
+            self.assertEqual(f.species, s.species)
+            self.assertArrayAlmostEqual(f.lattice, s.lattice.matrix)
+            self.assertArrayAlmostEqual(f.frac_coords, s.frac_coords)
+        self.assertEqual(list(Xdatcar.iter_frames(filepath, ionicstep_skip=33, as_structures=True)),
+                         structures[::33])
+
+        # Variable-lattice files repeat the header before every configuration
+        with ScratchDir("."):
+            with open("XDATCAR", "w") as f:
+                for i in range(3):
+                    f.write("LiO\n 1.0\n {0} 0 0\n 0 {0} 0\n 0 0 {0}\n Li O\n 1 1\n".format(3 + i))
+                    f.write("Direct configuration=     {}\n 0 0 0\n 0.5 0.5 {}\n".format(i + 1, i / 10))
+            frames = list(Xdatcar.iter_frames("XDATCAR"))
+            self.assertEqual(len(frames), 3)
+            self.assertArrayAlmostEqual(frames[2].lattice, np.eye(3) * 5)
+            self.assertArrayAlmostEqual(frames[2].frac_coords, [[0, 0, 0], [0.5, 0.5, 0.2]])
+            self.assertEqual(Xdatcar("XDATCAR").structures[1].lattice.abc, (4, 4, 4))
+
 
 class DynmatTest(PymatgenTest):
 
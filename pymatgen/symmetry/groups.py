@@ -10,6 +10,7 @@ SpaceGroup data as published in his textbook "Structure of Materials".
 
 import os
 import re
+import sys
 import warnings
 from abc import ABCMeta, abstractmethod
 from collections.abc import Sequence
@@ -22,15 +23,67 @@ from monty.serialization import loadfn
 
 from pymatgen.core.operations import SymmOp
 
-SYMM_DATA = None
+_SYMM_DATA = None
+
+
+def _load_symm_data():
+    global _SYMM_DATA
+    if _SYMM_DATA is None:
+        _SYMM_DATA = loadfn(os.path.join(os.path.dirname(__file__),
+                                         "symm_data.json"))
+    return _SYMM_DATA
 
 
 def _get_symm_data(name):
-    global SYMM_DATA
-    if SYMM_DATA is None:
-        SYMM_DATA = loadfn(os.path.join(os.path.dirname(__file__),
-                                        "symm_data.json"))
-    return SYMM_DATA[name]
+    return _load_symm_data()[name]
+
+
+def __getattr__(name):
+    """
+    Loads SYMM_DATA on first access (PEP 562).
+    """
+    if name == "SYMM_DATA":
+        return _load_symm_data()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is not supported, so load the data now.
+    SYMM_DATA = _load_symm_data()
+
+
+def _get_symm_ops():
+    symm_ops = loadfn(os.path.join(os.path.dirname(__file__), "symm_ops.json"))
+    for op in symm_ops:
+        op["hermann_mauguin"] = re.sub(r" ", "", op["hermann_mauguin"])
+        op["universal_h_m"] = re.sub(r" ", "", op["universal_h_m"])
+    return symm_ops
+
+
+def _get_sg_symbols():
+    sg_symbols = set(_get_symm_data("space_group_encoding").keys())
+    for op in SpaceGroup.SYMM_OPS:
+        sg_symbols.add(op["hermann_mauguin"])
+        sg_symbols.add(op["universal_h_m"])
+    return sg_symbols
+
+
+class _LazyClassAttribute:
+    """
+    Class attribute computed on first access, which then replaces it. Used
+    to avoid loading the symmetry data on import.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner):
+        value = self.func()
+        setattr(owner, self.name, value)
+        return value
 
 
 class SymmetryGroup(Sequence, metaclass=ABCMeta):
@@ -185,24 +238,18 @@ class SpaceGroup(SymmetryGroup):
 
         Order of Space Group
     """
-    SYMM_OPS = loadfn(os.path.join(os.path.dirname(__file__),
-                                   "symm_ops.json"))
-    SG_SYMBOLS = set(_get_symm_data("space_group_encoding").keys())
-    for op in SYMM_OPS:
-        op["hermann_mauguin"] = re.sub(r" ", "", op["hermann_mauguin"])
-        op["universal_h_m"] = re.sub(r" ", "", op["universal_h_m"])
-        SG_SYMBOLS.add(op["hermann_mauguin"])
-        SG_SYMBOLS.add(op["universal_h_m"])
+    SYMM_OPS = _LazyClassAttribute(_get_symm_ops)
+    SG_SYMBOLS = _LazyClassAttribute(_get_sg_symbols)
 
-    gen_matrices = _get_symm_data("generator_matrices")
+    gen_matrices = _LazyClassAttribute(lambda: _get_symm_data("generator_matrices"))
     # POINT_GROUP_ENC = SYMM_DATA["point_group_encoding"]
-    sgencoding = _get_symm_data("space_group_encoding")
-    abbrev_sg_mapping = _get_symm_data("abbreviated_spacegroup_symbols")
-    translations = {k: Fraction(v) for k, v in _get_symm_data(
-        "translations").items()}
-    full_sg_mapping = {
+    sgencoding = _LazyClassAttribute(lambda: _get_symm_data("space_group_encoding"))
+    abbrev_sg_mapping = _LazyClassAttribute(lambda: _get_symm_data("abbreviated_spacegroup_symbols"))
+    translations = _LazyClassAttribute(lambda: {k: Fraction(v) for k, v in _get_symm_data(
+        "translations").items()})
+    full_sg_mapping = _LazyClassAttribute(lambda: {
         v["full_symbol"]: k
-        for k, v in _get_symm_data("space_group_encoding").items()}
+        for k, v in _get_symm_data("space_group_encoding").items()})
 
     def __init__(self, int_symbol):
         """
@@ -78,6 +78,11 @@ class SpaceGroupTest(unittest.TestCase):
             sg = SpaceGroup(symbol)
             self.assertTrue(hasattr(sg, "point_group"))
 
+    def test_symm_data(self):
+        from pymatgen.symmetry.groups import SYMM_DATA
+        self.assertEqual(SYMM_DATA["space_group_encoding"],
+                         _get_symm_data("space_group_encoding"))
+
     def test_full_symbols(self):
         sg = SpaceGroup("P2/m2/m2/m")
         self.assertEqual(sg.symbol, "Pmmm")
@@ -1,6 +1,8 @@
 import unittest
 
 import os
+import subprocess
+import sys
 import ruamel.yaml as yaml
 from pymatgen import SETTINGS_FILE, _load_pmg_settings, get_structure_from_mp, \
     SETTINGS, loadfn
@@ -45,5 +47,50 @@ class SettingsTestCase(unittest.TestCase):
             self.assertIsInstance(obj, Vasprun)
 
 
+class ImportTest(unittest.TestCase):
+
+    def _import(self, statement):
+        """
+        Runs an import in a new interpreter and returns the imported modules.
+        """
+        code = "%s; import sys; print(' '.join(sys.modules))" % statement
+        # Make sure the new interpreter imports this copy of pymatgen,
+        # whichever directory the tests are run from.
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join([root] + [p for p in [env.get("PYTHONPATH")] if p])
+        p = subprocess.run([sys.executable, "-c", code], env=env,
+                           stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                           universal_newlines=True, check=True)
+        return set(p.stdout.split())
+
+    def test_lazy_aliases(self):
+        modules = self._import("import pymatgen")
+        for m in ["pymatgen.core", "pymatgen.core.structure", "pymatgen.ext.matproj",
+                  "numpy", "requests"]:
+            self.assertNotIn(m, modules)
+
+        modules = self._import("from pymatgen import Structure")
+        self.assertIn("pymatgen.core.structure", modules)
+        self.assertNotIn("pymatgen.ext.matproj", modules)
+
+    def test_star_import(self):
+        import pymatgen
+        for name in ["Structure", "Element", "Composition", "MPRester", "loadfn"]:
+            self.assertIn(name, pymatgen.__all__)
+        ns = {}
+        exec("from pymatgen import *", ns)
+        self.assertIs(ns["Structure"], Structure)
+
+    def test_lazy_symmetry_data(self):
+        # SpaceGroup is wrapped by cached_class, the data is held by the
+        # class it wraps
+        modules = self._import("import pymatgen.symmetry.groups as g; "
+                               "sg = g.SpaceGroup.__mro__[1]; "
+                               "assert isinstance(sg.__dict__['SYMM_OPS'], g._LazyClassAttribute); "
+                               "assert len(g.SpaceGroup.SYMM_OPS) > 230")
+        self.assertIn("pymatgen.symmetry.groups", modules)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -297,7 +297,8 @@ class PartialRemoveSitesTransformation(AbstractTransformation):
     ALGO_BEST_FIRST = 2
     ALGO_ENUMERATE = 3
 
-    def __init__(self, indices, fractions, algo=ALGO_COMPLETE):
+    def __init__(self, indices, fractions, algo=ALGO_COMPLETE, ncpus=None,
+                 time_limit=None):
         """
         Args:
             indices:
@@ -310,10 +311,19 @@ class PartialRemoveSitesTransformation(AbstractTransformation):
                 This parameter allows you to choose the algorithm to perform
                 ordering. Use one of PartialRemoveSpecieTransformation.ALGO_*
                 variables to set the algo.
+            ncpus (int):
+                Number of processes used by the EwaldMinimizer for
+                ALGO_FAST. Defaults to None, i.e., a serial search.
+            time_limit (float):
+                Time limit in seconds of the EwaldMinimizer search for
+                ALGO_FAST. If it is reached, the best orderings found so far
+                are returned. Defaults to None, i.e., no time limit.
         """
         self.indices = indices
         self.fractions = fractions
         self.algo = algo
+        self.ncpus = ncpus
+        self.time_limit = time_limit
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def _best_first_ordering(self, structure, num_remove_dict):
@@ -436,9 +446,13 @@ class PartialRemoveSitesTransformation(AbstractTransformation):
 
         self.logger.debug("Calling EwaldMinimizer...")
         minimizer = EwaldMinimizer(ewaldmatrix, m_list, num_to_return,
-                                   PartialRemoveSitesTransformation.ALGO_FAST)
+                                   PartialRemoveSitesTransformation.ALGO_FAST,
+                                   ncpus=self.ncpus, time_limit=self.time_limit)
         self.logger.debug("Minimizing Ewald took {} seconds."
                           .format(time.time() - starttime))
+        if minimizer.best_m_list is None:
+            raise RuntimeError("No ordering found within the time limit of "
+                               "{} seconds.".format(self.time_limit))
 
         all_structures = []
 
@@ -428,7 +428,8 @@ class PartialRemoveSpecieTransformation(AbstractTransformation):
     ALGO_BEST_FIRST = 2
     ALGO_ENUMERATE = 3
 
-    def __init__(self, specie_to_remove, fraction_to_remove, algo=ALGO_FAST):
+    def __init__(self, specie_to_remove, fraction_to_remove, algo=ALGO_FAST,
+                 ncpus=None, time_limit=None):
         """
         Args:
             specie_to_remove: Specie to remove. Must have oxidation state E.g.,
@@ -437,10 +438,18 @@ class PartialRemoveSpecieTransformation(AbstractTransformation):
             algo: This parameter allows you to choose the algorithm to perform
                 ordering. Use one of PartialRemoveSpecieTransformation.ALGO_*
                 variables to set the algo.
+            ncpus (int): Number of processes used by the EwaldMinimizer for
+                ALGO_FAST. Defaults to None, i.e., a serial search.
+            time_limit (float): Time limit in seconds of the EwaldMinimizer
+                search for ALGO_FAST. If it is reached, the best orderings
+                found so far are returned. Defaults to None, i.e., no time
+                limit.
         """
         self.specie_to_remove = specie_to_remove
         self.fraction_to_remove = fraction_to_remove
         self.algo = algo
+        self.ncpus = ncpus
+        self.time_limit = time_limit
 
     def apply_transformation(self, structure, return_ranked_list=False):
         """
@@ -469,7 +478,8 @@ class PartialRemoveSpecieTransformation(AbstractTransformation):
                           Composition({sp: 1})]
         trans = PartialRemoveSitesTransformation([specie_indices],
                                                  [self.fraction_to_remove],
-                                                 algo=self.algo)
+                                                 algo=self.algo, ncpus=self.ncpus,
+                                                 time_limit=self.time_limit)
         return trans.apply_transformation(structure, return_ranked_list)
 
     @property
@@ -530,7 +540,7 @@ class OrderDisorderedStructureTransformation(AbstractTransformation):
     ALGO_BEST_FIRST = 2
 
     def __init__(self, algo=ALGO_FAST, symmetrized_structures=False,
-                 no_oxi_states=False):
+                 no_oxi_states=False, ncpus=None, time_limit=None):
         """
         Args:
             algo (int): Algorithm to use.
@@ -539,8 +549,15 @@ class OrderDisorderedStructureTransformation(AbstractTransformation):
                 should be used for the grouping of sites.
             no_oxi_states (bool): Whether to remove oxidation states prior to
                 ordering.
+            ncpus (int): Number of processes used by the EwaldMinimizer.
+                Defaults to None, i.e., a serial search.
+            time_limit (float): Time limit in seconds of the EwaldMinimizer
+                search. If it is reached, the best orderings found so far
+                are returned. Defaults to None, i.e., no time limit.
         """
         self.algo = algo
+        self.ncpus = ncpus
+        self.time_limit = time_limit
         self._all_structures = []
         self.no_oxi_states = no_oxi_states
         self.symmetrized_structures = symmetrized_structures
@@ -640,7 +657,11 @@ class OrderDisorderedStructureTransformation(AbstractTransformation):
                 m_list.append([0, empty, list(g), None])
 
         matrix = EwaldSummation(s).total_energy_matrix
-        ewald_m = EwaldMinimizer(matrix, m_list, num_to_return, self.algo)
+        ewald_m = EwaldMinimizer(matrix, m_list, num_to_return, self.algo,
+                                 ncpus=self.ncpus, time_limit=self.time_limit)
+        if ewald_m.best_m_list is None:
+            raise RuntimeError("No ordering found within the time limit of "
+                               "{} seconds.".format(self.time_limit))
 
         self._all_structures = []
 
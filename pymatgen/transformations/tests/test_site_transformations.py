@@ -238,6 +238,16 @@ class PartialRemoveSitesTransformationTest(unittest.TestCase):
         )
         s = t.apply_transformation(self.struct)
         self.assertEqual(s.formula, "Li2 O2")
+        t2 = PartialRemoveSitesTransformation(
+            [tuple(range(8))], [0.5],
+            PartialRemoveSitesTransformation.ALGO_FAST, ncpus=2
+        )
+        self.assertEqual(t2.apply_transformation(self.struct), s)
+        t3 = PartialRemoveSitesTransformation(
+            [tuple(range(8))], [0.5],
+            PartialRemoveSitesTransformation.ALGO_FAST, time_limit=0
+        )
+        self.assertRaises(RuntimeError, t3.apply_transformation, self.struct)
 
     def test_to_from_dict(self):
         d = PartialRemoveSitesTransformation([tuple(range(4))], [0.5]).as_dict()
@@ -227,6 +227,10 @@ class PartialRemoveSpecieTransformationTest(unittest.TestCase):
         self.assertAlmostEqual(EwaldSummation(fast_opt_s).total_energy,
                                EwaldSummation(slow_opt_s).total_energy, 4)
         self.assertEqual(fast_opt_s, slow_opt_s)
+        t = PartialRemoveSpecieTransformation("Li+", 0.5, time_limit=60)
+        self.assertEqual(t.apply_transformation(struct), fast_opt_s)
+        t = PartialRemoveSpecieTransformation("Li+", 0.5, time_limit=0)
+        self.assertRaises(RuntimeError, t.apply_transformation, struct)
 
     def test_apply_transformations_complete_ranking(self):
         p = Poscar.from_file(os.path.join(test_dir, 'POSCAR.LiFePO4'),
@@ -293,6 +297,15 @@ class OrderDisorderedStructureTransformationTest(unittest.TestCase):
             type(OrderDisorderedStructureTransformation.from_dict(d)),
             OrderDisorderedStructureTransformation)
 
+    def test_time_limit(self):
+        struct = Structure(Lattice.cubic(5), [{"Si4+": 0.5}, {"Si4+": 0.5}, {"O2-": 0.5}, {"O2-": 0.5}],
+                           [[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5], [0, 0.5, 0.5]])
+        output = OrderDisorderedStructureTransformation(time_limit=60).apply_transformation(struct, 50)
+        self.assertEqual(output, OrderDisorderedStructureTransformation().apply_transformation(struct, 50))
+        t = OrderDisorderedStructureTransformation(time_limit=0)
+        self.assertRaises(RuntimeError, t.apply_transformation, struct)
+        self.assertEqual(OrderDisorderedStructureTransformation.from_dict(t.as_dict()).time_limit, 0)
+
     def test_no_oxidation(self):
         specie = {"Cu1+": 0.5, "Au2+": 0.5}
         cuau = Structure.from_spacegroup("Fm-3m", Lattice.cubic(3.677),
@@ -100,7 +100,7 @@ def micro_pyawk(filename, search, results=None, debug=None, postdebug=None):
     with zopen(filename, "rt") as f:
         for line in f:
             for entry in search:
-                match = re.search(entry[0], line)
+                match = entry[0].search(line)
                 if match and (entry[1] is None
                               or entry[1](results, line)):
                     if debug is not None: